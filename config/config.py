@@ -3,13 +3,20 @@ Configuración principal del proyecto
 """
 import os
 from pathlib import Path
-from dotenv import load_dotenv
-
-# Cargar variables de entorno
-load_dotenv()
 
 # Rutas del proyecto
 BASE_DIR = Path(__file__).parent.parent
+
+# Cargar variables de entorno desde .env sólo si existe (en contenedores
+# vienen del entorno y no hace falta importar python-dotenv)
+if (BASE_DIR / ".env").exists():
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        pass
+    else:
+        load_dotenv(BASE_DIR / ".env")
+
 DATA_DIR = BASE_DIR / "data"
 CONFIG_DIR = BASE_DIR / "config"
 
@@ -19,11 +26,39 @@ AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY", "")
 AWS_REGION = os.getenv("AWS_REGION", "us-east-1")
 #BEDROCK_MODEL_ID = "anthropic.claude-3-haiku-20240307-v1:0"  # Ajustar según disponibilidad
 BEDROCK_MODEL_ID = "global.anthropic.claude-sonnet-4-5-20250929-v1:0"
+# Endpoint alternativo de bedrock-runtime (ej: el simulador local de src/services/bedrock_simulado.py)
+BEDROCK_ENDPOINT_URL = os.getenv("BEDROCK_ENDPOINT_URL") or None
+# Pool de clientes de Bedrock (compartido entre sesiones de Streamlit)
+BEDROCK_MAX_CONEXIONES = 20  # conexiones HTTP por cliente
+BEDROCK_CLIENTE_TTL_INACTIVO = 1800  # 30 minutos sin uso y se cierra el cliente
+# Llamadas a Bedrock: timeouts de botocore, plazo total por llamada y reintentos propios
+BEDROCK_TIMEOUT_CONEXION = 5  # segundos
+BEDROCK_TIMEOUT_LECTURA = 30  # segundos sin recibir datos
+BEDROCK_DEADLINE_S = 45  # plazo total de una llamada, reintentos incluidos
+BEDROCK_MAX_REINTENTOS = 4  # ante throttling o errores 5xx (con backoff y jitter)
+BEDROCK_MAX_CONCURRENCIA_POR_MODELO = 8
+BEDROCK_EXECUTOR_WORKERS = 16  # hilos para las llamadas asíncronas
+# Interpretación por lotes (interpretar_lote)
+BEDROCK_LOTE_TAMANO = 8  # consultas por llamada al modelo
+BEDROCK_LOTE_PARALELO = 4  # lotes en vuelo a la vez
+# Tokens de entrada máximos para el prompt de recomendación (los datos se recortan para entrar)
+BEDROCK_RECOMENDACION_MAX_TOKENS_ENTRADA = int(os.getenv("BEDROCK_RECOMENDACION_MAX_TOKENS_ENTRADA", "1200"))
+
+# Archivo con las sucursales (JSON o CSV)
+SUPERMERCADOS_DATA_FILE = os.getenv("SUPERMERCADOS_DATA_FILE", str(DATA_DIR / "supermercados.json"))
+
+# Gazetteer offline (departamentos, distritos, barrios, calles)
+GAZETTEER_DATA_FILE = DATA_DIR / "gazetteer_mendoza.json"
 
 # Parámetros de búsqueda
 MAX_DISTANCE_KM = 10  # Radio máximo de búsqueda
 DEFAULT_LOCATION = "Guaymallén, Mendoza, Argentina"
 
+# Mapa
+MAPA_UMBRAL_CLUSTER = 25  # con más marcadores se agrupan (MarkerCluster + capa GeoJSON)
+MAPA_CACHE_MAX_ITEMS = 64  # HTML de mapas ya renderizados
+MAPA_CACHE_TTL = 24 * 3600
+
 # Supermercados soportados
 SUPERMERCADOS = [
     "Carrefour",
@@ -41,12 +76,38 @@ USER_AGENTS = [
     "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 ]
 
+# Política de uso de Nominatim (máximo 1 request por segundo)
+NOMINATIM_MAX_REQUESTS_POR_SEGUNDO = 1.0
+
 # Timeouts
 REQUEST_TIMEOUT = 10  # segundos
 SCRAPING_DELAY = 2  # segundos entre requests
 
 # Cache
 CACHE_TTL = 3600  # 1 hora (tiempo de vida del cache de precios)
+PRECIOS_CACHE_MAX_ITEMS = 5000  # entradas (cadena, término) en memoria
+CACHE_DIR = Path(os.getenv("CACHE_DIR", BASE_DIR / ".cache"))
+GEOCODING_CACHE_FILE = CACHE_DIR / "geocoding.sqlite3"
+GEOCODING_CACHE_TTL = 30 * 24 * 3600  # 30 días (las direcciones casi no cambian)
+GEOCODING_CACHE_NEGATIVE_TTL = 3600  # 1 hora para errores / direcciones no encontradas
+BEDROCK_CACHE_TTL = 24 * 3600  # 1 día para interpretaciones de consultas
+BEDROCK_CACHE_MAX_ITEMS = 2000
+BEDROCK_PLANTILLAS_TTL = 7 * 24 * 3600  # 1 semana para plantillas de eventos por persona
+BEDROCK_CACHE_PERSISTENTE = os.getenv("BEDROCK_CACHE_PERSISTENTE", "1") == "1"
+BEDROCK_CACHE_FILE = CACHE_DIR / "bedrock.sqlite3"
+
+# API HTTP (src/api.py)
+API_HOST = os.getenv("API_HOST", "0.0.0.0")
+API_PUERTO = int(os.getenv("API_PUERTO", "8080"))
+API_WORKERS = int(os.getenv("API_WORKERS", "8"))  # búsquedas simultáneas
+API_COLA_MAX = int(os.getenv("API_COLA_MAX", "16"))  # esperando worker; más allá se responde 429
+API_TIMEOUT_S = float(os.getenv("API_TIMEOUT_S", "60"))  # plazo de una búsqueda (504 si se pasa)
+
+# Métricas de tiempos por etapa (src/utils/metricas.py)
+METRICAS_BUCKETS_S = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+METRICAS_MAX_SERIES = int(os.getenv("METRICAS_MAX_SERIES", "2000"))  # después se deja de etiquetar por término
+METRICAS_HOST = os.getenv("METRICAS_HOST", "127.0.0.1")
+METRICAS_PUERTO = int(os.getenv("METRICAS_PUERTO", "0"))  # servidor de la app (ej: 9464); 0 = desactivado
 
 # Logging
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -1,116 +1,123 @@
 """
 Base de datos de supermercados en Mendoza
+
+Las sucursales se cargan una sola vez por proceso desde un archivo de datos
+(JSON o CSV, ver SUPERMERCADOS_DATA_FILE) y se comparten como objetos
+inmutables entre todas las búsquedas.
 """
-from typing import List
-import sys
+from typing import Dict, List, Optional, Tuple
+import csv
+import json
+import threading
 from pathlib import Path
 
-# Agregar el directorio raíz al path
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
+from config.config import SUPERMERCADOS_DATA_FILE
 from src.models.models import Supermercado
+from src.utils.indice_espacial import IndiceEspacial, cadena_de
+from src.utils.texto import normalizar
+
+
+class RegistroSupermercados:
+    """Sucursales cargadas desde archivo con índices por cadena, nombre y ubicación"""
+
+    def __init__(self, supermercados: List[Supermercado]):
+        self.todos: Tuple[Supermercado, ...] = tuple(supermercados)
+
+        por_cadena: Dict[str, List[Supermercado]] = {}
+        for supermercado in self.todos:
+            por_cadena.setdefault(cadena_de(supermercado), []).append(supermercado)
+        self.por_cadena: Dict[str, Tuple[Supermercado, ...]] = {
+            cadena: tuple(lista) for cadena, lista in por_cadena.items()
+        }
+        self.por_nombre: Dict[str, Supermercado] = {
+            normalizar(s.nombre): s for s in self.todos
+        }
+        self.indice = IndiceEspacial(self.todos)
+
+    @classmethod
+    def desde_archivo(cls, ruta: Path) -> "RegistroSupermercados":
+        """
+        Carga el registro desde un archivo JSON (lista de objetos) o CSV
+
+        Args:
+            ruta: Ruta al archivo de datos
+
+        Returns:
+            RegistroSupermercados con las sucursales del archivo
+        """
+        ruta = Path(ruta)
+        with open(ruta, encoding="utf-8") as f:
+            if ruta.suffix.lower() == ".csv":
+                filas = [
+                    {k: v for k, v in fila.items() if v not in (None, "")}
+                    for fila in csv.DictReader(f)
+                ]
+            else:
+                filas = json.load(f)
+        return cls([Supermercado(**fila) for fila in filas])
+
+    def buscar(self, nombre: str) -> Tuple[Supermercado, ...]:
+        """
+        Sucursales por cadena o nombre
+
+        Args:
+            nombre: Cadena (ej: "Atomo"), nombre exacto o parte del nombre
+
+        Returns:
+            Tupla de sucursales que coinciden
+        """
+        clave = normalizar(nombre)
+        if clave in self.por_cadena:
+            return self.por_cadena[clave]
+        if clave in self.por_nombre:
+            return (self.por_nombre[clave],)
+        return tuple(s for n, s in self.por_nombre.items() if clave in n)
+
+
+_registro: Optional[RegistroSupermercados] = None
+_registro_lock = threading.Lock()
+
+
+def obtener_registro() -> RegistroSupermercados:
+    """
+    Retorna el registro de sucursales (se carga en el primer uso)
+
+    Returns:
+        RegistroSupermercados compartido por todo el proceso
+    """
+    global _registro
+    if _registro is None:
+        with _registro_lock:
+            if _registro is None:
+                _registro = RegistroSupermercados.desde_archivo(SUPERMERCADOS_DATA_FILE)
+    return _registro
 
 
 def obtener_supermercados_mendoza() -> List[Supermercado]:
     """
     Retorna lista de supermercados en Mendoza con ubicaciones reales
     """
-    return [
-        # ATOMO
-        Supermercado(
-            nombre="Atomo Guaymallén",
-            direccion="Av. San Martín 2450, Guaymallén, Mendoza",
-            latitud=-32.8895,
-            longitud=-68.8458,
-            telefono="0261 429-5000"
-        ),
-        Supermercado(
-            nombre="Atomo Las Heras",
-            direccion="Álvarez Condarco 740, Las Heras, Mendoza",
-            latitud=-32.8513,
-            longitud=-68.8273,
-            telefono="0261 429-5000"
-        ),
-        Supermercado(
-            nombre="Atomo Godoy Cruz",
-            direccion="Av. San Martín 1850, Godoy Cruz, Mendoza",
-            latitud=-32.9145,
-            longitud=-68.8497,
-            telefono="0261 429-5000"
-        ),
-        
-        # CARREFOUR
-        Supermercado(
-            nombre="Carrefour Express Guaymallén",
-            direccion="Av. Mitre 1200, Guaymallén, Mendoza",
-            latitud=-32.8923,
-            longitud=-68.8512,
-            telefono="0810-444-8000"
-        ),
-        Supermercado(
-            nombre="Carrefour Mendoza Centro",
-            direccion="San Martín 1150, Mendoza Capital",
-            latitud=-32.8908,
-            longitud=-68.8428,
-            telefono="0810-444-8000"
-        ),
-        
-        # COTO
-        Supermercado(
-            nombre="Coto Mendoza",
-            direccion="Av. Acceso Este 3450, Guaymallén, Mendoza",
-            latitud=-32.8756,
-            longitud=-68.8234,
-            telefono="0810-222-2686"
-        ),
-        
-        # VEA
-        Supermercado(
-            nombre="Vea Guaymallén",
-            direccion="Urquiza 2150, Guaymallén, Mendoza",
-            latitud=-32.8867,
-            longitud=-68.8523,
-            telefono="0810-122-0832"
-        ),
-        Supermercado(
-            nombre="Vea Godoy Cruz",
-            direccion="San Martín 2300, Godoy Cruz, Mendoza",
-            latitud=-32.9234,
-            longitud=-68.8556,
-            telefono="0810-122-0832"
-        ),
-        
-        # TADICOR
-        Supermercado(
-            nombre="Tadicor Mayorista",
-            direccion="Ruta 7 Km 1056, Guaymallén, Mendoza",
-            latitud=-32.8678,
-            longitud=-68.8123,
-            telefono="0261-431-2000"
-        ),
-        
-        # JUMBO
-        Supermercado(
-            nombre="Jumbo Mendoza",
-            direccion="Av. Acceso Este 3050, Guaymallén, Mendoza",
-            latitud=-32.8798,
-            longitud=-68.8312,
-            telefono="0810-999-5862"
-        ),
-    ]
+    return list(obtener_registro().todos)
 
 
 def obtener_supermercado_por_nombre(nombre: str) -> List[Supermercado]:
     """
     Filtra supermercados por nombre/cadena
-    
+
     Args:
         nombre: Nombre de la cadena (ej: "Atomo", "Carrefour")
-        
+
     Returns:
         Lista de supermercados de esa cadena
     """
-    todos = obtener_supermercados_mendoza()
-    nombre_lower = nombre.lower()
-    
-    return [s for s in todos if nombre_lower in s.nombre.lower()]
+    return list(obtener_registro().buscar(nombre))
+
+
+def obtener_indice_supermercados() -> IndiceEspacial:
+    """
+    Retorna el índice espacial de sucursales (se construye en el primer uso)
+
+    Returns:
+        IndiceEspacial con todas las sucursales de la base
+    """
+    return obtener_registro().indice
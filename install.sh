@@ -26,6 +26,9 @@ source venv/bin/activate
 echo "📥 Instalando dependencias..."
 pip install --upgrade pip
 pip install -r requirements.txt
+# El proyecto como paquete editable: `src`, `config` y `data` quedan importables
+# desde cualquier directorio (streamlit, tests, comandos)
+pip install -e .
 
 # Crear archivo .env
 if [ ! -f .env ]; then
@@ -45,4 +48,5 @@ echo "  2. Editá .env con tus credenciales de AWS"
 echo "  3. Ejecutá: streamlit run src/app.py"
 echo ""
 echo "Para tests: python tests/test_basic.py"
+echo "Tiempo de importación: python -m pytest tests/test_import_time.py"
 echo ""
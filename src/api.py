@@ -0,0 +1,283 @@
+"""
+API HTTP JSON del comparador, sin Streamlit
+
+    POST /compare   {"consulta": "asado para 8", "ubicacion": "Godoy Cruz",
+                     "radio_km": 5, "cadenas": ["Atomo", "Vea"]}
+    GET  /health    estado del pool de workers
+    GET  /metrics   tiempos por etapa (Prometheus; JSON con ?formato=json)
+
+Cada búsqueda corre en un pool acotado de `API_WORKERS` hilos. Hasta
+`API_COLA_MAX` búsquedas más esperan turno; pasado ese límite se responde
+429 con Retry-After, así el balanceador manda el tráfico a otra réplica en
+lugar de acumular latencia. Las credenciales de AWS salen del entorno.
+
+Uso:
+
+    python -m src.api --puerto 8080 --workers 8 --cola 16
+"""
+import argparse
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturoTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+from config.config import (
+    API_COLA_MAX,
+    API_HOST,
+    API_PUERTO,
+    API_TIMEOUT_S,
+    API_WORKERS,
+    DEFAULT_LOCATION,
+    MAX_DISTANCE_KM
+)
+from src.services.bedrock_service import BedrockService
+from src.services.busqueda import (
+    ERROR_INTERPRETACION,
+    UBICACION_NO_ENCONTRADA,
+    ResultadoBusqueda,
+    buscar_mejores_precios
+)
+from src.services.contenedor import ContenedorServicios
+from src.utils.metricas import formato_pedido, obtener_metricas
+
+# Código HTTP según el estado de la búsqueda (el resto responde 200)
+ESTADOS_HTTP = {UBICACION_NO_ENCONTRADA: 422, ERROR_INTERPRETACION: 502}
+
+# Código HTTP según el tipo de error de interpretación (el resto responde 502)
+ESTADOS_INTERPRETACION = {"fuera_de_dominio": 422, "error_servicio": 502, "error_timeout": 504}
+
+MAX_CUERPO = 64 * 1024  # bytes
+
+
+def estado_http(resultado: ResultadoBusqueda) -> int:
+    """Código HTTP de un ResultadoBusqueda"""
+    if resultado.estado == ERROR_INTERPRETACION:
+        return ESTADOS_INTERPRETACION.get(resultado.interpretacion.get("tipo"), 502)
+    return ESTADOS_HTTP.get(resultado.estado, 200)
+
+
+class ErrorPedido(ValueError):
+    """Cuerpo de /compare inválido (400)"""
+
+
+def leer_pedido(datos: Dict, cadenas_disponibles: List[str]) -> Dict:
+    """
+    Valida el cuerpo de POST /compare y completa los valores por defecto
+
+    Args:
+        datos: JSON recibido
+        cadenas_disponibles: Cadenas con scraper
+
+    Returns:
+        dict con consulta, ubicacion, radio_km y cadenas
+
+    Raises:
+        ErrorPedido: si falta la consulta o algún campo tiene un tipo inválido
+    """
+    if not isinstance(datos, dict):
+        raise ErrorPedido("El cuerpo tiene que ser un objeto JSON")
+
+    consulta = datos.get("consulta")
+    if not isinstance(consulta, str) or not consulta.strip():
+        raise ErrorPedido("Falta 'consulta'")
+
+    ubicacion = datos.get("ubicacion") or DEFAULT_LOCATION
+    if not isinstance(ubicacion, str):
+        raise ErrorPedido("'ubicacion' tiene que ser texto")
+
+    radio_km = datos.get("radio_km", MAX_DISTANCE_KM)
+    if isinstance(radio_km, bool) or not isinstance(radio_km, (int, float)) or not 0 < radio_km <= 50:
+        raise ErrorPedido("'radio_km' tiene que ser un número entre 0 y 50")
+
+    cadenas = datos.get("cadenas") or cadenas_disponibles
+    if not isinstance(cadenas, list) or not all(isinstance(c, str) for c in cadenas):
+        raise ErrorPedido("'cadenas' tiene que ser una lista de nombres")
+    desconocidas = [c for c in cadenas if c not in cadenas_disponibles]
+    if desconocidas:
+        raise ErrorPedido(f"Cadenas no soportadas: {desconocidas} (disponibles: {cadenas_disponibles})")
+
+    return {"consulta": consulta.strip(), "ubicacion": ubicacion, "radio_km": radio_km, "cadenas": cadenas}
+
+
+class ManejadorAPI(BaseHTTPRequestHandler):
+    """Atiende POST /compare, GET /health y GET /metrics"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, formato, *args):
+        pass
+
+    @property
+    def api(self) -> "ServidorAPI":
+        return self.server
+
+    def do_GET(self):
+        ruta = self.path.split("?")[0]
+        if ruta == "/health":
+            self._responder_json(200, self.api.estadisticas())
+        elif ruta in ("/metrics", "/metrics.json"):
+            tipo, cuerpo = obtener_metricas().exportar(formato_pedido(self.path, self.headers.get("Accept", "")))
+            self._responder(200, tipo, cuerpo)
+        else:
+            self._responder_json(404, {"error": "Ruta desconocida"})
+
+    def do_POST(self):
+        try:
+            largo = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            largo = -1
+        if largo < 0:
+            self.close_connection = True
+            self._responder_json(400, {"error": "Content-Length inválido"})
+            return
+        if largo > MAX_CUERPO:
+            self.close_connection = True
+            self._responder_json(413, {"error": "Cuerpo demasiado grande"})
+            return
+        cuerpo = self.rfile.read(largo)
+
+        if self.path.split("?")[0] != "/compare":
+            self._responder_json(404, {"error": "Ruta desconocida"})
+            return
+
+        try:
+            pedido = leer_pedido(json.loads(cuerpo or b"null"), list(self.api.servicios.scrapers))
+        except json.JSONDecodeError:
+            self._responder_json(400, {"error": "El cuerpo no es JSON válido"})
+            return
+        except ErrorPedido as e:
+            self._responder_json(400, {"error": str(e)})
+            return
+
+        futuro = self.api.enviar(pedido)
+        if futuro is None:
+            self._responder_json(429, {"error": "Servidor saturado, reintentá en unos segundos"}, {"Retry-After": "1"})
+            return
+
+        try:
+            resultado = futuro.result(timeout=self.api.timeout)
+        except FuturoTimeoutError:
+            self._responder_json(504, {"error": f"La búsqueda superó {self.api.timeout:.0f}s"})
+            return
+        except Exception as e:
+            print(f"❌ API: error en /compare: {e}")
+            self._responder_json(500, {"error": "Error interno"})
+            return
+
+        self._responder_json(estado_http(resultado), resultado.a_dict())
+
+    def _responder_json(self, estado: int, datos: Dict, encabezados: Optional[Dict[str, str]] = None):
+        cuerpo = json.dumps(datos, ensure_ascii=False, default=str).encode("utf-8")
+        self._responder(estado, "application/json; charset=utf-8", cuerpo, encabezados)
+
+    def _responder(self, estado: int, tipo: str, cuerpo: bytes, encabezados: Optional[Dict[str, str]] = None):
+        self.send_response(estado)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(cuerpo)))
+        for nombre, valor in (encabezados or {}).items():
+            self.send_header(nombre, valor)
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+
+class ServidorAPI(ThreadingHTTPServer):
+    """Servidor HTTP con un pool acotado de búsquedas y control de admisión"""
+
+    daemon_threads = True
+
+    def __init__(self, direccion: tuple, workers: int = API_WORKERS, cola_max: int = API_COLA_MAX,
+                 timeout: float = API_TIMEOUT_S, servicios: Optional[ContenedorServicios] = None,
+                 bedrock: Optional[BedrockService] = None):
+        """
+        Args:
+            direccion: (host, puerto)
+            workers: Búsquedas simultáneas
+            cola_max: Búsquedas que pueden esperar un worker libre
+            timeout: Segundos que un request espera su búsqueda
+            servicios: Servicios compartidos (se crean si no se pasan)
+            bedrock: BedrockService (credenciales del entorno si no se pasa)
+        """
+        super().__init__(direccion, ManejadorAPI)
+        self.workers = workers
+        self.cola_max = cola_max
+        self.timeout = timeout
+        self.servicios = servicios or ContenedorServicios()
+        self.bedrock = bedrock or BedrockService()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="api")
+        self._cupos = threading.BoundedSemaphore(workers + cola_max)
+        self._lock = threading.Lock()
+        self._contadores = {"en_curso": 0, "atendidas": 0, "rechazadas": 0, "errores": 0}
+
+    @property
+    def url(self) -> str:
+        host, puerto = self.server_address[:2]
+        return f"http://{host}:{puerto}"
+
+    def enviar(self, pedido: Dict):
+        """
+        Encola una búsqueda si hay cupo
+
+        Returns:
+            Future con el ResultadoBusqueda, o None si el servidor está saturado
+        """
+        if not self._cupos.acquire(blocking=False):
+            self._contar("rechazadas")
+            return None
+
+        self._contar("en_curso")
+        futuro = self._executor.submit(
+            buscar_mejores_precios,
+            self.servicios,
+            self.bedrock,
+            pedido["consulta"],
+            pedido["ubicacion"],
+            pedido["radio_km"],
+            pedido["cadenas"]
+        )
+        # El cupo se libera al terminar la búsqueda, aunque el cliente ya no espere
+        futuro.add_done_callback(self._terminada)
+        return futuro
+
+    def _terminada(self, futuro):
+        self._cupos.release()
+        with self._lock:
+            self._contadores["en_curso"] -= 1
+            # Las canceladas al cerrar el servidor no llegaron a correr
+            if not futuro.cancelled():
+                self._contadores["errores" if futuro.exception() else "atendidas"] += 1
+
+    def _contar(self, contador: str):
+        with self._lock:
+            self._contadores[contador] += 1
+
+    def estadisticas(self) -> Dict[str, int]:
+        with self._lock:
+            return {"workers": self.workers, "cola_max": self.cola_max, **self._contadores}
+
+    def server_close(self):
+        super().server_close()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="API HTTP JSON del comparador de supermercados")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--puerto", type=int, default=API_PUERTO)
+    parser.add_argument("--workers", type=int, default=API_WORKERS, help="Búsquedas simultáneas")
+    parser.add_argument("--cola", type=int, default=API_COLA_MAX, help="Búsquedas en espera antes de responder 429")
+    parser.add_argument("--timeout", type=float, default=API_TIMEOUT_S, help="Segundos por búsqueda")
+    args = parser.parse_args(argv)
+
+    servidor = ServidorAPI((args.host, args.puerto), workers=args.workers, cola_max=args.cola, timeout=args.timeout)
+    print(f"🚀 API escuchando en {servidor.url} ({args.workers} workers, cola de {args.cola})")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n📊 {servidor.estadisticas()}")
+    finally:
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()
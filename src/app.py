@@ -3,40 +3,32 @@ Aplicación Streamlit - Comparador Inteligente de Supermercados
 CANTIDADES CALCULADAS 100% POR IA (Bedrock/Claude)
 """
 import streamlit as st
-import sys
-from pathlib import Path
 import math
+from html import escape
 import re
 
-# Agregar path del proyecto
-project_root = Path(__file__).parent.parent
-sys.path.insert(0, str(project_root))
-
-from src.services.bedrock_service import BedrockService
-from src.services.geocoding_service import GeocodingService
-from src.scrapers.atomo_scraper import AtomoScraper
-from src.scrapers.vea_scraper import VeaScraper
-from src.scrapers.mock_scrapers import (
-    CarrefourScraper, CotoScraper, 
-    TadicorScraper, JumboScraper
+from src.services.busqueda import (
+    ERROR_INTERPRETACION,
+    SIN_PRODUCTOS,
+    SIN_SUPERMERCADOS,
+    UBICACION_NO_ENCONTRADA,
+    buscar_mejores_precios
 )
-from data.supermercados_data import obtener_supermercados_mendoza, obtener_supermercado_por_nombre
+from src.services.contenedor import ContenedorServicios
+from src.mapa import marcadores_lista_compra, mostrar_mapa
+from data.supermercados_data import obtener_supermercado_por_nombre
 from src.models.models import ComparacionPrecios
-from config.config import MAX_DISTANCE_KM
+from src.utils.memo_etapas import MemoEtapas
+from src.utils.metricas import iniciar_servidor_metricas, span
+from config.config import MAX_DISTANCE_KM, METRICAS_HOST, METRICAS_PUERTO
 
 # Importar nueva lógica de comparación producto por producto
-import sys
-sys.path.insert(0, '/mnt/user-data/outputs')
-from comparacion_producto_por_producto import (
-    comparar_productos_entre_supermercados,
+from src.comparacion_producto_por_producto import (
+    comparar_productos_en_streaming,
     mostrar_tabla_comparativa,
-    generar_recomendacion_compra,
     mostrar_lista_compra_optimizada
 )
 
-import folium
-from streamlit_folium import folium_static
-
 
 # Configuración de la página
 st.set_page_config(
@@ -120,22 +112,19 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-# Inicializar servicios en session_state
+# Servicios pesados: una vez por proceso, compartidos por todas las sesiones
 @st.cache_resource
-def init_services():
-    """Inicializa los servicios (se cachean para no recrearlos)"""
-    return {
-        'bedrock': BedrockService(),
-        'geocoding': GeocodingService(),
-        'scrapers': {
-            'Atomo': AtomoScraper(),
-            'Vea': VeaScraper(),
-            # 'Carrefour': CarrefourScraper(),
-            # 'Coto': CotoScraper(),
-            # 'Tadicor': TadicorScraper(),
-            # 'Jumbo': JumboScraper()
-        }
-    }
+def init_services() -> ContenedorServicios:
+    """Inicializa los servicios (se cachean para no recrearlos en cada rerun)"""
+    return ContenedorServicios()
+
+
+@st.cache_resource
+def init_metricas():
+    """Servidor local de /metrics (uno por proceso, sólo si se configura METRICAS_PUERTO)"""
+    if not METRICAS_PUERTO:
+        return None
+    return iniciar_servidor_metricas(METRICAS_HOST, METRICAS_PUERTO)
 
 
 def ajustar_cantidades_ia(productos_encontrados, productos_ia):
@@ -235,6 +224,11 @@ def ajustar_cantidades_ia(productos_encontrados, productos_ia):
     return productos_ajustados, info_cantidades
 
 
+def elegir_ubicacion(sugerencia: str):
+    """Callback de las sugerencias de ubicación: reemplaza el texto ingresado"""
+    st.session_state.ubicacion_input = sugerencia
+
+
 def main():
     """Función principal de la app"""
     
@@ -315,16 +309,17 @@ def main():
     
     # ========== INICIALIZAR SERVICIOS CON CREDENCIALES ==========
     try:
-        bedrock = BedrockService(
-            aws_access_key_id=st.session_state.aws_access_key_id,
-            aws_secret_access_key=st.session_state.aws_secret_access_key,
-            aws_region=st.session_state.aws_region
+        servicios = init_services()
+        init_metricas()
+        # Sólo lo que depende de las credenciales es por sesión
+        bedrock = servicios.bedrock_para_sesion(
+            st.session_state,
+            st.session_state.aws_access_key_id,
+            st.session_state.aws_secret_access_key,
+            st.session_state.aws_region
         )
-        geocoding = GeocodingService()
-        scrapers = {
-            'Atomo': AtomoScraper(),
-            'Vea': VeaScraper(),
-        }
+        geocoding = servicios.geocoding
+        scrapers = servicios.scrapers
     except Exception as e:
         st.error(f"❌ Error al conectar con AWS: {str(e)}")
         st.error("Verificá que tus credenciales sean correctas y tengas acceso a Bedrock")
@@ -337,12 +332,29 @@ def main():
     with st.sidebar:
         st.header("⚙️ Configuración")
         
+        if 'ubicacion_input' not in st.session_state:
+            st.session_state.ubicacion_input = "Guaymallén, Mendoza"
+        
         ubicacion_input = st.text_input(
             "📍 Tu ubicación",
-            value="Guaymallén, Mendoza",
+            key="ubicacion_input",
             help="Ingresá tu ubicación o punto de referencia"
         )
         
+        # Autocompletado con el gazetteer local (sin red)
+        if ubicacion_input and not geocoding.es_ubicacion_conocida(ubicacion_input):
+            sugerencias = geocoding.sugerir_ubicaciones(ubicacion_input)
+            if sugerencias:
+                st.caption("¿Quisiste decir?")
+                for sugerencia in sugerencias:
+                    st.button(
+                        sugerencia,
+                        key=f"sugerencia_{sugerencia}",
+                        on_click=elegir_ubicacion,
+                        args=(sugerencia,),
+                        use_container_width=True
+                    )
+        
         radio_km = st.slider(
             "📏 Radio de búsqueda (km)",
             min_value=1,
@@ -413,38 +425,65 @@ def main():
     # Limpiar si se presionó el botón limpiar
     if limpiar_btn:
         st.session_state.input_text = ""
+        st.session_state.pop('busqueda_activa', None)
         st.rerun()
     
-    # Ejecutar búsqueda si hay texto y se presionó Enter o botón
-    consulta = st.session_state.input_text
-    ejecutar = buscar_btn and consulta and consulta.strip()
+    # La búsqueda queda activa entre reruns: mover el radio, las cadenas o la
+    # estrategia sólo recalcula las etapas cuyas entradas cambiaron
+    if buscar_btn and st.session_state.input_text and st.session_state.input_text.strip():
+        st.session_state.busqueda_activa = st.session_state.input_text
+    
+    consulta = st.session_state.get('busqueda_activa')
+    if 'memo_busqueda' not in st.session_state:
+        st.session_state.memo_busqueda = MemoEtapas()
+    memo = st.session_state.memo_busqueda
     
-    # Procesar búsqueda (por Enter o botón)
-    if ejecutar:
-        with st.spinner("🤖 IA analizando tu consulta y calculando cantidades..."):
-            # 1. Interpretar consulta con Bedrock (ahora incluye cantidades)
-            interpretacion = bedrock.interpretar_consulta(consulta)
+    # Procesar búsqueda (por Enter, botón o búsqueda activa)
+    if consulta:
+        with st.spinner("🤖 Ubicando supermercados y analizando tu consulta con IA..."):
+            # Geocodificación y filtro por distancia en paralelo con la IA; cada
+            # producto se compara apenas el modelo lo genera
+            resultado = buscar_mejores_precios(
+                servicios,
+                bedrock,
+                consulta,
+                ubicacion_input,
+                radio_km,
+                supermercados_seleccionados,
+                memo=memo,
+                comparar=comparar_productos_en_streaming
+            )
+            ubicacion = resultado.ubicacion
+            supermercados_cercanos = resultado.supermercados_cercanos
+            interpretacion = resultado.interpretacion
+            
+            if resultado.estado == UBICACION_NO_ENCONTRADA:
+                st.error("❌ No se pudo encontrar la ubicación. Intentá con otra dirección.")
+                return
+            
+            if resultado.estado == SIN_SUPERMERCADOS:
+                st.warning(f"⚠️ No se encontraron supermercados en un radio de {radio_km}km")
+                return
             
-            if "error" in interpretacion:
+            st.success(f"✅ Ubicación: {ubicacion.direccion}")
+            st.info(f"🏪 Encontrados {len(supermercados_cercanos)} supermercados cercanos")
+            
+            if resultado.estado == ERROR_INTERPRETACION:
+                # No repetir la llamada fallida en cada rerun
+                st.session_state.pop('busqueda_activa', None)
                 st.error(f"❌ {interpretacion['error']}")
                 return
             
-            st.success("✅ Consulta interpretada correctamente por IA")
+            if resultado.estado == SIN_PRODUCTOS:
+                st.warning("No se pudieron identificar productos. Intentá ser más específico.")
+                return
             
             # Extraer información
             productos_ia = interpretacion.get("productos", [])
             personas = interpretacion.get("personas", 1)
-            evento = interpretacion.get("evento")
-            
-            # Extraer solo nombres para buscar
-            if productos_ia and isinstance(productos_ia[0], dict):
-                productos_nombres = [p.get('nombre') for p in productos_ia]
-            else:
-                productos_nombres = productos_ia
+            comparacion = resultado.comparacion
             
-            if not productos_nombres:
-                st.warning("No se pudieron identificar productos. Intentá ser más específico.")
-                return
+            st.success("✅ Consulta interpretada correctamente por IA")
             
             # Mostrar interpretación
             with st.expander("📋 Lo que entendió la IA"):
@@ -453,84 +492,32 @@ def main():
             # Mostrar cantidades calculadas por IA
             if personas and personas > 1:
                 st.markdown("### 🤖 Cantidades Calculadas por IA")
-                for prod in productos_ia:
-                    if isinstance(prod, dict):
-                        st.markdown(f"""
-                        <div class="cantidad-ia">
-                            <strong>{prod.get('nombre').title()}</strong>: {prod.get('cantidad_estimada')} {prod.get('unidad')}<br>
-                            <small>💡 {prod.get('razonamiento', 'N/A')}</small>
-                        </div>
-                        """, unsafe_allow_html=True)
-        
-        with st.spinner("📍 Ubicando supermercados cercanos..."):
-            # 2. Geocodificar ubicación
-            ubicacion = geocoding.obtener_coordenadas(ubicacion_input)
-            
-            if not ubicacion:
-                st.error("❌ No se pudo encontrar la ubicación. Intentá con otra dirección.")
-                return
+                st.markdown("\n".join(
+                    f'<div class="cantidad-ia"><strong>{escape(prod.get("nombre").title())}</strong>: '
+                    f'{escape(str(prod.get("cantidad_estimada")))} {escape(str(prod.get("unidad")))}<br>'
+                    f'<small>💡 {escape(str(prod.get("razonamiento", "N/A")))}</small></div>'
+                    for prod in productos_ia if isinstance(prod, dict)
+                ), unsafe_allow_html=True)
             
-            st.success(f"✅ Ubicación: {ubicacion.direccion}")
-            
-            # 3. Filtrar supermercados por distancia
-            todos_supermercados = obtener_supermercados_mendoza()
-            supermercados_cercanos = geocoding.filtrar_por_distancia(
-                ubicacion,
-                todos_supermercados,
-                max_distancia_km=radio_km
-            )
+            # 4. Mostrar tabla comparativa
+            with span("render", seccion="tabla"):
+                mostrar_tabla_comparativa(comparacion)
             
-            # Filtrar por selección del usuario
-            supermercados_cercanos = [
-                s for s in supermercados_cercanos 
-                if any(nombre in s.nombre for nombre in supermercados_seleccionados)
-            ]
-            
-            if not supermercados_cercanos:
-                st.warning(f"⚠️ No se encontraron supermercados en un radio de {radio_km}km")
-                return
-            
-            st.info(f"🏪 Encontrados {len(supermercados_cercanos)} supermercados cercanos")
-        
-        with st.spinner("💰 Comparando precios producto por producto..."):
-            # 4. NUEVA LÓGICA: Comparar cada producto entre todos los supermercados
-            comparacion = comparar_productos_entre_supermercados(
-                productos_ia,
-                supermercados_cercanos,
-                scrapers,
-                supermercados_seleccionados,
-                geocoding
-            )
-            
-            # 5. Mostrar tabla comparativa
-            mostrar_tabla_comparativa(comparacion)
-            
-            # 6. Generar y mostrar lista de compra optimizada
-            lista_compra_opt, total_opt, super_unico, total_unico = generar_recomendacion_compra(comparacion)
+            # 5. Mostrar lista de compra optimizada
+            lista_compra_opt, total_opt = resultado.lista_compra, resultado.total_optimizado
+            super_unico, total_unico = resultado.super_unico, resultado.total_unico
             
             if not lista_compra_opt:
                 st.error("❌ No se encontraron productos en ningún supermercado")
                 return
             
-            mostrar_lista_compra_optimizada(lista_compra_opt, total_opt, super_unico, total_unico)
+            with span("render", seccion="lista"):
+                mostrar_lista_compra_optimizada(lista_compra_opt, total_opt, super_unico, total_unico)
         
         # Mapa
         st.markdown("---")
         st.header("🗺️ Mapa de Supermercados")
         
-        # Crear mapa centrado en ubicación del usuario
-        mapa = folium.Map(
-            location=[ubicacion.latitud, ubicacion.longitud],
-            zoom_start=13
-        )
-        
-        # Marcar ubicación del usuario
-        folium.Marker(
-            [ubicacion.latitud, ubicacion.longitud],
-            popup="Tu ubicación",
-            icon=folium.Icon(color='red', icon='home')
-        ).add_to(mapa)
-        
         # Determinar qué lista usar para el mapa
         estrategia = st.session_state.get('estrategia_seleccionada', '🚗 Todo en un solo supermercado (más cómodo)')
         
@@ -539,23 +526,14 @@ def main():
         else:
             lista_mapa = lista_compra_opt
         
-        # Marcar supermercados de la lista de compra
-        for super_nombre, datos in lista_mapa.items():
-            super_obj = next((s for s in supermercados_cercanos if s.nombre == super_nombre), None)
-            
-            if super_obj:
-                # Verde si tiene más productos, azul si tiene menos
-                num_productos = len(datos['productos'])
-                max_productos = max(len(d['productos']) for d in lista_mapa.values())
-                color = 'green' if num_productos == max_productos else 'blue'
-                
-                folium.Marker(
-                    [super_obj.latitud, super_obj.longitud],
-                    popup=f"{super_nombre}<br>{num_productos} productos<br>${datos['total']:,.2f}<br>{datos['distancia_km']} km",
-                    icon=folium.Icon(color=color, icon='shopping-cart')
-                ).add_to(mapa)
-        
-        folium_static(mapa, width=1200, height=600)
+        # El HTML se reusa mientras no cambien la ubicación ni los marcadores
+        with span("render", seccion="mapa"):
+            mostrar_mapa(
+                (ubicacion.latitud, ubicacion.longitud),
+                marcadores_lista_compra(lista_mapa, supermercados_cercanos),
+                ancho=1200,
+                alto=600
+            )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,345 @@
+"""
+Comparación masiva de listas de compra desde la terminal
+
+Pensado para correr de noche sobre cientos de canastas (ej: un índice de
+precios). Los términos se deduplican entre todas las listas y cada
+(cadena, término) se busca una sola vez, en paralelo y a través del cache de
+precios; después se arma la lista de compra óptima de cada canasta y los
+resultados se van escribiendo a medida que salen.
+
+Uso:
+
+    python -m src.canastas canastas.jsonl -o resultados.csv --ubicacion "Godoy Cruz" --radio 5
+    python -m src.canastas canastas.csv -o resultados.parquet --workers 16 --cadenas Atomo Vea
+
+Formatos de entrada:
+
+    JSONL: {"id": "basica", "productos": ["yerba", {"nombre": "carne", "cantidad_estimada": 2, "unidad": "kg"}]}
+           {"id": "asado", "consulta": "asado para 10"}      (se interpreta con Bedrock, en lotes)
+    CSV:   id,producto,cantidad,unidad   (una fila por producto)  o  id,consulta
+
+Parquet necesita pyarrow (`pip install pyarrow`).
+"""
+import argparse
+import csv
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config.config import DEFAULT_LOCATION, MAX_DISTANCE_KM
+from src.models.models import Producto
+from src.scrapers.cache_precios import clave_termino
+from src.services.comparacion import comparar_producto, generar_recomendacion_compra
+from src.services.contenedor import ContenedorServicios
+from src.utils.metricas import obtener_metricas
+
+COLUMNAS = [
+    "id", "productos", "encontrados", "total_optimizado", "supermercados_optimizado",
+    "super_unico", "total_unico", "faltantes_unico", "error"
+]
+
+FILAS_POR_GRUPO_PARQUET = 500
+
+
+def leer_canastas(ruta: Path) -> List[Dict]:
+    """
+    Lee las canastas de un CSV o JSONL
+
+    Una línea o fila mal formada no corta la lectura: su canasta queda con
+    "error" y sale así en los resultados.
+
+    Returns:
+        Lista de {"id", "productos"} o {"id", "consulta"} (más "error" si
+        hubo problemas), en el orden del archivo
+    """
+    if ruta.suffix.lower() in (".jsonl", ".json"):
+        canastas = []
+        with open(ruta, encoding="utf-8") as f:
+            for numero, linea in enumerate(f, start=1):
+                if not linea.strip():
+                    continue
+                try:
+                    registro = json.loads(linea)
+                except ValueError as e:
+                    registro = {"error": f"Línea {numero}: JSON inválido ({e})"}
+                if not isinstance(registro, dict):
+                    registro = {"error": f"Línea {numero}: se esperaba un objeto JSON"}
+                registro.setdefault("id", str(numero))
+                canastas.append(registro)
+        return canastas
+
+    por_id: Dict[str, Dict] = {}
+    with open(ruta, encoding="utf-8", newline="") as f:
+        for numero, fila in enumerate(csv.DictReader(f), start=2):
+            id_canasta = (fila.get("id") or "").strip()
+            canasta = por_id.setdefault(id_canasta, {"id": id_canasta})
+            if fila.get("consulta"):
+                canasta["consulta"] = fila["consulta"].strip()
+            elif fila.get("producto"):
+                producto = {"nombre": fila["producto"].strip()}
+                if fila.get("cantidad"):
+                    try:
+                        producto["cantidad_estimada"] = float(fila["cantidad"].replace(",", "."))
+                    except ValueError:
+                        canasta.setdefault("error", f"Fila {numero}: cantidad inválida {fila['cantidad']!r}")
+                        continue
+                if fila.get("unidad"):
+                    producto["unidad"] = fila["unidad"].strip()
+                canasta.setdefault("productos", []).append(producto)
+    return list(por_id.values())
+
+
+def _normalizar_productos(productos: Iterable) -> List[Dict]:
+    """Acepta nombres sueltos o dicts con el formato de la interpretación"""
+    normalizados = []
+    for producto in productos:
+        if isinstance(producto, str):
+            producto = {"nombre": producto}
+        if isinstance(producto, dict) and producto.get("nombre"):
+            normalizados.append({"cantidad_estimada": 1, "unidad": "unidades", **producto})
+    return normalizados
+
+
+class _ScraperPrecargado:
+    """Scraper que responde con los precios ya buscados (incluidos los no encontrados)"""
+
+    def __init__(self, precios: Dict[str, List[Producto]]):
+        self._precios = precios
+
+    def buscar_producto_cacheado(self, nombre_producto: str) -> List[Producto]:
+        return self._precios.get(clave_termino(nombre_producto), [])
+
+
+class EscritorCSV:
+    """Escribe una fila por canasta apenas se calcula"""
+
+    def __init__(self, ruta: Path):
+        self._archivo = open(ruta, "w", encoding="utf-8", newline="")
+        self._escritor = csv.DictWriter(self._archivo, fieldnames=COLUMNAS)
+        self._escritor.writeheader()
+
+    def escribir(self, fila: Dict):
+        self._escritor.writerow(fila)
+        self._archivo.flush()
+
+    def cerrar(self):
+        self._archivo.close()
+
+
+class EscritorParquet:
+    """Escribe en grupos de filas, sin juntar todo el resultado en memoria"""
+
+    def __init__(self, ruta: Path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("❌ Para escribir Parquet instalá pyarrow: pip install pyarrow")
+
+        self._pa = pa
+        self._esquema = pa.schema([
+            ("id", pa.string()), ("productos", pa.int32()), ("encontrados", pa.int32()),
+            ("total_optimizado", pa.float64()), ("supermercados_optimizado", pa.string()),
+            ("super_unico", pa.string()), ("total_unico", pa.float64()),
+            ("faltantes_unico", pa.string()), ("error", pa.string())
+        ])
+        self._escritor = pq.ParquetWriter(str(ruta), self._esquema)
+        self._pendientes: List[Dict] = []
+
+    def escribir(self, fila: Dict):
+        self._pendientes.append(fila)
+        if len(self._pendientes) >= FILAS_POR_GRUPO_PARQUET:
+            self._volcar()
+
+    def _volcar(self):
+        if self._pendientes:
+            self._escritor.write_table(self._pa.Table.from_pylist(self._pendientes, schema=self._esquema))
+            self._pendientes = []
+
+    def cerrar(self):
+        self._volcar()
+        self._escritor.close()
+
+
+def crear_escritor(ruta: Path, formato: Optional[str] = None):
+    """CSV o Parquet según --formato o la extensión del archivo"""
+    formato = formato or ("parquet" if ruta.suffix.lower() == ".parquet" else "csv")
+    return EscritorParquet(ruta) if formato == "parquet" else EscritorCSV(ruta)
+
+
+def interpretar_consultas(canastas: List[Dict]) -> int:
+    """
+    Convierte las canastas con "consulta" en listas de productos (Bedrock, en lotes)
+
+    Returns:
+        Cantidad de consultas interpretadas
+    """
+    con_consulta = [c for c in canastas if c.get("consulta") and not c.get("productos")]
+    if not con_consulta:
+        return 0
+
+    # Import local: sólo hace falta (con credenciales de AWS) si hay consultas
+    from src.services.bedrock_service import BedrockService
+
+    interpretaciones = BedrockService().interpretar_lote([c["consulta"] for c in con_consulta])
+    for canasta, interpretacion in zip(con_consulta, interpretaciones):
+        if "error" in interpretacion:
+            canasta["error"] = interpretacion["error"]
+        else:
+            canasta["productos"] = interpretacion.get("productos", [])
+    return len(con_consulta)
+
+
+def buscar_precios(terminos: Dict[str, str], scrapers: Dict, workers: int) -> Tuple[Dict[str, Dict], int]:
+    """
+    Busca cada (cadena, término) una sola vez, en paralelo y pasando por el cache de precios
+
+    Args:
+        terminos: Nombre a buscar por clave normalizada
+        scrapers: Scrapers de las cadenas a comparar
+        workers: Búsquedas simultáneas
+
+    Returns:
+        ({cadena: {clave: productos}}, búsquedas que fallaron)
+    """
+    precios: Dict[str, Dict] = {cadena: {} for cadena in scrapers}
+    fallidas = 0
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="canastas") as executor:
+        futuros = {
+            executor.submit(scraper.buscar_producto_cacheado, nombre): (cadena, clave)
+            for cadena, scraper in scrapers.items()
+            for clave, nombre in terminos.items()
+        }
+        for hechas, futuro in enumerate(as_completed(futuros), start=1):
+            cadena, clave = futuros[futuro]
+            try:
+                precios[cadena][clave] = futuro.result()
+            except Exception as e:
+                fallidas += 1
+                precios[cadena][clave] = []
+                print(f"⚠️ {cadena} / {clave}: {e}")
+            if hechas % 100 == 0:
+                print(f"  [{hechas}/{len(futuros)}] búsquedas")
+    return precios, fallidas
+
+
+def evaluar_canasta(canasta: Dict, cercanos: List, scrapers: Dict, cadenas: List[str], geocoding) -> Dict:
+    """Compara los productos de una canasta y arma su fila de resultado"""
+    fila = {columna: None for columna in COLUMNAS}
+    fila["id"] = canasta["id"]
+    if canasta.get("error"):
+        fila["error"] = canasta["error"]
+        return fila
+
+    productos = _normalizar_productos(canasta.get("productos", []))
+    fila["productos"] = len(productos)
+    if not productos:
+        fila["error"] = "Canasta sin productos"
+        return fila
+
+    comparacion = {
+        producto["nombre"]: comparar_producto(producto, cercanos, scrapers, cadenas, geocoding)
+        for producto in productos
+    }
+    lista_compra, total_optimizado, super_unico, total_unico = generar_recomendacion_compra(comparacion)
+    nombre_unico, datos_unico = next(iter(super_unico.items()))
+
+    fila.update({
+        "encontrados": sum(len(datos["productos"]) for datos in lista_compra.values()),
+        "total_optimizado": round(total_optimizado, 2),
+        "supermercados_optimizado": " | ".join(lista_compra),
+        "super_unico": nombre_unico,
+        "total_unico": round(total_unico, 2) if total_unico != float("inf") else None,
+        "faltantes_unico": " | ".join(datos_unico.get("productos_faltantes", []))
+    })
+    return fila
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Compara muchas listas de compra en paralelo")
+    parser.add_argument("entrada", type=Path, help="Canastas en CSV o JSONL")
+    parser.add_argument("-o", "--salida", type=Path, required=True, help="Resultados (.csv o .parquet)")
+    parser.add_argument("--formato", choices=["csv", "parquet"], default=None)
+    parser.add_argument("--ubicacion", default=DEFAULT_LOCATION)
+    parser.add_argument("--radio", type=float, default=MAX_DISTANCE_KM, help="Radio en km")
+    parser.add_argument("--cadenas", nargs="+", default=None, help="Cadenas a comparar (todas por defecto)")
+    parser.add_argument("--workers", type=int, default=8, help="Búsquedas de precios simultáneas")
+    parser.add_argument("--metricas", type=Path, default=None,
+                        help="Guarda los tiempos por etapa (.json, o texto de Prometheus con otra extensión)")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    servicios = ContenedorServicios()
+    cadenas = args.cadenas or list(servicios.scrapers)
+    scrapers = {c: servicios.scrapers[c] for c in cadenas if c in servicios.scrapers}
+    if not scrapers:
+        raise SystemExit(f"❌ Ninguna cadena soportada en {cadenas} (disponibles: {list(servicios.scrapers)})")
+
+    ubicacion = servicios.geocoding.obtener_coordenadas(args.ubicacion)
+    if not ubicacion:
+        raise SystemExit(f"❌ No se pudo geocodificar '{args.ubicacion}'")
+    cercanos = servicios.geocoding.filtrar_por_distancia(
+        ubicacion, servicios.indice_supermercados, max_distancia_km=args.radio, cadenas=list(scrapers)
+    )
+    if not cercanos:
+        raise SystemExit(f"❌ No hay supermercados a menos de {args.radio} km de {ubicacion.direccion}")
+
+    # 1. Leer e interpretar
+    canastas = leer_canastas(args.entrada)
+    interpretadas = interpretar_consultas(canastas)
+    t_lectura = time.perf_counter()
+
+    # 2. Deduplicar términos entre todas las canastas
+    terminos: Dict[str, str] = {}
+    menciones = 0
+    for canasta in canastas:
+        if canasta.get("error"):
+            continue
+        for producto in _normalizar_productos(canasta.get("productos", [])):
+            menciones += 1
+            terminos.setdefault(clave_termino(producto["nombre"]), producto["nombre"])
+    print(f"🧺 {len(canastas)} canastas, {menciones} productos, {len(terminos)} términos únicos, "
+          f"{len(cercanos)} sucursales cercanas")
+
+    # 3. Una búsqueda por (cadena, término)
+    precios, fallidas = buscar_precios(terminos, scrapers, args.workers)
+    precargados = {cadena: _ScraperPrecargado(precios[cadena]) for cadena in scrapers}
+    t_precios = time.perf_counter()
+
+    # 4. Optimizar cada canasta y escribir a medida que sale
+    escritor = crear_escritor(args.salida, args.formato)
+    errores = 0
+    try:
+        for canasta in canastas:
+            try:
+                fila = evaluar_canasta(canasta, cercanos, precargados, list(scrapers), servicios.geocoding)
+            except Exception as e:
+                # Una canasta con datos raros no frena las demás
+                fila = {columna: None for columna in COLUMNAS}
+                fila.update(id=canasta.get("id"), error=f"{type(e).__name__}: {e}")
+            errores += fila["error"] is not None
+            escritor.escribir(fila)
+    finally:
+        escritor.cerrar()
+    fin = time.perf_counter()
+
+    busquedas = len(terminos) * len(scrapers)
+    print(f"📊 {len(canastas)} canastas en {fin - inicio:.1f}s "
+          f"({len(canastas) / max(fin - inicio, 1e-9):.1f} canastas/s)")
+    print(f"   lectura + interpretación: {t_lectura - inicio:.1f}s ({interpretadas} consultas con IA)")
+    print(f"   precios: {busquedas} búsquedas en {t_precios - t_lectura:.1f}s "
+          f"({busquedas / max(t_precios - t_lectura, 1e-9):.1f}/s, {fallidas} fallidas; "
+          f"sin deduplicar serían {menciones * len(scrapers)})")
+    print(f"   optimización: {fin - t_precios:.2f}s, {errores} canastas con error")
+    print(f"✅ Resultados en {args.salida}")
+
+    if args.metricas:
+        _, cuerpo = obtener_metricas().exportar("json" if args.metricas.suffix == ".json" else "prometheus")
+        args.metricas.write_bytes(cuerpo)
+        print(f"📈 Métricas en {args.metricas}")
+
+
+if __name__ == "__main__":
+    main()
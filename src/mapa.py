@@ -0,0 +1,179 @@
+"""
+Mapa de supermercados con el HTML renderizado en cache
+
+Armar un folium.Map y serializarlo a un documento Leaflet completo cuesta
+decenas de milisegundos, y como folium genera ids nuevos en cada render, el
+iframe se recargaba en cada rerun aunque nada hubiera cambiado. Acá el HTML
+se guarda por (ubicación, marcadores): mientras esos no cambien se reusa el
+mismo texto y el navegador no vuelve a dibujar el mapa. Con muchos
+marcadores se mandan como una sola capa GeoJSON agrupada con MarkerCluster.
+"""
+import hashlib
+import json
+import threading
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from config.config import MAPA_CACHE_MAX_ITEMS, MAPA_CACHE_TTL, MAPA_UMBRAL_CLUSTER
+from src.utils.cache_memoria import CacheLRU
+from src.utils.metricas import span
+
+
+class Marcador(NamedTuple):
+    """Un supermercado en el mapa"""
+    latitud: float
+    longitud: float
+    popup: str
+    color: str = "blue"
+    icono: str = "shopping-cart"
+
+
+def marcadores_lista_compra(lista_mapa: Dict, supermercados_cercanos: List) -> List[Marcador]:
+    """
+    Marcadores de los supermercados de una lista de compra
+
+    Args:
+        lista_mapa: {supermercado: {'productos', 'total', 'distancia_km'}}
+        supermercados_cercanos: Supermercados con coordenadas
+
+    Returns:
+        Un marcador por supermercado (verde los que tienen más productos)
+    """
+    if not lista_mapa:
+        return []
+
+    por_nombre = {s.nombre: s for s in supermercados_cercanos}
+    max_productos = max(len(d['productos']) for d in lista_mapa.values())
+    marcadores = []
+    for super_nombre, datos in lista_mapa.items():
+        super_obj = por_nombre.get(super_nombre)
+        if super_obj is None:
+            continue
+        num_productos = len(datos['productos'])
+        marcadores.append(Marcador(
+            super_obj.latitud,
+            super_obj.longitud,
+            f"{super_nombre}<br>{num_productos} productos<br>${datos['total']:,.2f}<br>{datos['distancia_km']} km",
+            'green' if num_productos == max_productos else 'blue'
+        ))
+    return marcadores
+
+
+def clave_mapa(centro: Tuple[float, float], marcadores: Sequence[Marcador], alto: int) -> str:
+    """Clave del HTML: ubicación (redondeada a ~1 m) + marcadores + alto"""
+    datos = [round(centro[0], 5), round(centro[1], 5), alto, [list(m) for m in marcadores]]
+    return hashlib.sha256(json.dumps(datos, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def geojson_marcadores(marcadores: Sequence[Marcador]) -> str:
+    """FeatureCollection compacta con un punto por marcador (popup, color e ícono van en las propiedades)"""
+    return json.dumps({
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [m.longitud, m.latitud]},
+                "properties": {"popup": m.popup, "color": m.color, "icono": m.icono}
+            }
+            for m in marcadores
+        ]
+    }, ensure_ascii=False, separators=(",", ":"))
+
+
+def _estilo_marcador(feature: Dict) -> Dict:
+    """Opciones del ícono de cada punto de la capa GeoJSON (mismos colores que los marcadores sueltos)"""
+    propiedades = feature["properties"]
+    return {"markerColor": propiedades["color"], "icon": propiedades["icono"]}
+
+
+def construir_html(centro: Tuple[float, float], marcadores: Sequence[Marcador], alto: int = 600,
+                   umbral_cluster: int = MAPA_UMBRAL_CLUSTER) -> str:
+    """
+    Renderiza el mapa a un documento HTML
+
+    Args:
+        centro: (latitud, longitud) del usuario
+        marcadores: Supermercados a marcar
+        alto: Alto del mapa en píxeles
+        umbral_cluster: A partir de cuántos marcadores se agrupan
+
+    Returns:
+        HTML completo (Leaflet) listo para un iframe
+    """
+    import folium
+    from folium.plugins import MarkerCluster
+
+    mapa = folium.Map(location=list(centro), zoom_start=13)
+
+    # Marcar ubicación del usuario
+    folium.Marker(
+        list(centro),
+        popup="Tu ubicación",
+        icon=folium.Icon(color='red', icon='home')
+    ).add_to(mapa)
+
+    if len(marcadores) > umbral_cluster:
+        # Una sola capa GeoJSON en vez de un objeto JS por marcador
+        cluster = MarkerCluster(name="Supermercados").add_to(mapa)
+        folium.GeoJson(
+            geojson_marcadores(marcadores),
+            marker=folium.Marker(icon=folium.Icon()),
+            style_function=_estilo_marcador,
+            popup=folium.GeoJsonPopup(fields=["popup"], labels=False)
+        ).add_to(cluster)
+    else:
+        for marcador in marcadores:
+            folium.Marker(
+                [marcador.latitud, marcador.longitud],
+                popup=marcador.popup,
+                icon=folium.Icon(color=marcador.color, icon=marcador.icono)
+            ).add_to(mapa)
+
+    return folium.Figure(height=alto).add_child(mapa).render()
+
+
+class CacheMapas:
+    """HTML de mapas renderizados, compartido por todas las sesiones"""
+
+    def __init__(self, max_items: int = MAPA_CACHE_MAX_ITEMS, ttl: float = MAPA_CACHE_TTL):
+        self._cache = CacheLRU(max_items, ttl)
+        self.renders = 0
+
+    def html(self, centro: Tuple[float, float], marcadores: Sequence[Marcador], alto: int = 600) -> str:
+        """HTML del mapa, renderizándolo sólo si cambió la ubicación o los marcadores"""
+        with span("mapa", cluster=len(marcadores) > MAPA_UMBRAL_CLUSTER) as medicion:
+            clave = clave_mapa(centro, marcadores, alto)
+            encontrado, html = self._cache.obtener(clave)
+            medicion.etiquetar(cache="hit" if encontrado else "miss")
+            if not encontrado:
+                html = construir_html(centro, marcadores, alto)
+                self._cache.guardar(clave, html)
+                self.renders += 1
+            return html
+
+    def estadisticas(self) -> Dict:
+        return {**self._cache.estadisticas(), "renders": self.renders}
+
+
+_cache_mapas: Optional[CacheMapas] = None
+_cache_mapas_lock = threading.Lock()
+
+
+def obtener_cache_mapas() -> CacheMapas:
+    """Cache de mapas compartido por todo el proceso"""
+    global _cache_mapas
+    if _cache_mapas is None:
+        with _cache_mapas_lock:
+            if _cache_mapas is None:
+                _cache_mapas = CacheMapas()
+    return _cache_mapas
+
+
+def mostrar_mapa(centro: Tuple[float, float], marcadores: Sequence[Marcador], ancho: int = 1200, alto: int = 600):
+    """
+    Muestra el mapa en Streamlit
+
+    El mismo HTML en cada rerun hace que el iframe no se vuelva a cargar.
+    """
+    import streamlit.components.v1 as components
+
+    components.html(obtener_cache_mapas().html(centro, marcadores, alto), width=ancho, height=alto + 10)
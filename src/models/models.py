@@ -38,8 +38,11 @@ class Supermercado(BaseModel):
     distancia_km: Optional[float] = None
     telefono: Optional[str] = None
     horarios: Optional[str] = None
+    cadena: Optional[str] = None
     
     class Config:
+        # Las sucursales del registro se comparten entre búsquedas
+        frozen = True
         json_schema_extra = {
             "example": {
                 "nombre": "Atomo Conviene",
@@ -86,6 +89,35 @@ class Ubicacion(BaseModel):
         }
 
 
+class Lugar(BaseModel):
+    """Lugar conocido del gazetteer de Mendoza"""
+    nombre: str
+    tipo: str  # provincia, departamento, distrito, barrio, calle o punto
+    latitud: float
+    longitud: float
+    departamento: Optional[str] = None
+    alias: List[str] = []
+    
+    class Config:
+        frozen = True
+        json_schema_extra = {
+            "example": {
+                "nombre": "Chacras de Coria",
+                "tipo": "distrito",
+                "departamento": "Luján de Cuyo",
+                "latitud": -32.9850,
+                "longitud": -68.8740
+            }
+        }
+    
+    @property
+    def etiqueta(self) -> str:
+        """Texto para mostrar (ej: "Chacras de Coria, Luján de Cuyo")"""
+        if self.departamento:
+            return f"{self.nombre}, {self.departamento}"
+        return self.nombre
+
+
 class ComparacionPrecios(BaseModel):
     """Resultado de comparación de precios"""
     supermercado: str
@@ -0,0 +1,184 @@
+"""
+Plantillas HTML de la comparación y de la lista de compra
+
+Antes cada tarjeta era un st.markdown con un f-string de estilos en línea:
+un mensaje al navegador por producto × supermercado. Acá cada sección se arma
+con plantillas precompiladas (str.format) que usan clases CSS compartidas y
+se manda como un único elemento. Los textos que vienen de los scrapers se
+escapan antes de insertarlos.
+"""
+from html import escape
+from typing import Dict, List
+
+CSS = (
+    ".cmp-grid{display:grid;grid-template-columns:repeat(auto-fit,minmax(220px,1fr));gap:1rem;margin:.5rem 0}"
+    ".cmp-tarjeta{background:#2a2a2a;padding:1rem;border-radius:10px;border:3px solid #666;text-align:center;min-height:250px}"
+    ".cmp-tarjeta.cmp-mejor{background:#1a3a1a;border-color:#4ade80}"
+    ".cmp-cadena{font-size:1.2rem;font-weight:bold;color:#fff;margin-bottom:.5rem}"
+    ".cmp-insignia{color:#4ade80;font-weight:bold;margin-bottom:.5rem;min-height:28px}"
+    ".cmp-producto{font-size:.85rem;color:#aaa;margin-bottom:.5rem;min-height:40px}"
+    ".cmp-unitario{font-size:.9rem;color:#999;margin-bottom:.5rem}"
+    ".cmp-subtotal{font-size:1.5rem;font-weight:bold;color:#fff;margin-bottom:.5rem}"
+    ".cmp-mejor .cmp-subtotal{color:#4ade80}"
+    ".cmp-distancia{font-size:.75rem;color:#666;margin-bottom:.5rem}"
+    ".cmp-boton{display:inline-block;background:#667eea;color:#fff!important;padding:.5rem 1rem;"
+    "border-radius:5px;text-decoration:none;font-size:.85rem;margin-top:.5rem;white-space:nowrap}"
+    ".cmp-nota{font-size:.85rem;color:#999}"
+    ".cmp-error,.cmp-aviso{padding:.8rem 1rem;border-radius:.5rem;margin:.5rem 0}"
+    ".cmp-error{background:rgba(255,43,43,.09);color:#ff6c6c}"
+    ".cmp-aviso{background:rgba(255,227,18,.1);color:#ffd16a}"
+    ".cmp-fila{display:flex;justify-content:space-between;align-items:center;background:#2a2a2a;"
+    "padding:.8rem;border-radius:5px;margin:.5rem 0;border-left:3px solid #667eea}"
+    ".cmp-fila-texto{flex:1}"
+    ".cmp-real{color:#999}"
+    ".cmp-precio{color:#4ade80;font-weight:bold}"
+    ".cmp-cu{color:#666}"
+    ".cmp-resumen{display:flex;gap:2rem;margin:.5rem 0 1rem}"
+    ".cmp-dato-titulo{font-size:.85rem;color:#999}"
+    ".cmp-dato-valor{font-size:1.6rem}"
+    ".cmp-total{background:linear-gradient(135deg,#667eea 0%,#764ba2 100%);padding:2rem;border-radius:10px;"
+    "margin:2rem 0;text-align:center;color:#fff}"
+    ".cmp-total-titulo{font-size:1.2rem;opacity:.9;margin-bottom:.5rem}"
+    ".cmp-total-valor{font-size:3rem;font-weight:bold}"
+    ".cmp-total-pie{font-size:.9rem;opacity:.8;margin-top:1rem}"
+)
+
+# Plantillas precompiladas: los valores llegan ya escapados y formateados
+_TARJETA = (
+    '<div class="cmp-tarjeta{clase_mejor}">'
+    '<div class="cmp-cadena">{cadena}</div>'
+    '<div class="cmp-insignia">{insignia}</div>'
+    '<div class="cmp-producto">{unidades}x {nombre}</div>'
+    '<div class="cmp-unitario">${precio_unitario} c/u</div>'
+    '<div class="cmp-subtotal">${subtotal}</div>'
+    '<div class="cmp-distancia">📍 {distancia_km} km • {tiempo_min} min</div>'
+    '<a class="cmp-boton" href="{url}" target="_blank">🔗 Ver producto</a>'
+    '</div>'
+).format
+
+_PRODUCTO = (
+    '<h3>🛒 {nombre}</h3>'
+    '<p><em>Necesitás: {cantidad} {unidad}</em></p>'
+    '<div class="cmp-grid">{tarjetas}</div>'
+    '{nota}<hr>'
+).format
+
+_NO_ENCONTRADO = (
+    '<h3>🛒 {titulo}</h3>'
+    '<p><em>Necesitás: {cantidad} {unidad}</em></p>'
+    '<div class="cmp-error">❌ No se encontró <strong>{nombre}</strong> en ningún supermercado</div>'
+).format
+
+_FILA = (
+    '<div class="cmp-fila"><div class="cmp-fila-texto">'
+    '<strong>{unidades}x {nombre}</strong><br>'
+    '<small class="cmp-real">{producto_real}...</small><br>'
+    '<span class="cmp-precio">${subtotal}</span>'
+    '<span class="cmp-cu"> (${precio_unitario} c/u)</span>'
+    '</div><a class="cmp-boton" href="{url}" target="_blank">🔗 Ver</a></div>'
+).format
+
+_DATO = '<div><div class="cmp-dato-titulo">{titulo}</div><div class="cmp-dato-valor">{valor}</div></div>'.format
+
+_TOTAL = (
+    '<div class="cmp-total">'
+    '<div class="cmp-total-titulo">💰 {titulo}</div>'
+    '<div class="cmp-total-valor">${total}</div>'
+    '<div class="cmp-total-pie">{pie}</div>'
+    '</div>'
+).format
+
+
+def seccion(partes: List[str]) -> str:
+    """Une las partes de una sección en un solo bloque HTML con los estilos compartidos"""
+    return f"<style>{CSS}</style>\n" + "\n".join(partes)
+
+
+def html_producto_comparado(nombre_prod: str, info: Dict) -> str:
+    """
+    Bloque de un producto en la tabla comparativa
+
+    Args:
+        nombre_prod: Nombre del producto pedido
+        info: Entrada de la comparación ('cantidad_necesaria', 'unidad', 'supermercados')
+
+    Returns:
+        Título, tarjetas de hasta 2 cadenas y supermercados sin el producto
+    """
+    cantidad, unidad = escape(str(info['cantidad_necesaria'])), escape(str(info['unidad']))
+    supermercados_info = info['supermercados'] or {}
+    supers_con_producto = {k: v for k, v in supermercados_info.items() if v is not None}
+
+    if not supers_con_producto:
+        return _NO_ENCONTRADO(
+            titulo=escape(nombre_prod.title()), nombre=escape(nombre_prod), cantidad=cantidad, unidad=unidad
+        )
+
+    # Encontrar el más barato
+    mejor_super = min(supers_con_producto, key=lambda s: supers_con_producto[s]['subtotal'])
+
+    # Agrupar por CADENA (no por sucursal específica), quedándose con la sucursal más barata
+    supers_agrupados = {}
+    for super_nombre, datos in supers_con_producto.items():
+        cadena = super_nombre.split()[0]
+        if cadena not in supers_agrupados or datos['subtotal'] < supers_agrupados[cadena][1]['subtotal']:
+            supers_agrupados[cadena] = (super_nombre, datos)
+
+    tarjetas = []
+    # Limitar a máximo 2 supermercados diferentes para comparar
+    for super_nombre, datos in list(supers_agrupados.values())[:2]:
+        es_mejor = super_nombre == mejor_super
+        nombre = datos['producto'].nombre
+        tarjetas.append(_TARJETA(
+            clase_mejor=" cmp-mejor" if es_mejor else "",
+            cadena=escape(super_nombre.split()[0]),
+            insignia="✅ MÁS BARATO" if es_mejor else "",
+            unidades=datos['unidades'],
+            nombre=escape(nombre[:50] + ("..." if len(nombre) > 50 else "")),
+            precio_unitario=f"{datos['precio_unitario']:,.2f}",
+            subtotal=f"{datos['subtotal']:,.2f}",
+            distancia_km=datos['distancia_km'],
+            tiempo_min=datos['tiempo_min'],
+            url=escape(datos.get('url') or '#')
+        ))
+
+    sin_producto = [k for k, v in supermercados_info.items() if v is None]
+    nota = f'<p class="cmp-nota">⚠️ No disponible en: {escape(", ".join(sin_producto))}</p>' if sin_producto else ""
+
+    return _PRODUCTO(
+        nombre=escape(nombre_prod.title()), cantidad=cantidad, unidad=unidad, tarjetas="".join(tarjetas), nota=nota
+    )
+
+
+def html_filas_productos(productos: List[Dict]) -> str:
+    """Filas de productos (con link) de un supermercado de la lista de compra"""
+    return "".join(
+        _FILA(
+            unidades=prod['unidades'],
+            nombre=escape(prod['nombre'].title()),
+            producto_real=escape(prod['producto_real'][:60]),
+            subtotal=f"{prod['subtotal']:,.2f}",
+            precio_unitario=f"{prod['precio_unitario']:,.2f}",
+            url=escape(prod.get('url') or '#')
+        )
+        for prod in productos
+    )
+
+
+def html_resumen_super(datos: Dict) -> str:
+    """Subtotal, cantidad de productos y distancia de un supermercado"""
+    return '<div class="cmp-resumen">' + "".join([
+        _DATO(titulo="💰 Subtotal", valor=f"${datos['total']:,.2f}"),
+        _DATO(titulo="📦 Productos", valor=len(datos['productos'])),
+        _DATO(titulo="📍 Distancia", valor=f"{datos['distancia_km']} km")
+    ]) + '</div>'
+
+
+def html_total(titulo: str, total: float, pie: str) -> str:
+    """Tarjeta con el total a pagar"""
+    return _TOTAL(titulo=escape(titulo), total=f"{total:,.2f}", pie=escape(pie))
+
+
+def html_aviso(titulo: str, texto: str) -> str:
+    """Aviso amarillo dentro de una sección"""
+    return f'<div class="cmp-aviso">⚠️ <strong>{escape(titulo)}</strong> {escape(texto)}</div>'
@@ -3,17 +3,12 @@ Scraper para Atomo Supermercado - MEJORADO
 """
 from typing import List
 import re
-import sys
-from pathlib import Path
 import json
 import requests
-from bs4 import BeautifulSoup
-
-# Agregar el directorio raíz al path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from src.scrapers.base_scraper import BaseScraper
 from src.models.models import Producto
+from src.utils.metricas import span
 
 
 class AtomoScraper(BaseScraper):
@@ -47,16 +42,19 @@ class AtomoScraper(BaseScraper):
         return f"{self.base_url}/module/ambjolisearch/jolisearch?s={query_encoded}"
     
     def _get_page_atomo(self, url: str):
-        """Obtiene página de Atomo con headers apropiados"""
+        """Descarga la página de Atomo con headers apropiados (el HTML sin parsear)"""
         try:
             print(f"🔍 Buscando en Atomo: {url}")
             
-            response = requests.get(
-                url,
-                headers=self.headers,
-                timeout=15,
-                allow_redirects=True
-            )
+            with span("scraping_red", cadena=self.nombre_supermercado) as medicion:
+                response = requests.get(
+                    url,
+                    headers=self.headers,
+                    timeout=15,
+                    allow_redirects=True
+                )
+                if response.status_code != 200:
+                    medicion.etiquetar(resultado=f"http_{response.status_code}")
             
             if response.status_code == 403:
                 print(f"⚠️ Atomo bloqueó la petición (403 Forbidden)")
@@ -66,7 +64,7 @@ class AtomoScraper(BaseScraper):
                 print(f"⚠️ Error {response.status_code} al acceder a Atomo")
                 return None
             
-            return BeautifulSoup(response.content, 'html.parser')
+            return response.content
             
         except requests.exceptions.RequestException as e:
             print(f"❌ Error de conexión con Atomo: {e}")
@@ -86,12 +84,23 @@ class AtomoScraper(BaseScraper):
             Lista de productos encontrados
         """
         url = self.obtener_url_busqueda(nombre_producto)
-        soup = self._get_page_atomo(url)
+        contenido = self._get_page_atomo(url)
         
-        if not soup:
+        if not contenido:
             print(f"⚠️ No se pudo acceder a Atomo para '{nombre_producto}'")
             return []
         
+        with span("scraping_parseo", cadena=self.nombre_supermercado) as medicion:
+            productos = self._extraer_productos(contenido, nombre_producto)
+            medicion.etiquetar(resultado="ok" if productos else "vacio")
+        return productos
+    
+    def _extraer_productos(self, contenido: bytes, nombre_producto: str) -> List[Producto]:
+        """Parsea la página de resultados de Atomo"""
+        # bs4 tarda en importarse: recién con la primera página
+        from bs4 import BeautifulSoup
+        
+        soup = BeautifulSoup(contenido, 'html.parser')
         productos = []
         
         # Buscar productos en la página - PrestaShop structure
@@ -2,20 +2,18 @@
 Scraper base para todos los supermercados
 """
 from abc import ABC, abstractmethod
-from typing import List, Optional
-import requests
-from bs4 import BeautifulSoup
+from typing import TYPE_CHECKING, List, Optional
 import time
 import random
-import sys
-from pathlib import Path
 import unicodedata  # para normalizar acentos, etc.
 
-# Agregar el directorio raíz al path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
-
 from config.config import USER_AGENTS, REQUEST_TIMEOUT, SCRAPING_DELAY
 from src.models.models import Producto
+from src.scrapers.cache_precios import obtener_cache_precios
+from src.utils.metricas import span
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
 
 __all__ = ["BaseScraper", "_matches", "_norm"]  # útil si lo importás desde app.py
 
@@ -69,6 +67,10 @@ class BaseScraper(ABC):
     """Clase base abstracta para todos los scrapers"""
 
     def __init__(self, nombre_supermercado: str):
+        # requests se carga con el primer scraper (el módulo también lo importan
+        # servicios que sólo usan los helpers de matching)
+        import requests
+        
         self.nombre_supermercado = nombre_supermercado
         self.session = requests.Session()
         self.headers = {
@@ -77,13 +79,18 @@ class BaseScraper(ABC):
             "Accept-Language": "es-AR,es;q=0.9",
         }
 
-    def _get_page(self, url: str) -> Optional[BeautifulSoup]:
+    def _get_page(self, url: str) -> Optional["BeautifulSoup"]:
         """Obtiene y parsea una página web"""
+        import requests
+        from bs4 import BeautifulSoup
+        
         try:
-            response = self.session.get(url, headers=self.headers, timeout=REQUEST_TIMEOUT)
-            response.raise_for_status()
+            with span("scraping_red", cadena=self.nombre_supermercado):
+                response = self.session.get(url, headers=self.headers, timeout=REQUEST_TIMEOUT)
+                response.raise_for_status()
             time.sleep(SCRAPING_DELAY)
-            return BeautifulSoup(response.text, "html.parser")
+            with span("scraping_parseo", cadena=self.nombre_supermercado):
+                return BeautifulSoup(response.text, "html.parser")
         except requests.exceptions.RequestException as e:
             print(f"Error obteniendo {url}: {e}")
             return None
@@ -93,6 +100,13 @@ class BaseScraper(ABC):
         """Busca un producto específico"""
         pass
 
+    def buscar_producto_cacheado(self, nombre_producto: str) -> List[Producto]:
+        """
+        Igual que buscar_producto, pero pasando por el cache de precios compartido
+        (TTL CACHE_TTL) y sin repetir búsquedas que ya están en curso
+        """
+        return obtener_cache_precios().buscar(self, nombre_producto)
+
     @abstractmethod
     def obtener_url_busqueda(self, query: str) -> str:
         """Construye la URL de búsqueda"""
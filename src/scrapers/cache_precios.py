@@ -0,0 +1,111 @@
+"""
+Cache de resultados de búsqueda por (cadena, término), compartido por todo el proceso
+
+Además de guardar resultados durante CACHE_TTL, une búsquedas simultáneas del
+mismo término en la misma cadena (single-flight): si el prefetch especulativo
+ya está buscando "yerba" en Vea, la comparación espera ese resultado en lugar
+de repetir el request.
+"""
+import re
+import threading
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from config.config import CACHE_TTL, PRECIOS_CACHE_MAX_ITEMS
+from src.models.models import Producto
+from src.utils.cache_memoria import CacheLRU
+from src.utils.metricas import span
+from src.utils.texto import normalizar
+
+if TYPE_CHECKING:
+    from src.scrapers.base_scraper import BaseScraper
+
+
+def clave_termino(termino: str) -> str:
+    """Término normalizado y en singular simple ("Gaseosas" y "gaseosa" comparten entrada)"""
+    return " ".join(re.sub(r"s$", "", palabra) for palabra in normalizar(termino).split())
+
+
+class CachePrecios:
+    """Resultados de buscar_producto por cadena y término"""
+
+    def __init__(self, max_items: int = PRECIOS_CACHE_MAX_ITEMS, ttl: float = CACHE_TTL):
+        self._cache = CacheLRU(max_items, ttl)
+        self._en_vuelo: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def buscar(self, scraper: "BaseScraper", termino: str) -> List[Producto]:
+        """
+        Devuelve los productos del cache o busca (una sola vez por clave a la vez)
+
+        Args:
+            scraper: Scraper de la cadena
+            termino: Término de búsqueda
+
+        Returns:
+            Lista de productos encontrados
+        """
+        termino_normalizado = clave_termino(termino)
+        with span("scraping", cadena=scraper.nombre_supermercado, termino=termino_normalizado) as medicion:
+            productos = self._buscar(scraper, termino, f"{scraper.nombre_supermercado}:{termino_normalizado}", medicion)
+            medicion.etiquetar(resultado="ok" if productos else "vacio")
+            return productos
+
+    def _buscar(self, scraper: "BaseScraper", termino: str, clave: str, medicion) -> List[Producto]:
+        encontrado, productos = self._cache.obtener(clave)
+        if encontrado:
+            medicion.etiquetar(cache="hit")
+            return list(productos)
+
+        with self._lock:
+            futuro = self._en_vuelo.get(clave)
+            propio = futuro is None
+            if propio:
+                futuro = Future()
+                self._en_vuelo[clave] = futuro
+
+        if not propio:
+            # Otra búsqueda de la misma clave ya está en curso
+            medicion.etiquetar(cache="compartido")
+            return list(futuro.result())
+
+        medicion.etiquetar(cache="miss")
+        try:
+            productos = scraper.buscar_producto(termino)
+            # Sin resultados puede ser un error de red: no se guarda
+            if productos:
+                self._cache.guardar(clave, productos)
+            futuro.set_result(productos)
+            return list(productos)
+        except Exception as e:
+            futuro.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._en_vuelo[clave]
+
+    def en_vuelo(self) -> int:
+        """Búsquedas en curso"""
+        with self._lock:
+            return len(self._en_vuelo)
+
+    def estadisticas(self) -> Dict:
+        """Métricas del cache (aciertos, fallos, tasa, items)"""
+        return self._cache.estadisticas()
+
+    def limpiar(self):
+        self._cache.limpiar()
+
+
+_cache_precios: Optional[CachePrecios] = None
+_cache_precios_lock = threading.Lock()
+
+
+def obtener_cache_precios() -> CachePrecios:
+    """Cache de precios compartido por todo el proceso"""
+    global _cache_precios
+    if _cache_precios is None:
+        with _cache_precios_lock:
+            if _cache_precios is None:
+                _cache_precios = CachePrecios()
+    return _cache_precios
@@ -3,15 +3,54 @@ Scrapers simulados para demo (reemplazar con scrapers reales en producción)
 """
 from typing import List
 import random
-import sys
-from pathlib import Path
-
-# Agregar el directorio raíz al path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from src.scrapers.base_scraper import BaseScraper
 from src.models.models import Producto
 
+# Precios base simulados (Argentina, Oct 2025)
+PRECIOS_BASE = {
+    "arroz": 1200,
+    "aceite": 2500,
+    "yerba": 3500,
+    "azucar": 1100,
+    "leche": 900,
+    "pan": 800,
+    "fideos": 850,
+    "harina": 950,
+    "sal": 400,
+    "cafe": 4500,
+    "te": 1200,
+    "galletitas": 1500,
+    "manteca": 2000,
+    "queso": 5500,
+    "jamon": 4800,
+    "huevos": 3200,
+    "pollo": 3500,
+    "carne": 8500,
+    "hamburguesa": 5500,
+    "salchicha": 1300,
+    "pancho": 1200,
+    "gaseosa": 2800,
+    "cerveza": 1500,
+    "vino": 4500,
+    "agua": 600,
+    "jugo": 1800,
+    "papas": 950,
+    "tomate": 1200,
+    "lechuga": 800,
+    "cebolla": 650,
+    "zanahoria": 700,
+    "manzana": 1100,
+    "banana": 850,
+    "naranja": 950,
+    "limpieza": 2200,
+    "detergente": 2500,
+    "jabon": 1400,
+    "shampoo": 3200,
+    "pasta_dental": 1900,
+    "papel_higienico": 3500,
+}
+
 
 class MockScraper(BaseScraper):
     """Scraper simulado para demo"""
@@ -19,50 +58,7 @@ class MockScraper(BaseScraper):
     def __init__(self, nombre_supermercado: str, factor_precio: float = 1.0):
         super().__init__(nombre_supermercado)
         self.factor_precio = factor_precio  # Multiplicador de precio base
-        
-        # Precios base simulados (Argentina, Oct 2025)
-        self.precios_base = {
-            "arroz": 1200,
-            "aceite": 2500,
-            "yerba": 3500,
-            "azucar": 1100,
-            "leche": 900,
-            "pan": 800,
-            "fideos": 850,
-            "harina": 950,
-            "sal": 400,
-            "cafe": 4500,
-            "te": 1200,
-            "galletitas": 1500,
-            "manteca": 2000,
-            "queso": 5500,
-            "jamon": 4800,
-            "huevos": 3200,
-            "pollo": 3500,
-            "carne": 8500,
-            "hamburguesa": 5500,
-            "salchicha": 1300,
-            "pancho": 1200,
-            "gaseosa": 2800,
-            "cerveza": 1500,
-            "vino": 4500,
-            "agua": 600,
-            "jugo": 1800,
-            "papas": 950,
-            "tomate": 1200,
-            "lechuga": 800,
-            "cebolla": 650,
-            "zanahoria": 700,
-            "manzana": 1100,
-            "banana": 850,
-            "naranja": 950,
-            "limpieza": 2200,
-            "detergente": 2500,
-            "jabon": 1400,
-            "shampoo": 3200,
-            "pasta_dental": 1900,
-            "papel_higienico": 3500,
-        }
+        self.precios_base = PRECIOS_BASE
     
     def obtener_url_busqueda(self, query: str) -> str:
         """Mock URL"""
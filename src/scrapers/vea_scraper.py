@@ -3,15 +3,12 @@ Scraper REAL para Supermercados Vea - USA API DE VTEX
 """
 from typing import List
 import re
-import sys
-from pathlib import Path
 import json
 import requests
 
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
-
 from src.scrapers.base_scraper import BaseScraper
 from src.models.models import Producto
+from src.utils.metricas import span
 
 
 class VeaScraper(BaseScraper):
@@ -106,94 +103,22 @@ class VeaScraper(BaseScraper):
         print(f"🔍 Buscando '{nombre_producto}' en Vea API: {url_api}")
         
         try:
-            response = requests.get(
-                url_api,
-                headers=self.headers,
-                timeout=10
-            )
+            with span("scraping_red", cadena=self.nombre_supermercado) as medicion:
+                response = requests.get(
+                    url_api,
+                    headers=self.headers,
+                    timeout=10
+                )
+                if response.status_code != 200:
+                    medicion.etiquetar(resultado=f"http_{response.status_code}")
             
             if response.status_code != 200:
                 print(f"⚠️ Error {response.status_code} al acceder a la API de Vea")
                 return []
             
-            data = response.json()
-            
-            # La API devuelve la estructura: {"products": [...]}
-            productos_data = data.get('products', [])
-            
-            if not productos_data:
-                print(f"⚠️ No se encontraron productos para '{nombre_producto}' en Vea")
-                return []
-            
-            print(f"✅ Encontrados {len(productos_data)} productos en Vea API")
-            
-            productos = []
-            
-            for idx, item in enumerate(productos_data[:10]):  # Limitar a 10
-                try:
-                    # Extraer datos de la API
-                    product_name = item.get('productName', '')
-                    
-                    if not product_name:
-                        continue
-                    
-                    nombre = self._limpiar_nombre(product_name)
-                    
-                    # Obtener precio - VTEX guarda en centavos
-                    items = item.get('items', [])
-                    if not items:
-                        continue
-                    
-                    first_item = items[0]
-                    sellers = first_item.get('sellers', [])
-                    
-                    if not sellers:
-                        continue
-                    
-                    # Obtener precio del primer seller
-                    seller = sellers[0]
-                    commercial_offer = seller.get('commertialOffer', {})
-                    
-                    precio_centavos = commercial_offer.get('Price', 0)
-                    
-                    if precio_centavos <= 0:
-                        # Intentar con ListPrice
-                        precio_centavos = commercial_offer.get('ListPrice', 0)
-                    
-                    if precio_centavos <= 0:
-                        continue
-                    
-                    # Convertir a pesos (viene en formato de centavos o pesos según la API)
-                    # Si es mayor a 10000, probablemente está en centavos
-                    precio = precio_centavos
-                    
-                    # Construir URL del producto
-                    link_text = item.get('linkText', '')
-                    url_producto = f"{self.base_url}/{link_text}/p" if link_text else None
-                    
-                    # Extraer marca
-                    marca = self._extraer_marca(item)
-                    
-                    producto = Producto(
-                        nombre=nombre,
-                        precio=precio,
-                        supermercado=self.nombre_supermercado,
-                        url=url_producto,
-                        marca=marca
-                    )
-                    
-                    productos.append(producto)
-                    print(f"  ✓ {nombre}: ${precio:,.2f}")
-                    
-                except Exception as e:
-                    print(f"⚠️ Error parseando producto {idx+1}: {e}")
-                    continue
-            
-            if not productos:
-                print(f"❌ No se pudieron extraer productos válidos de Vea API")
-            else:
-                print(f"✅ Procesados {len(productos)} productos de Vea API")
-            
+            with span("scraping_parseo", cadena=self.nombre_supermercado) as medicion:
+                productos = self._extraer_productos(response.json(), nombre_producto)
+                medicion.etiquetar(resultado="ok" if productos else "vacio")
             return productos
             
         except requests.exceptions.RequestException as e:
@@ -204,4 +129,84 @@ class VeaScraper(BaseScraper):
             return []
         except Exception as e:
             print(f"❌ Error inesperado en Vea scraper: {e}")
-            return []
\ No newline at end of file
+            return []
+    
+    def _extraer_productos(self, data: dict, nombre_producto: str) -> List[Producto]:
+        """Convierte la respuesta de la API de VTEX en productos"""
+        # La API devuelve la estructura: {"products": [...]}
+        productos_data = data.get('products', [])
+        
+        if not productos_data:
+            print(f"⚠️ No se encontraron productos para '{nombre_producto}' en Vea")
+            return []
+        
+        print(f"✅ Encontrados {len(productos_data)} productos en Vea API")
+        
+        productos = []
+        
+        for idx, item in enumerate(productos_data[:10]):  # Limitar a 10
+            try:
+                # Extraer datos de la API
+                product_name = item.get('productName', '')
+                
+                if not product_name:
+                    continue
+                
+                nombre = self._limpiar_nombre(product_name)
+                
+                # Obtener precio - VTEX guarda en centavos
+                items = item.get('items', [])
+                if not items:
+                    continue
+                
+                first_item = items[0]
+                sellers = first_item.get('sellers', [])
+                
+                if not sellers:
+                    continue
+                
+                # Obtener precio del primer seller
+                seller = sellers[0]
+                commercial_offer = seller.get('commertialOffer', {})
+                
+                precio_centavos = commercial_offer.get('Price', 0)
+                
+                if precio_centavos <= 0:
+                    # Intentar con ListPrice
+                    precio_centavos = commercial_offer.get('ListPrice', 0)
+                
+                if precio_centavos <= 0:
+                    continue
+                
+                # Convertir a pesos (viene en formato de centavos o pesos según la API)
+                # Si es mayor a 10000, probablemente está en centavos
+                precio = precio_centavos
+                
+                # Construir URL del producto
+                link_text = item.get('linkText', '')
+                url_producto = f"{self.base_url}/{link_text}/p" if link_text else None
+                
+                # Extraer marca
+                marca = self._extraer_marca(item)
+                
+                producto = Producto(
+                    nombre=nombre,
+                    precio=precio,
+                    supermercado=self.nombre_supermercado,
+                    url=url_producto,
+                    marca=marca
+                )
+                
+                productos.append(producto)
+                print(f"  ✓ {nombre}: ${precio:,.2f}")
+                
+            except Exception as e:
+                print(f"⚠️ Error parseando producto {idx+1}: {e}")
+                continue
+        
+        if not productos:
+            print(f"❌ No se pudieron extraer productos válidos de Vea API")
+        else:
+            print(f"✅ Procesados {len(productos)} productos de Vea API")
+        
+        return productos
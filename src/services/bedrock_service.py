@@ -1,21 +1,153 @@
 """
 Servicio de AWS Bedrock para IA conversacional
 """
+import copy
 import json
-import boto3
-from typing import List, Dict, Optional
-from botocore.exceptions import ClientError
-
-import sys
-from pathlib import Path
-sys.path.append(str(Path(__file__).parent.parent.parent))
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 
 from config.config import (
     AWS_ACCESS_KEY_ID,
     AWS_SECRET_ACCESS_KEY,
     AWS_REGION,
-    BEDROCK_MODEL_ID
+    BEDROCK_MODEL_ID,
+    BEDROCK_ENDPOINT_URL,
+    BEDROCK_LOTE_TAMANO,
+    BEDROCK_LOTE_PARALELO,
+    BEDROCK_RECOMENDACION_MAX_TOKENS_ENTRADA,
+    BEDROCK_CACHE_TTL,
+    BEDROCK_CACHE_MAX_ITEMS,
+    BEDROCK_CACHE_PERSISTENTE,
+    BEDROCK_CACHE_FILE
 )
+from src.services.interprete_local import interpretar_local
+from src.services.llamadas_bedrock import obtener_llamador_bedrock
+from src.services.plantillas_eventos import obtener_plantillas_eventos
+from src.services.pool_bedrock import obtener_pool_bedrock
+from src.services.resumen_comparaciones import ajustar_a_presupuesto, resumir_comparaciones
+from src.services.vocabulario import analizar_dominio
+from src.utils.cache_disco import CacheDisco
+from src.utils.cache_memoria import CacheLRU
+from src.utils.json_incremental import ParserProductosIncremental
+from src.utils.metricas import span
+from src.utils.texto import normalizar
+from src.utils.tokens import estimar_tokens, json_compacto
+
+
+# Reglas y ejemplos compartidos por el prompt individual y el de lotes
+REGLAS_CANTIDADES = """REGLAS PARA CALCULAR CANTIDADES:
+- Para BEBIDAS: estimar ~0.5L por persona (más en eventos sociales)
+- Para CARNES/HAMBURGUESAS: estimar ~200-250g por persona
+- Para PAN: estimar 2-3 unidades por persona
+- Para SNACKS: estimar ~100g por persona
+- Para TORTA: estimar ~150g por porción
+- Para EVENTOS: aumentar 20-30% por las dudas
+- Si NO menciona personas, asumir 1 unidad de cada producto
+
+Ejemplos:
+1. "quiero comprar arroz, aceite y yerba"
+{
+    "productos": [
+        {"nombre": "arroz", "cantidad_estimada": 1, "unidad": "kg", "razonamiento": "1 persona, consumo estándar"},
+        {"nombre": "aceite", "cantidad_estimada": 1, "unidad": "litros", "razonamiento": "1 persona, consumo estándar"},
+        {"nombre": "yerba", "cantidad_estimada": 1, "unidad": "kg", "razonamiento": "1 persona, consumo estándar"}
+    ],
+    "evento": null,
+    "personas": 1,
+    "preferencias": null
+}
+
+2. "cumpleaños para 30 personas"
+{
+    "productos": [
+        {"nombre": "gaseosas", "cantidad_estimada": 20, "unidad": "litros", "razonamiento": "30 personas × 0.5L + 30% extra = ~20L"},
+        {"nombre": "panchos", "cantidad_estimada": 40, "unidad": "unidades", "razonamiento": "30 personas × 1.3 = ~40 panchos"},
+        {"nombre": "hamburguesas", "cantidad_estimada": 35, "unidad": "unidades", "razonamiento": "30 personas × 1.2 = ~35 hamburguesas"},
+        {"nombre": "pan", "cantidad_estimada": 70, "unidad": "unidades", "razonamiento": "30 personas × 2.5 = ~70 panes"},
+        {"nombre": "papas fritas", "cantidad_estimada": 3, "unidad": "kg", "razonamiento": "30 personas × 100g = 3kg"},
+        {"nombre": "torta", "cantidad_estimada": 5, "unidad": "kg", "razonamiento": "30 personas × 150g = 4.5kg ≈ 5kg"}
+    ],
+    "evento": "cumpleaños",
+    "personas": 30,
+    "preferencias": null
+}
+
+3. "asado para 10 personas"
+{
+    "productos": [
+        {"nombre": "carne", "cantidad_estimada": 3, "unidad": "kg", "razonamiento": "10 personas × 300g = 3kg"},
+        {"nombre": "chorizo", "cantidad_estimada": 2, "unidad": "kg", "razonamiento": "10 personas × 200g = 2kg"},
+        {"nombre": "pan", "cantidad_estimada": 20, "unidad": "unidades", "razonamiento": "10 personas × 2 = 20 panes"},
+        {"nombre": "cerveza", "cantidad_estimada": 15, "unidad": "litros", "razonamiento": "10 personas × 1.5L (asado) = 15L"},
+        {"nombre": "gaseosas", "cantidad_estimada": 5, "unidad": "litros", "razonamiento": "10 personas × 0.5L = 5L"}
+    ],
+    "evento": "asado",
+    "personas": 10,
+    "preferencias": null
+}
+
+4. "picada para 8 personas"
+{
+    "productos": [
+        {"nombre": "queso", "cantidad_estimada": 1, "unidad": "kg", "razonamiento": "8 personas × 120g = 1kg aprox"},
+        {"nombre": "salame", "cantidad_estimada": 0.5, "unidad": "kg", "razonamiento": "8 personas × 60g = 0.5kg"},
+        {"nombre": "jamón", "cantidad_estimada": 0.4, "unidad": "kg", "razonamiento": "8 personas × 50g = 0.4kg"},
+        {"nombre": "aceitunas", "cantidad_estimada": 0.5, "unidad": "kg", "razonamiento": "8 personas × 60g = 0.5kg"},
+        {"nombre": "maní", "cantidad_estimada": 0.3, "unidad": "kg", "razonamiento": "8 personas × 40g = 0.3kg"},
+        {"nombre": "papas fritas", "cantidad_estimada": 1, "unidad": "kg", "razonamiento": "8 personas × 120g = 1kg"},
+        {"nombre": "vino", "cantidad_estimada": 3, "unidad": "litros", "razonamiento": "8 personas × 0.4L = 3L aprox"},
+        {"nombre": "gaseosas", "cantidad_estimada": 4, "unidad": "litros", "razonamiento": "8 personas × 0.5L = 4L"}
+    ],
+    "evento": "picada",
+    "personas": 8,
+    "preferencias": null
+}"""
+
+
+_cache_interpretaciones: Optional[CacheLRU] = None
+_cache_lock = threading.Lock()
+
+
+def obtener_cache_interpretaciones() -> CacheLRU:
+    """Cache de interpretaciones compartido por todas las instancias del proceso"""
+    global _cache_interpretaciones
+    if _cache_interpretaciones is None:
+        with _cache_lock:
+            if _cache_interpretaciones is None:
+                disco = CacheDisco(BEDROCK_CACHE_FILE, tabla="interpretaciones") if BEDROCK_CACHE_PERSISTENTE else None
+                _cache_interpretaciones = CacheLRU(BEDROCK_CACHE_MAX_ITEMS, BEDROCK_CACHE_TTL, disco=disco)
+    return _cache_interpretaciones
+
+
+def normalizar_consulta(mensaje: str) -> str:
+    """Clave de cache de una consulta: sin acentos, emojis ni puntuación"""
+    return " ".join(re.findall(r"\w+", normalizar(mensaje)))
+
+
+def validar_interpretacion(interpretacion: Dict) -> bool:
+    """Verifica que una interpretación tenga el esquema que pide el prompt"""
+    productos = interpretacion.get("productos") if isinstance(interpretacion, dict) else None
+    if not isinstance(productos, list) or not productos:
+        return False
+    for producto in productos:
+        if not isinstance(producto, dict) or not isinstance(producto.get("nombre"), str):
+            return False
+        cantidad = producto.get("cantidad_estimada")
+        if isinstance(cantidad, bool) or not isinstance(cantidad, (int, float)) or cantidad <= 0:
+            return False
+        if not isinstance(producto.get("unidad"), str):
+            return False
+    personas = interpretacion.get("personas")
+    return personas is None or (isinstance(personas, int) and personas >= 1)
+
+
+def _resultado_interpretacion(interpretacion: Dict) -> str:
+    """Etiqueta de resultado para las métricas: "ok" o el tipo de error"""
+    return interpretacion.get("tipo", "error") if "error" in interpretacion else "ok"
 
 
 class BedrockService:
@@ -37,57 +169,56 @@ class BedrockService:
         secret_key = aws_secret_access_key or os.getenv('AWS_SECRET_ACCESS_KEY', AWS_SECRET_ACCESS_KEY)
         region = aws_region or os.getenv('AWS_REGION', AWS_REGION)
         
-        self.client = boto3.client(
-            service_name='bedrock-runtime',
-            region_name=region,
-            aws_access_key_id=access_key,
-            aws_secret_access_key=secret_key
+        # Clientes compartidos entre reruns y sesiones (crear uno es caro); se
+        # crea ya para que un error de configuración aparezca al iniciar
+        self._datos_cliente = (
+            access_key, secret_key, region, os.getenv('BEDROCK_ENDPOINT_URL', BEDROCK_ENDPOINT_URL) or None
         )
+        obtener_pool_bedrock().obtener(*self._datos_cliente)
         self.model_id = BEDROCK_MODEL_ID
         self.conversation_history = []
+        self.cache = obtener_cache_interpretaciones()
+        self.plantillas = obtener_plantillas_eventos()
+        self.llamador = obtener_llamador_bedrock()
+        self._lock_lote = threading.Lock()
     
-    def _validar_dominio(self, mensaje: str) -> bool:
+    @property
+    def client(self):
+        """
+        Cliente del pool, pedido en cada uso
+        
+        El servicio puede vivir en session_state más que el cliente: si el pool
+        descartó el cliente por inactividad, se crea uno nuevo.
+        """
+        return obtener_pool_bedrock().obtener(*self._datos_cliente)
+    
+    def _validar_dominio(self, mensaje: str) -> Tuple[bool, List[str]]:
         """
         Valida que el mensaje esté dentro del dominio permitido
         
+        Una sola pasada de un patrón precompilado, sin acentos y aceptando
+        plurales: sirve a la vez para validar y para detectar productos.
+        
         Args:
             mensaje: Mensaje del usuario
             
         Returns:
-            True si está en el dominio, False si no
+            (True si está en el dominio, productos mencionados)
         """
-        # Palabras que indican que es consulta de supermercado
-        palabras_clave_validas = [
-            "precio", "compra", "supermercado", "producto", 
-            "ubicación", "distancia", "cerca", "barato",
-            "comparar", "lista", "evento", "cumpleaños", "cumple",
-            "asado", "cena", "comida", "bebida", "quiero", "necesito",
-            "picada", "desayuno", "almuerzo", "merienda", "comer",
-            "cocinar", "preparar", "hacer", "fiesta", "reunión",
-            "niños", "personas", "gente", "familia", "amigos",
-            "semanal", "mensual", "diario", "compras", "romántica",
-            "completo", "ingredientes", "receta"
-        ]
-        
-        # Productos comunes de supermercado (más flexible)
-        productos_supermercado = [
-            "arroz", "aceite", "yerba", "azucar", "sal", "pan", "leche",
-            "fideos", "pasta", "harina", "cafe", "te", "galletitas",
-            "carne", "pollo", "pescado", "hamburguesa", "salchicha", "pancho",
-            "chorizo", "gaseosa", "coca", "sprite", "cerveza", "vino",
-            "agua", "jugo", "papa", "tomate", "lechuga", "cebolla",
-            "huevo", "queso", "manteca", "jamon", "mortadela",
-            "sopa", "caldo", "pure", "mayonesa", "ketchup", "mostaza",
-            "detergente", "jabon", "shampoo", "papel", "servilleta",
-            "salame", "aceitunas", "maní", "almendras", "frutas",
-            "verduras", "snack", "chips", "galletas", "dulce"
-        ]
-        
-        mensaje_lower = mensaje.lower()
-        
         # Si tiene alguna palabra clave O algún producto, es válido
-        return (any(palabra in mensaje_lower for palabra in palabras_clave_validas) or
-                any(producto in mensaje_lower for producto in productos_supermercado))
+        return analizar_dominio(mensaje)
+    
+    def detectar_productos(self, mensaje: str) -> List[str]:
+        """
+        Productos conocidos mencionados en el mensaje (pistas para el prefetch)
+        
+        Args:
+            mensaje: Mensaje del usuario
+            
+        Returns:
+            Productos en el orden en que aparecen, sin repetir
+        """
+        return self._validar_dominio(mensaje)[1]
     
     def interpretar_consulta(self, mensaje: str) -> Dict:
         """
@@ -99,8 +230,114 @@ class BedrockService:
         Returns:
             Diccionario con productos (con cantidades estimadas), evento, personas, etc.
         """
+        interpretacion = {"error": "No se pudo interpretar la consulta", "tipo": "error_parseo"}
+        for tipo, valor in self.interpretar_consulta_stream(mensaje):
+            if tipo == "interpretacion":
+                interpretacion = valor
+        return interpretacion
+    
+    def interpretar_consulta_stream(self, mensaje: str) -> Iterator[Tuple[str, Dict]]:
+        """
+        Igual que interpretar_consulta, pero va entregando cada producto apenas
+        el modelo termina de generarlo, así la búsqueda de precios puede
+        arrancar mientras el LLM sigue escribiendo el resto.
+        
+        Args:
+            mensaje: Consulta del usuario
+            
+        Yields:
+            ("producto", dict) por cada producto y al final ("interpretacion", dict)
+            con la respuesta completa (o el error)
+        """
+        with span("interpretacion") as medicion:
+            interpretacion = self._interpretacion_sin_llm(mensaje)
+            if interpretacion is not None:
+                medicion.etiquetar(origen="sin_llm", resultado=_resultado_interpretacion(interpretacion))
+                yield from self._emitir_completa(interpretacion)
+                return
+            
+            medicion.etiquetar(origen="llm")
+            for tipo, valor in self._interpretar_con_llm(mensaje):
+                if tipo == "interpretacion":
+                    medicion.etiquetar(resultado=_resultado_interpretacion(valor))
+                yield tipo, valor
+    
+    def _interpretar_con_llm(self, mensaje: str) -> Iterator[Tuple[str, Dict]]:
+        """Parte de interpretar_consulta_stream que llama al modelo"""
+        # Sólo se llega acá con un cliente creado (botocore ya cargado)
+        from botocore.exceptions import ClientError
+        
+        clave_cache = self._clave_cache(mensaje)
+        try:
+            cuerpo = json.dumps({
+                "anthropic_version": "bedrock-2023-05-31",
+                "max_tokens": 1024,
+                "messages": [
+                    {
+                        "role": "user",
+                        "content": self._prompt_interpretacion(mensaje)
+                    }
+                ],
+                "temperature": 0.5
+            })
+            # El cupo del modelo y el plazo duran hasta leer el último evento
+            eventos = self.llamador.llamar_stream(
+                lambda: self.client.invoke_model_with_response_stream(modelId=self.model_id, body=cuerpo),
+                self.model_id
+            )
+            
+            parser = ParserProductosIncremental()
+            with closing(eventos):
+                for evento in eventos:
+                    if 'chunk' not in evento:
+                        # Errores del stream (throttling, validación, etc.)
+                        raise RuntimeError(f"Error en el stream de Bedrock: {list(evento)}")
+                    
+                    chunk = json.loads(evento['chunk']['bytes'])
+                    if chunk.get('type') == 'content_block_delta':
+                        for producto in parser.alimentar(chunk['delta'].get('text', '')):
+                            yield "producto", producto
+            
+            # Extraer JSON del contenido
+            json_match = re.search(r'\{.*\}', parser.texto, re.DOTALL)
+            try:
+                resultado = json.loads(json_match.group()) if json_match else None
+            except json.JSONDecodeError:
+                resultado = None
+            
+            # Sólo se cachea (y se aprende) lo que tiene el esquema esperado
+            if validar_interpretacion(resultado):
+                self.cache.guardar(clave_cache, resultado)
+                self.plantillas.aprender(mensaje, resultado)
+                yield "interpretacion", copy.deepcopy(resultado)
+                return
+            
+            yield "interpretacion", {"error": "No se pudo interpretar la consulta", "tipo": "error_parseo"}
+            
+        except TimeoutError as e:
+            print(f"Timeout en Bedrock: {e}")
+            yield "interpretacion", {"error": "El servicio de IA tardó demasiado, probá de nuevo", "tipo": "error_timeout"}
+        except ClientError as e:
+            print(f"Error en Bedrock: {e}")
+            yield "interpretacion", {"error": "Error al procesar la consulta", "tipo": "error_servicio"}
+        except Exception as e:
+            print(f"Error inesperado: {e}")
+            yield "interpretacion", {"error": str(e), "tipo": "error_inesperado"}
+    
+    def _clave_cache(self, mensaje: str) -> str:
+        return f"{self.model_id}:{normalizar_consulta(mensaje)}"
+    
+    def _interpretacion_sin_llm(self, mensaje: str) -> Optional[Dict]:
+        """
+        Todo lo que se puede responder sin llamar al modelo: fuera de dominio,
+        intérprete local, cache y plantillas de eventos
+        
+        Returns:
+            Interpretación (o error de dominio), o None si hace falta el LLM
+        """
         # Validar dominio
-        if not self._validar_dominio(mensaje):
+        en_dominio, _ = self._validar_dominio(mensaje)
+        if not en_dominio:
             return {
                 "error": "🛒 Solo puedo ayudarte con compras de supermercado.\n\n"
                         "Puedo:\n"
@@ -112,7 +349,155 @@ class BedrockService:
                 "tipo": "fuera_de_dominio"
             }
         
-        prompt = f"""Sos un asistente experto en compras de supermercado en Argentina. 
+        # Listas simples de productos ("yerba y café") no necesitan al LLM
+        interpretacion = interpretar_local(mensaje)
+        if interpretacion is not None:
+            print(f"⚡ Interpretación local: {[p['nombre'] for p in interpretacion['productos']]}")
+            return interpretacion
+        
+        # Consultas repetidas (ej: los ejemplos rápidos) salen del cache
+        encontrado, interpretacion = self.cache.obtener(self._clave_cache(mensaje))
+        if encontrado:
+            print(f"💾 Interpretación desde cache ({self.cache.estadisticas()['tasa_aciertos']:.0%} aciertos)")
+            return copy.deepcopy(interpretacion)
+        
+        # Mismo evento con otra cantidad de personas: se reescala una respuesta anterior
+        interpretacion = self.plantillas.interpretar(mensaje)
+        if interpretacion is not None:
+            print(f"📐 Interpretación desde plantilla de {interpretacion['evento']} ({interpretacion['personas']} personas)")
+            return interpretacion
+        
+        return None
+    
+    def interpretar_lote(
+        self,
+        consultas: List[str],
+        tamano_lote: int = BEDROCK_LOTE_TAMANO,
+        max_paralelo: int = BEDROCK_LOTE_PARALELO
+    ) -> List[Dict]:
+        """
+        Interpreta muchas consultas juntas (precálculo de canastas, listas subidas)
+        
+        Las repetidas se interpretan una vez; las que se resuelven sin LLM
+        (local, cache, plantillas) no se envían. El resto va en lotes de
+        `tamano_lote` consultas por llamada, con las reglas y ejemplos del
+        prompt una sola vez por lote. Las respuestas que faltan o no cumplen
+        el esquema se reintentan de a una con interpretar_consulta.
+        
+        Args:
+            consultas: Consultas de los usuarios
+            tamano_lote: Consultas por llamada al modelo
+            max_paralelo: Lotes en vuelo a la vez
+            
+        Returns:
+            Una interpretación (o error) por consulta, en el mismo orden
+        """
+        inicio = time.monotonic()
+        por_clave: Dict[str, Dict] = {}
+        pendientes: Dict[str, str] = {}
+        
+        for consulta in consultas:
+            clave = normalizar_consulta(consulta)
+            if clave in por_clave or clave in pendientes:
+                continue
+            interpretacion = self._interpretacion_sin_llm(consulta)
+            if interpretacion is not None:
+                por_clave[clave] = interpretacion
+            else:
+                pendientes[clave] = consulta
+        
+        sin_llm = len(por_clave)
+        claves = list(pendientes)
+        lotes = [claves[i:i + tamano_lote] for i in range(0, len(claves), tamano_lote)]
+        tokens = {"entrada": 0, "salida": 0}
+        
+        def procesar(lote: List[str]) -> Dict[str, Optional[Dict]]:
+            textos = [pendientes[c] for c in lote]
+            respuesta = self._invocar_lote(textos)
+            uso = respuesta.get('usage', {})
+            with self._lock_lote:
+                tokens["entrada"] += uso.get('input_tokens', 0)
+                tokens["salida"] += uso.get('output_tokens', 0)
+            resultados = self._separar_lote(respuesta['content'][0]['text'], len(lote))
+            return dict(zip(lote, resultados))
+        
+        with ThreadPoolExecutor(max_workers=max_paralelo) as executor:
+            futuros = [(lote, executor.submit(procesar, lote)) for lote in lotes]
+            for lote, futuro in futuros:
+                try:
+                    resultados = futuro.result()
+                except Exception as e:
+                    print(f"Error en lote de {len(lote)} consultas: {e}")
+                    resultados = {}
+                for clave in lote:
+                    interpretacion = resultados.get(clave)
+                    if interpretacion is None:
+                        # Fuera del esquema o lote caído: se pide sola
+                        interpretacion = self.interpretar_consulta(pendientes[clave])
+                    else:
+                        self.cache.guardar(self._clave_cache(pendientes[clave]), interpretacion)
+                        self.plantillas.aprender(pendientes[clave], interpretacion)
+                        interpretacion = copy.deepcopy(interpretacion)
+                    por_clave[clave] = interpretacion
+        
+        duracion = time.monotonic() - inicio
+        print(f"📦 Lote: {len(consultas)} consultas ({len(por_clave)} únicas, {sin_llm} sin LLM) "
+              f"en {len(lotes)} llamadas, {tokens['entrada']}+{tokens['salida']} tokens, {duracion:.1f}s")
+        return [copy.deepcopy(por_clave[normalizar_consulta(c)]) for c in consultas]
+    
+    def _invocar_lote(self, consultas: List[str]) -> Dict:
+        """Una llamada al modelo con varias consultas indexadas"""
+        cuerpo = json.dumps({
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": min(8192, 700 * len(consultas)),
+            "messages": [
+                {
+                    "role": "user",
+                    "content": self._prompt_lote(consultas)
+                }
+            ],
+            "temperature": 0.5
+        })
+        return self.llamador.llamar(
+            lambda: json.loads(self.client.invoke_model(modelId=self.model_id, body=cuerpo)['body'].read()),
+            self.model_id
+        )
+    
+    @staticmethod
+    def _separar_lote(texto: str, cantidad: int) -> List[Optional[Dict]]:
+        """
+        Reparte la respuesta de un lote por índice
+        
+        Returns:
+            Lista de `cantidad` interpretaciones; None donde falte o no sea válida
+        """
+        resultados: List[Optional[Dict]] = [None] * cantidad
+        json_match = re.search(r'\{.*\}', texto, re.DOTALL)
+        if not json_match:
+            return resultados
+        try:
+            datos = json.loads(json_match.group())
+        except json.JSONDecodeError:
+            return resultados
+        
+        for item in datos.get("resultados", []) if isinstance(datos, dict) else []:
+            if not isinstance(item, dict):
+                continue
+            indice = item.pop("indice", None)
+            if isinstance(indice, int) and 0 <= indice < cantidad and validar_interpretacion(item):
+                resultados[indice] = item
+        return resultados
+    
+    @staticmethod
+    def _emitir_completa(interpretacion: Dict) -> Iterator[Tuple[str, Dict]]:
+        """Emite una interpretación ya completa con el mismo formato que el stream"""
+        for producto in interpretacion.get("productos", []):
+            yield "producto", producto
+        yield "interpretacion", interpretacion
+    
+    def _prompt_interpretacion(self, mensaje: str) -> str:
+        """Prompt que le pide al modelo la interpretación en JSON"""
+        return f"""Sos un asistente experto en compras de supermercado en Argentina. 
 
 Tu tarea es extraer información estructurada de la consulta del usuario E INTELIGENTEMENTE calcular las cantidades necesarias.
 
@@ -133,134 +518,112 @@ Extrae la siguiente información en formato JSON:
     "preferencias": "preferencias especiales si las menciona"
 }}
 
-REGLAS PARA CALCULAR CANTIDADES:
-- Para BEBIDAS: estimar ~0.5L por persona (más en eventos sociales)
-- Para CARNES/HAMBURGUESAS: estimar ~200-250g por persona
-- Para PAN: estimar 2-3 unidades por persona
-- Para SNACKS: estimar ~100g por persona
-- Para TORTA: estimar ~150g por porción
-- Para EVENTOS: aumentar 20-30% por las dudas
-- Si NO menciona personas, asumir 1 unidad de cada producto
+{REGLAS_CANTIDADES}
 
-Ejemplos:
-1. "quiero comprar arroz, aceite y yerba"
-{{
-    "productos": [
-        {{"nombre": "arroz", "cantidad_estimada": 1, "unidad": "kg", "razonamiento": "1 persona, consumo estándar"}},
-        {{"nombre": "aceite", "cantidad_estimada": 1, "unidad": "litros", "razonamiento": "1 persona, consumo estándar"}},
-        {{"nombre": "yerba", "cantidad_estimada": 1, "unidad": "kg", "razonamiento": "1 persona, consumo estándar"}}
-    ],
-    "evento": null,
-    "personas": 1,
-    "preferencias": null
-}}
+SÉ INTELIGENTE: ajusta las cantidades según el contexto (tipo de evento, cultura argentina, etc.)
 
-2. "cumpleaños para 30 personas"
-{{
-    "productos": [
-        {{"nombre": "gaseosas", "cantidad_estimada": 20, "unidad": "litros", "razonamiento": "30 personas × 0.5L + 30% extra = ~20L"}},
-        {{"nombre": "panchos", "cantidad_estimada": 40, "unidad": "unidades", "razonamiento": "30 personas × 1.3 = ~40 panchos"}},
-        {{"nombre": "hamburguesas", "cantidad_estimada": 35, "unidad": "unidades", "razonamiento": "30 personas × 1.2 = ~35 hamburguesas"}},
-        {{"nombre": "pan", "cantidad_estimada": 70, "unidad": "unidades", "razonamiento": "30 personas × 2.5 = ~70 panes"}},
-        {{"nombre": "papas fritas", "cantidad_estimada": 3, "unidad": "kg", "razonamiento": "30 personas × 100g = 3kg"}},
-        {{"nombre": "torta", "cantidad_estimada": 5, "unidad": "kg", "razonamiento": "30 personas × 150g = 4.5kg ≈ 5kg"}}
-    ],
-    "evento": "cumpleaños",
-    "personas": 30,
-    "preferencias": null
-}}
+Respondé SOLO con el JSON, sin explicaciones adicionales."""
+    
+    @staticmethod
+    def _prompt_lote(consultas: List[str]) -> str:
+        """Prompt para interpretar varias consultas en una sola llamada"""
+        listado = "\n".join(f'[{i}] "{c}"' for i, c in enumerate(consultas))
+        return f"""Sos un asistente experto en compras de supermercado en Argentina. 
 
-3. "asado para 10 personas"
-{{
-    "productos": [
-        {{"nombre": "carne", "cantidad_estimada": 3, "unidad": "kg", "razonamiento": "10 personas × 300g = 3kg"}},
-        {{"nombre": "chorizo", "cantidad_estimada": 2, "unidad": "kg", "razonamiento": "10 personas × 200g = 2kg"}},
-        {{"nombre": "pan", "cantidad_estimada": 20, "unidad": "unidades", "razonamiento": "10 personas × 2 = 20 panes"}},
-        {{"nombre": "cerveza", "cantidad_estimada": 15, "unidad": "litros", "razonamiento": "10 personas × 1.5L (asado) = 15L"}},
-        {{"nombre": "gaseosas", "cantidad_estimada": 5, "unidad": "litros", "razonamiento": "10 personas × 0.5L = 5L"}}
-    ],
-    "evento": "asado",
-    "personas": 10,
-    "preferencias": null
-}}
+Tu tarea es extraer información estructurada de CADA consulta E INTELIGENTEMENTE calcular las cantidades necesarias.
 
-4. "picada para 8 personas"
+CONSULTAS DEL LOTE:
+{listado}
+
+Respondé con un único JSON con un resultado por consulta, con su índice:
 {{
-    "productos": [
-        {{"nombre": "queso", "cantidad_estimada": 1, "unidad": "kg", "razonamiento": "8 personas × 120g = 1kg aprox"}},
-        {{"nombre": "salame", "cantidad_estimada": 0.5, "unidad": "kg", "razonamiento": "8 personas × 60g = 0.5kg"}},
-        {{"nombre": "jamón", "cantidad_estimada": 0.4, "unidad": "kg", "razonamiento": "8 personas × 50g = 0.4kg"}},
-        {{"nombre": "aceitunas", "cantidad_estimada": 0.5, "unidad": "kg", "razonamiento": "8 personas × 60g = 0.5kg"}},
-        {{"nombre": "maní", "cantidad_estimada": 0.3, "unidad": "kg", "razonamiento": "8 personas × 40g = 0.3kg"}},
-        {{"nombre": "papas fritas", "cantidad_estimada": 1, "unidad": "kg", "razonamiento": "8 personas × 120g = 1kg"}},
-        {{"nombre": "vino", "cantidad_estimada": 3, "unidad": "litros", "razonamiento": "8 personas × 0.4L = 3L aprox"}},
-        {{"nombre": "gaseosas", "cantidad_estimada": 4, "unidad": "litros", "razonamiento": "8 personas × 0.5L = 4L"}}
-    ],
-    "evento": "picada",
-    "personas": 8,
-    "preferencias": null
+    "resultados": [
+        {{
+            "indice": 0,
+            "productos": [
+                {{"nombre": "nombre del producto", "cantidad_estimada": número, "unidad": "litros/kg/unidades/paquetes", "razonamiento": "breve explicación del cálculo"}}
+            ],
+            "evento": "tipo de evento si lo menciona",
+            "personas": número de personas,
+            "preferencias": "preferencias especiales si las menciona"
+        }}
+    ]
 }}
 
-SÉ INTELIGENTE: ajusta las cantidades según el contexto (tipo de evento, cultura argentina, etc.)
+{REGLAS_CANTIDADES}
 
-Respondé SOLO con el JSON, sin explicaciones adicionales."""
+Cada consulta es independiente. SÉ INTELIGENTE: ajusta las cantidades según el contexto (tipo de evento, cultura argentina, etc.)
 
-        try:
-            response = self.client.invoke_model(
-                modelId=self.model_id,
-                body=json.dumps({
-                    "anthropic_version": "bedrock-2023-05-31",
-                    "max_tokens": 1024,
-                    "messages": [
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ],
-                    "temperature": 0.5
-                })
-            )
-            
-            response_body = json.loads(response['body'].read())
-            contenido = response_body['content'][0]['text']
-            
-            # Extraer JSON del contenido
-            import re
-            json_match = re.search(r'\{.*\}', contenido, re.DOTALL)
-            if json_match:
-                resultado = json.loads(json_match.group())
-                return resultado
-            
-            return {"error": "No se pudo interpretar la consulta", "tipo": "error_parseo"}
-            
-        except ClientError as e:
-            print(f"Error en Bedrock: {e}")
-            return {"error": "Error al procesar la consulta", "tipo": "error_servicio"}
-        except Exception as e:
-            print(f"Error inesperado: {e}")
-            return {"error": str(e), "tipo": "error_inesperado"}
+Respondé SOLO con el JSON, sin explicaciones adicionales."""
     
     def generar_recomendacion(
         self, 
-        comparaciones: List[Dict],
+        comparaciones: Union[List[Dict], Dict[str, Dict]],
         ubicacion: str
     ) -> str:
         """
         Genera una recomendación basada en las comparaciones de precios
         
+        Las comparaciones se resumen (totales, distancias y mayores ahorros)
+        y se recortan para respetar BEDROCK_RECOMENDACION_MAX_TOKENS_ENTRADA.
+        
         Args:
-            comparaciones: Lista de comparaciones por supermercado
+            comparaciones: Lista de comparaciones por supermercado (o el dict
+                de comparar_productos_entre_supermercados)
             ubicacion: Ubicación del usuario
             
         Returns:
             Texto con la recomendación
         """
-        prompt = f"""Sos un asistente de compras inteligente. Analizá los siguientes datos y generá una recomendación CONCISA y ACCIONABLE.
+        plantilla = self._prompt_recomendacion(ubicacion, "")
+        presupuesto_datos = BEDROCK_RECOMENDACION_MAX_TOKENS_ENTRADA - estimar_tokens(plantilla)
+        
+        resumen = ajustar_a_presupuesto(resumir_comparaciones(comparaciones), presupuesto_datos)
+        prompt = self._prompt_recomendacion(ubicacion, json_compacto(resumen))
+        
+        tokens_estimados = estimar_tokens(prompt)
+        recorte = f", {resumen['omitidos']} supers omitidos" if resumen["omitidos"] else ""
+        print(f"🧮 Recomendación: ~{tokens_estimados} tokens de entrada "
+              f"(presupuesto {BEDROCK_RECOMENDACION_MAX_TOKENS_ENTRADA}{recorte})")
+
+        cuerpo = json.dumps({
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": 512, "messages": [
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            "temperature": 0.5
+        })
+
+        try:
+            # La lectura del cuerpo va dentro de la llamada: un corte a mitad también se reintenta
+            response_body = self.llamador.llamar(
+                lambda: json.loads(
+                    self.client.invoke_model(modelId=self.model_id, body=cuerpo)['body'].read()
+                ),
+                self.model_id
+            )
+            uso = response_body.get('usage', {})
+            if uso:
+                print(f"🧮 Recomendación: {uso.get('input_tokens')} tokens de entrada, "
+                      f"{uso.get('output_tokens')} de salida")
+            return response_body['content'][0]['text'].strip()
+            
+        except Exception as e:
+            print(f"Error generando recomendación: {e}")
+            return "Error al generar recomendación"
+    
+    @staticmethod
+    def _prompt_recomendacion(ubicacion: str, datos: str) -> str:
+        """Prompt de recomendación con los datos ya resumidos (JSON minificado)"""
+        return f"""Sos un asistente de compras inteligente. Analizá los siguientes datos y generá una recomendación CONCISA y ACCIONABLE.
 
 UBICACIÓN DEL USUARIO: {ubicacion}
 
-COMPARACIÓN DE PRECIOS:
-{json.dumps(comparaciones, indent=2, ensure_ascii=False)}
+COMPARACIÓN DE PRECIOS (supers ordenados por total en $, km, min de viaje, productos encontrados; ahorros = productos con mayor diferencia de precio, con el super más barato, el segundo y el más caro):
+{datos}
 
 Tu respuesta debe:
 1. Recomendar la MEJOR opción (balance precio/distancia)
@@ -275,28 +638,22 @@ Formato de respuesta:
 [Opcional: breve comentario sobre alternativa si es relevante]
 
 NO incluyas listas de productos, solo el resumen."""
-
-        try:
-            response = self.client.invoke_model(
-                modelId=self.model_id,
-                body=json.dumps({
-                    "anthropic_version": "bedrock-2023-05-31",
-                    "max_tokens": 512, "messages": [
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ],
-                    "temperature": 0.5
-                })
-            )
-            
-            response_body = json.loads(response['body'].read())
-            return response_body['content'][0]['text'].strip()
-            
-        except Exception as e:
-            print(f"Error generando recomendación: {e}")
-            return "Error al generar recomendación"
+    
+    async def interpretar_consulta_async(self, mensaje: str) -> Dict:
+        """interpretar_consulta en el executor acotado, sin bloquear el event loop"""
+        return await self.llamador.ejecutar_async(self.interpretar_consulta, mensaje)
+    
+    async def generar_recomendacion_async(
+        self,
+        comparaciones: Union[List[Dict], Dict[str, Dict]],
+        ubicacion: str
+    ) -> str:
+        """generar_recomendacion en el executor acotado, sin bloquear el event loop"""
+        return await self.llamador.ejecutar_async(self.generar_recomendacion, comparaciones, ubicacion)
+    
+    def estadisticas_cache(self) -> Dict:
+        """Métricas del cache de interpretaciones (aciertos, fallos, tasa)"""
+        return self.cache.estadisticas()
     
     def reset_conversacion(self):
         """Resetea el historial de conversación"""
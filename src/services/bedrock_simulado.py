@@ -0,0 +1,415 @@
+"""
+Servidor local que imita a bedrock-runtime para pruebas de carga sin AWS
+
+Implementa las dos operaciones que usa BedrockService:
+
+    POST /model/{modelId}/invoke
+    POST /model/{modelId}/invoke-with-response-stream   (framing event-stream de AWS)
+
+Las interpretaciones salen del intérprete local o de plantillas por evento,
+con el mismo esquema JSON que pide el prompt (también el de lotes). La
+latencia, la velocidad de streaming y los errores (throttling, 5xx) son
+configurables.
+
+Uso:
+
+    python -m src.services.bedrock_simulado --puerto 8765 --latencia-ms 400 --tokens-por-segundo 60 \\
+        --tasa-throttling 0.05 --tasa-5xx 0.01
+
+y en el .env de la app (cualquier par de credenciales sirve, no se validan):
+
+    BEDROCK_ENDPOINT_URL=http://127.0.0.1:8765
+"""
+import argparse
+import base64
+import binascii
+import json
+import math
+import random
+import re
+import struct
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional
+
+from src.services.interprete_local import VOCABULARIO, UNIDAD_POR_DEFECTO, interpretar_local
+from src.utils.texto import normalizar
+
+# Consumo por persona de cada evento (los mismos criterios que los ejemplos del prompt)
+PLANTILLAS_EVENTOS: Dict[str, List[tuple]] = {
+    "asado": [
+        ("carne", 0.3, "kg"), ("chorizo", 0.2, "kg"), ("pan", 2, "unidades"),
+        ("cerveza", 1.5, "litros"), ("gaseosas", 0.5, "litros"),
+    ],
+    "cumpleanos": [
+        ("gaseosas", 0.65, "litros"), ("panchos", 1.3, "unidades"), ("hamburguesas", 1.2, "unidades"),
+        ("pan", 2.5, "unidades"), ("papas fritas", 0.1, "kg"), ("torta", 0.15, "kg"),
+    ],
+    "picada": [
+        ("queso", 0.12, "kg"), ("salame", 0.06, "kg"), ("jamón", 0.05, "kg"),
+        ("aceitunas", 0.06, "kg"), ("maní", 0.04, "kg"), ("papas fritas", 0.12, "kg"),
+        ("vino", 0.4, "litros"), ("gaseosas", 0.5, "litros"),
+    ],
+}
+SINONIMOS_EVENTOS = {"cumple": "cumpleanos", "cumpleanos": "cumpleanos", "asado": "asado", "picada": "picada"}
+
+CONSULTA = re.compile(r'CONSULTA DEL USUARIO: "(.*)"\n')
+CONSULTA_LOTE = re.compile(r'^\[(\d+)\] "(.*)"$', re.MULTILINE)
+PERSONAS = re.compile(r"\b(\d+)\s*(?:personas?|ninos|chicos|invitados|amigos|adultos)?\b")
+
+
+@dataclass
+class ConfiguracionSimulador:
+    """Comportamiento del servidor simulado"""
+    latencia_ms: float = 300.0  # mediana de la latencia hasta el primer byte
+    latencia_sigma: float = 0.4  # dispersión log-normal (0 = latencia fija)
+    tokens_por_segundo: float = 80.0  # velocidad del streaming (0 = sin demora)
+    tasa_throttling: float = 0.0  # proporción de requests que responden 429
+    tasa_5xx: float = 0.0  # proporción de requests que responden 500/503
+    semilla: Optional[int] = None
+
+
+# ---------------------------------------------------------------------------
+# Respuestas
+# ---------------------------------------------------------------------------
+
+def _interpretacion_por_evento(consulta: str) -> Optional[Dict]:
+    texto = normalizar(consulta)
+    evento = next((SINONIMOS_EVENTOS[p] for p in re.findall(r"\w+", texto) if p in SINONIMOS_EVENTOS), None)
+    if evento is None:
+        return None
+
+    match = PERSONAS.search(texto)
+    personas = int(match.group(1)) if match else 10
+    productos = []
+    for nombre, por_persona, unidad in PLANTILLAS_EVENTOS[evento]:
+        total = personas * por_persona
+        cantidad = math.ceil(total) if unidad == "unidades" else round(total, 1)
+        productos.append({
+            "nombre": nombre,
+            "cantidad_estimada": cantidad,
+            "unidad": unidad,
+            "razonamiento": f"{personas} personas × {por_persona:g} {unidad} = {cantidad:g} {unidad}"
+        })
+    return {"productos": productos, "evento": evento, "personas": personas, "preferencias": None}
+
+
+def _interpretacion_por_vocabulario(consulta: str) -> Dict:
+    palabras = re.findall(r"\w+", normalizar(consulta))
+    nombres = [p for p in dict.fromkeys(palabras) if p in VOCABULARIO] or ["pan"]
+    return {
+        "productos": [
+            {
+                "nombre": nombre,
+                "cantidad_estimada": 1,
+                "unidad": UNIDAD_POR_DEFECTO.get(nombre, "unidades"),
+                "razonamiento": "1 persona, consumo estándar"
+            }
+            for nombre in nombres
+        ],
+        "evento": None,
+        "personas": 1,
+        "preferencias": None
+    }
+
+
+def interpretar(consulta: str) -> Dict:
+    """Interpretación plausible de una consulta, con el esquema del prompt"""
+    return (
+        interpretar_local(consulta)
+        or _interpretacion_por_evento(consulta)
+        or _interpretacion_por_vocabulario(consulta)
+    )
+
+
+def _recomendacion(prompt: str) -> str:
+    match = re.search(r'\{"supers".*\}', prompt)
+    supers = json.loads(match.group())["supers"] if match else []
+    if not supers:
+        return "🏆 **Supermercado** es tu mejor opción"
+    mejor, caro = supers[0], supers[-1]
+    return (
+        f"🏆 **{mejor['super']}** es tu mejor opción\n"
+        f"💰 Total: ${mejor['total']:,} - Ahorrás ${caro['total'] - mejor['total']:,} vs {caro['super']}\n"
+        f"📍 A {mejor['km']} km ({mejor['min']} minutos)"
+    )
+
+
+def generar_texto(cuerpo: Dict) -> str:
+    """Texto que respondería el modelo para un request de invoke_model"""
+    prompt = cuerpo["messages"][-1]["content"]
+    if isinstance(prompt, list):
+        prompt = "".join(bloque.get("text", "") for bloque in prompt)
+
+    if "CONSULTAS DEL LOTE:" in prompt:
+        resultados = [
+            {"indice": int(indice), **interpretar(consulta)}
+            for indice, consulta in CONSULTA_LOTE.findall(prompt)
+        ]
+        return json.dumps({"resultados": resultados}, ensure_ascii=False, indent=2)
+
+    match = CONSULTA.search(prompt)
+    if match:
+        return json.dumps(interpretar(match.group(1)), ensure_ascii=False, indent=2)
+    return _recomendacion(prompt)
+
+
+def _dividir_en_tokens(texto: str) -> List[str]:
+    """Pedazos de ~4 caracteres, como los deltas de un stream real"""
+    return [texto[i:i + 4] for i in range(0, len(texto), 4)]
+
+
+# ---------------------------------------------------------------------------
+# Framing application/vnd.amazon.eventstream
+# ---------------------------------------------------------------------------
+
+def _encabezados(encabezados: Dict[str, str]) -> bytes:
+    datos = b""
+    for nombre, valor in encabezados.items():
+        nombre_b = nombre.encode("utf-8")
+        valor_b = valor.encode("utf-8")
+        # tipo 7 = string
+        datos += struct.pack(">B", len(nombre_b)) + nombre_b + b"\x07" + struct.pack(">H", len(valor_b)) + valor_b
+    return datos
+
+
+def mensaje_eventstream(encabezados: Dict[str, str], payload: bytes) -> bytes:
+    """
+    Codifica un mensaje event-stream de AWS
+
+    Formato: largo total, largo de encabezados, CRC del preludio,
+    encabezados, payload y CRC del mensaje completo.
+    """
+    datos_encabezados = _encabezados(encabezados)
+    largo_total = 12 + len(datos_encabezados) + len(payload) + 4
+    preludio = struct.pack(">II", largo_total, len(datos_encabezados))
+    preludio += struct.pack(">I", binascii.crc32(preludio) & 0xFFFFFFFF)
+    mensaje = preludio + datos_encabezados + payload
+    return mensaje + struct.pack(">I", binascii.crc32(mensaje) & 0xFFFFFFFF)
+
+
+def evento_chunk(evento: Dict) -> bytes:
+    """Evento `chunk` de invoke_model_with_response_stream (JSON en base64)"""
+    payload = json.dumps({
+        "bytes": base64.b64encode(json.dumps(evento, ensure_ascii=False).encode("utf-8")).decode("ascii")
+    }).encode("utf-8")
+    return mensaje_eventstream(
+        {":event-type": "chunk", ":content-type": "application/json", ":message-type": "event"},
+        payload
+    )
+
+
+def eventos_anthropic(texto: str, modelo: str, tokens_entrada: int) -> Iterator[Dict]:
+    """Secuencia de eventos de la Messages API para un texto dado"""
+    pedazos = _dividir_en_tokens(texto)
+    yield {
+        "type": "message_start",
+        "message": {
+            "id": f"msg_{uuid.uuid4().hex[:24]}", "type": "message", "role": "assistant",
+            "model": modelo, "content": [], "stop_reason": None,
+            "usage": {"input_tokens": tokens_entrada, "output_tokens": 1}
+        }
+    }
+    yield {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}}
+    for pedazo in pedazos:
+        yield {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": pedazo}}
+    yield {"type": "content_block_stop", "index": 0}
+    yield {"type": "message_delta", "delta": {"stop_reason": "end_turn"}, "usage": {"output_tokens": len(pedazos)}}
+    yield {"type": "message_stop"}
+
+
+# ---------------------------------------------------------------------------
+# Servidor
+# ---------------------------------------------------------------------------
+
+class ManejadorBedrock(BaseHTTPRequestHandler):
+    """Atiende /model/{id}/invoke y /model/{id}/invoke-with-response-stream"""
+
+    protocol_version = "HTTP/1.1"  # keep-alive, como el endpoint real
+    RUTA = re.compile(r"^/model/(?P<modelo>[^/]+)/(?P<operacion>invoke|invoke-with-response-stream)$")
+
+    def log_message(self, formato, *args):
+        pass
+
+    @property
+    def simulador(self) -> "ServidorBedrockSimulado":
+        return self.server
+
+    def do_GET(self):
+        if self.path == "/stats":
+            self._responder_json(200, self.simulador.estadisticas())
+        else:
+            self._responder_error(404, "ResourceNotFoundException", "Ruta desconocida")
+
+    def do_POST(self):
+        cuerpo_crudo = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        match = self.RUTA.match(self.path.split("?")[0])
+        if not match:
+            self._responder_error(404, "ResourceNotFoundException", "Ruta desconocida")
+            return
+
+        try:
+            cuerpo = json.loads(cuerpo_crudo)
+        except json.JSONDecodeError:
+            self._responder_error(400, "ValidationException", "El cuerpo no es JSON válido")
+            return
+
+        config = self.simulador.config
+        self.simulador.registrar("requests")
+        time.sleep(self.simulador.latencia())
+
+        sorteo = self.simulador.sortear()
+        if sorteo < config.tasa_throttling:
+            self.simulador.registrar("throttling")
+            self._responder_error(429, "ThrottlingException", "Too many requests, please wait before trying again.")
+            return
+        if sorteo < config.tasa_throttling + config.tasa_5xx:
+            self.simulador.registrar("errores_5xx")
+            if sorteo < config.tasa_throttling + config.tasa_5xx / 2:
+                self._responder_error(500, "InternalServerException", "Simulated internal error")
+            else:
+                self._responder_error(503, "ServiceUnavailableException", "Simulated unavailability")
+            return
+
+        modelo = match.group("modelo")
+        texto = generar_texto(cuerpo)
+        tokens_entrada = len(cuerpo_crudo) // 4
+
+        if match.group("operacion") == "invoke":
+            self._responder_json(200, {
+                "id": f"msg_{uuid.uuid4().hex[:24]}",
+                "type": "message",
+                "role": "assistant",
+                "model": modelo,
+                "content": [{"type": "text", "text": texto}],
+                "stop_reason": "end_turn",
+                "usage": {"input_tokens": tokens_entrada, "output_tokens": len(_dividir_en_tokens(texto))}
+            })
+        else:
+            self._responder_stream(texto, modelo, tokens_entrada)
+
+    def _responder_json(self, estado: int, datos: Dict, encabezados: Optional[Dict[str, str]] = None):
+        cuerpo = json.dumps(datos, ensure_ascii=False).encode("utf-8")
+        self.send_response(estado)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.send_header("x-amzn-RequestId", str(uuid.uuid4()))
+        for nombre, valor in (encabezados or {}).items():
+            self.send_header(nombre, valor)
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def _responder_error(self, estado: int, tipo: str, mensaje: str):
+        self._responder_json(estado, {"message": mensaje}, {"x-amzn-ErrorType": f"{tipo}:http://internal.amazon.com/coral/com.amazon.bedrock/"})
+
+    def _responder_stream(self, texto: str, modelo: str, tokens_entrada: int):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/vnd.amazon.eventstream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.send_header("x-amzn-RequestId", str(uuid.uuid4()))
+        self.send_header("X-Amzn-Bedrock-Content-Type", "application/json")
+        self.end_headers()
+
+        demora = 1.0 / self.simulador.config.tokens_por_segundo if self.simulador.config.tokens_por_segundo > 0 else 0
+        try:
+            for evento in eventos_anthropic(texto, modelo, tokens_entrada):
+                datos = evento_chunk(evento)
+                self.wfile.write(f"{len(datos):x}\r\n".encode("ascii") + datos + b"\r\n")
+                self.wfile.flush()
+                if demora and evento["type"] == "content_block_delta":
+                    time.sleep(demora)
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # El cliente cortó el stream (ej: se canceló la búsqueda)
+            self.close_connection = True
+
+
+class ServidorBedrockSimulado(ThreadingHTTPServer):
+    """ThreadingHTTPServer con la configuración y los contadores del simulador"""
+
+    daemon_threads = True
+
+    def __init__(self, direccion: tuple, config: Optional[ConfiguracionSimulador] = None):
+        super().__init__(direccion, ManejadorBedrock)
+        self.config = config or ConfiguracionSimulador()
+        self._random = random.Random(self.config.semilla)
+        self._lock = threading.Lock()
+        self._contadores = {"requests": 0, "throttling": 0, "errores_5xx": 0}
+
+    @property
+    def url(self) -> str:
+        host, puerto = self.server_address[:2]
+        return f"http://{host}:{puerto}"
+
+    def latencia(self) -> float:
+        """Latencia del próximo request en segundos (log-normal alrededor de la mediana)"""
+        with self._lock:
+            factor = self._random.lognormvariate(0, self.config.latencia_sigma) if self.config.latencia_sigma > 0 else 1.0
+        return self.config.latencia_ms / 1000 * factor
+
+    def sortear(self) -> float:
+        with self._lock:
+            return self._random.random()
+
+    def registrar(self, contador: str):
+        with self._lock:
+            self._contadores[contador] += 1
+
+    def estadisticas(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._contadores)
+
+
+def iniciar_en_segundo_plano(config: Optional[ConfiguracionSimulador] = None,
+                             host: str = "127.0.0.1", puerto: int = 0) -> ServidorBedrockSimulado:
+    """
+    Levanta el simulador en un hilo (útil para benchmarks dentro del mismo proceso)
+
+    Args:
+        config: Configuración del simulador
+        host: Interfaz donde escuchar
+        puerto: Puerto (0 = uno libre cualquiera)
+
+    Returns:
+        Servidor en marcha; su endpoint está en `.url` y se detiene con `.shutdown()`
+    """
+    servidor = ServidorBedrockSimulado((host, puerto), config)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Servidor local que imita a bedrock-runtime")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--latencia-ms", type=float, default=300.0, help="Mediana hasta el primer byte")
+    parser.add_argument("--latencia-sigma", type=float, default=0.4, help="Dispersión log-normal (0 = fija)")
+    parser.add_argument("--tokens-por-segundo", type=float, default=80.0, help="0 = sin demora")
+    parser.add_argument("--tasa-throttling", type=float, default=0.0, help="Proporción de respuestas 429")
+    parser.add_argument("--tasa-5xx", type=float, default=0.0, help="Proporción de respuestas 500/503")
+    parser.add_argument("--semilla", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    config = ConfiguracionSimulador(
+        latencia_ms=args.latencia_ms,
+        latencia_sigma=args.latencia_sigma,
+        tokens_por_segundo=args.tokens_por_segundo,
+        tasa_throttling=args.tasa_throttling,
+        tasa_5xx=args.tasa_5xx,
+        semilla=args.semilla,
+    )
+    servidor = ServidorBedrockSimulado((args.host, args.puerto), config)
+    print(f"🧪 Bedrock simulado escuchando en {servidor.url} (BEDROCK_ENDPOINT_URL={servidor.url})")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n📊 {servidor.estadisticas()}")
+    finally:
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()
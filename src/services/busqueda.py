@@ -0,0 +1,219 @@
+"""
+Pipeline completo de una búsqueda, sin interfaz
+
+Consulta + dirección + radio + cadenas → ubicación, supermercados cercanos,
+interpretación de la IA, comparación producto por producto y lista de compra.
+Lo usan la app de Streamlit y la API HTTP (src/api.py).
+"""
+from typing import Any, Callable, Dict, List, Optional
+
+from src.services.bedrock_service import BedrockService, normalizar_consulta
+from src.services.comparacion import comparar_en_streaming, generar_recomendacion_compra
+from src.services.prefetch import PrefetchEspeculativo
+from src.utils.memo_etapas import MemoEtapas
+from src.utils.metricas import span
+from src.utils.orquestador import CanalEventos, Orquestador
+from src.utils.texto import normalizar
+
+# Estados posibles de ResultadoBusqueda.estado
+OK = "ok"
+UBICACION_NO_ENCONTRADA = "ubicacion_no_encontrada"
+SIN_SUPERMERCADOS = "sin_supermercados"
+ERROR_INTERPRETACION = "error_interpretacion"
+SIN_PRODUCTOS = "sin_productos"
+
+
+class ResultadoBusqueda:
+    """Resultado de cada etapa de una búsqueda"""
+
+    def __init__(self):
+        self.estado = OK
+        self.ubicacion = None
+        self.supermercados_cercanos: List = []
+        self.interpretacion: Dict = {}
+        self.comparacion: Dict = {}
+        self.lista_compra: Dict = {}
+        self.total_optimizado = 0.0
+        self.super_unico: Dict = {}
+        self.total_unico = 0.0
+        self.tiempos: Dict[str, Dict[str, float]] = {}
+
+    @property
+    def ok(self) -> bool:
+        return self.estado == OK
+
+    def a_dict(self) -> Dict[str, Any]:
+        """Versión serializable a JSON (modelos Pydantic como dicts, infinitos como None)"""
+        def limpiar(valor):
+            if hasattr(valor, "model_dump"):
+                return limpiar(valor.model_dump())
+            if isinstance(valor, dict):
+                return {str(k): limpiar(v) for k, v in valor.items()}
+            if isinstance(valor, (list, tuple)):
+                return [limpiar(v) for v in valor]
+            if isinstance(valor, float) and valor in (float("inf"), float("-inf")):
+                return None
+            return valor
+
+        return limpiar({
+            "estado": self.estado,
+            "ubicacion": self.ubicacion,
+            "supermercados_cercanos": self.supermercados_cercanos,
+            "interpretacion": self.interpretacion,
+            "comparacion": self.comparacion,
+            "lista_compra": {"supermercados": self.lista_compra, "total": self.total_optimizado},
+            "super_unico": {"supermercados": self.super_unico, "total": self.total_unico},
+            "tiempos_ms": {
+                etapa: round(t["duracion"] * 1000, 1) for etapa, t in self.tiempos.items()
+            }
+        })
+
+
+def buscar_mejores_precios(
+    servicios,
+    bedrock: BedrockService,
+    consulta: str,
+    direccion: str,
+    radio_km: float,
+    cadenas: List[str],
+    memo: Optional[MemoEtapas] = None,
+    comparar: Callable = comparar_en_streaming
+) -> ResultadoBusqueda:
+    """
+    Ejecuta la búsqueda completa
+
+    La geocodificación y el filtro por distancia corren en paralelo con la
+    llamada a Bedrock; cada producto se compara apenas el modelo lo genera.
+
+    Args:
+        servicios: ContenedorServicios (geocoding, scrapers, índice de sucursales)
+        bedrock: BedrockService a usar
+        consulta: Texto del usuario
+        direccion: Dirección desde donde se compra
+        radio_km: Radio máximo a los supermercados
+        cadenas: Cadenas a comparar
+        memo: Resultados de la búsqueda anterior (la app lo guarda por sesión
+            para no recalcular lo que no cambió)
+        comparar: Función de comparación (la app pasa la versión con progreso
+            en pantalla); se llama en el hilo que invoca esta función
+
+    Returns:
+        ResultadoBusqueda (ver `estado`)
+    """
+    with span("busqueda") as medicion:
+        resultado = _buscar(servicios, bedrock, consulta, direccion, radio_km, cadenas, memo, comparar)
+        medicion.etiquetar(resultado=resultado.estado)
+    return resultado
+
+
+def _buscar(
+    servicios,
+    bedrock: BedrockService,
+    consulta: str,
+    direccion: str,
+    radio_km: float,
+    cadenas: List[str],
+    memo: Optional[MemoEtapas],
+    comparar: Callable
+) -> ResultadoBusqueda:
+    """Cuerpo de buscar_mejores_precios"""
+    memo = memo if memo is not None else MemoEtapas()
+    geocoding = servicios.geocoding
+    scrapers = servicios.scrapers
+    resultado = ResultadoBusqueda()
+
+    # Claves de cada etapa: precios se cachean aparte por (cadena, término)
+    clave_interpretacion = (bedrock.model_id, normalizar_consulta(consulta))
+    clave_ubicacion = normalizar(direccion)
+    clave_cercanos = (clave_ubicacion, radio_km, tuple(cadenas))
+    clave_comparacion = (clave_interpretacion, clave_cercanos)
+
+    encontrada, interpretacion_previa = memo.buscar("interpretacion", clave_interpretacion)
+    encontrada_comparacion, comparacion_previa = memo.buscar("comparacion", clave_comparacion)
+
+    # Buscar ya los productos reconocibles en el texto: corre en paralelo con
+    # la geocodificación y con el LLM, y calienta el cache de precios
+    prefetch = None
+    if not encontrada:
+        prefetch = PrefetchEspeculativo(scrapers, cadenas)
+        prefetch.iniciar(bedrock.detectar_productos(consulta))
+
+    canal = CanalEventos()
+
+    def etapa_ubicacion():
+        return memo.obtener("ubicacion", clave_ubicacion, lambda: geocoding.obtener_coordenadas(direccion))
+
+    def etapa_cercanos(ubicacion):
+        if not ubicacion:
+            return []
+        # (el índice ya filtra por las cadenas seleccionadas)
+        return memo.obtener("cercanos", clave_cercanos, lambda: geocoding.filtrar_por_distancia(
+            ubicacion,
+            servicios.indice_supermercados,
+            max_distancia_km=radio_km,
+            cadenas=cadenas
+        ))
+
+    def etapa_comparacion(cercanos):
+        if not cercanos:
+            canal.cancelar()
+            return None
+        if encontrada_comparacion:
+            return comparacion_previa
+        # Si sólo cambiaron los supermercados se reusa la interpretación
+        eventos = BedrockService._emitir_completa(interpretacion_previa) if encontrada else canal
+        # (mientras el LLM genera, incluye la espera de sus productos)
+        with span("comparacion") as medicion:
+            comparacion, interpretacion = comparar(eventos, cercanos, scrapers, cadenas, geocoding, prefetch=prefetch)
+            if "error" in interpretacion:
+                medicion.etiquetar(resultado="error_interpretacion")
+        return comparacion, interpretacion
+
+    orquestador = Orquestador(nombre="búsqueda")
+    orquestador.agregar("ubicacion", etapa_ubicacion)
+    orquestador.agregar("cercanos", etapa_cercanos, dependencias=("ubicacion",))
+    if not encontrada:
+        orquestador.agregar(
+            "interpretacion", lambda: canal.alimentar(bedrock.interpretar_consulta_stream(consulta))
+        )
+    orquestador.agregar("comparacion", etapa_comparacion, dependencias=("cercanos",), en_hilo_llamador=True)
+    # Si algo falla, el productor deja de leer el stream del LLM en vez de
+    # agotarlo mientras el pool espera a que termine
+    orquestador.al_fallar(canal.cancelar)
+
+    try:
+        resultados = orquestador.ejecutar()
+    finally:
+        # Si una etapa falla, las búsquedas especulativas no quedan vivas
+        if prefetch:
+            prefetch.cancelar()
+    resultado.tiempos = orquestador.tiempos
+    resultado.ubicacion = resultados["ubicacion"]
+    resultado.supermercados_cercanos = resultados["cercanos"]
+
+    if not resultado.ubicacion:
+        resultado.estado = UBICACION_NO_ENCONTRADA
+        return resultado
+    if not resultado.supermercados_cercanos:
+        resultado.estado = SIN_SUPERMERCADOS
+        return resultado
+
+    resultado.comparacion, resultado.interpretacion = resultados["comparacion"]
+    if "error" in resultado.interpretacion:
+        resultado.estado = ERROR_INTERPRETACION
+        return resultado
+
+    if not encontrada_comparacion:
+        if not encontrada:
+            memo.guardar("interpretacion", clave_interpretacion, resultado.interpretacion)
+        memo.guardar("comparacion", clave_comparacion, (resultado.comparacion, resultado.interpretacion))
+
+    if not resultado.interpretacion.get("productos") or not resultado.comparacion:
+        resultado.estado = SIN_PRODUCTOS
+        return resultado
+
+    (resultado.lista_compra, resultado.total_optimizado,
+     resultado.super_unico, resultado.total_unico) = memo.obtener(
+        "recomendacion", clave_comparacion, lambda: generar_recomendacion_compra(resultado.comparacion)
+    )
+    return resultado
@@ -0,0 +1,279 @@
+"""
+Comparación producto por producto entre supermercados, sin interfaz
+
+Lo usan la app de Streamlit (que le agrega el progreso en pantalla) y la API
+HTTP. Nada de este módulo importa streamlit.
+"""
+import math
+import re
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.utils.metricas import obtener_metricas
+
+if TYPE_CHECKING:
+    from src.services.prefetch import PrefetchEspeculativo
+
+
+def comparar_producto(
+    prod_ia: dict,
+    supermercados_cercanos: List,
+    scrapers: Dict,
+    supermercados_seleccionados: List[str],
+    geocoding
+) -> Dict:
+    """
+    Busca un producto en cada supermercado cercano
+    
+    Returns:
+        Entrada de la comparación: cantidad_necesaria, unidad y datos por supermercado
+    """
+    nombre_prod = prod_ia.get('nombre')
+    cantidad_necesaria = prod_ia.get('cantidad_estimada', 1)
+    unidad = prod_ia.get('unidad', 'unidades')
+    
+    resultado = {
+        'cantidad_necesaria': cantidad_necesaria,
+        'unidad': unidad,
+        'supermercados': {}
+    }
+    
+    # Buscar en cada supermercado
+    for supermercado in supermercados_cercanos:
+        cadena = next((n for n in supermercados_seleccionados if n in supermercado.nombre), None)
+        
+        if not cadena or cadena not in scrapers:
+            continue
+        
+        scraper = scrapers[cadena]
+        
+        # Buscar el producto (varias sucursales de una cadena comparten la búsqueda)
+        productos_encontrados = scraper.buscar_producto_cacheado(nombre_prod)
+        
+        if productos_encontrados:
+            # Tomar el más barato
+            mejor_producto = min(productos_encontrados, key=lambda p: p.precio)
+            
+            # Calcular unidades necesarias
+            numeros = re.findall(r'\d+\.?\d*', mejor_producto.nombre)
+            tamano_presentacion = 1.0
+            
+            if numeros:
+                tamano_presentacion = float(numeros[0])
+                
+                if 'CC' in mejor_producto.nombre.upper() or 'ML' in mejor_producto.nombre.upper():
+                    tamano_presentacion = tamano_presentacion / 1000
+                
+                if 'GR' in mejor_producto.nombre.upper() and tamano_presentacion > 50:
+                    tamano_presentacion = tamano_presentacion / 1000
+            
+            # Calcular unidades a comprar
+            if unidad == 'litros' and tamano_presentacion < 10:
+                unidades = max(1, math.ceil(cantidad_necesaria / tamano_presentacion))
+            elif unidad == 'kg' and tamano_presentacion < 5:
+                unidades = max(1, math.ceil(cantidad_necesaria / tamano_presentacion))
+            else:
+                unidades = max(1, int(cantidad_necesaria))
+            
+            unidades = min(unidades, 200)
+            
+            # Guardar en comparación
+            resultado['supermercados'][supermercado.nombre] = {
+                'producto': mejor_producto,
+                'unidades': unidades,
+                'precio_unitario': mejor_producto.precio,
+                'subtotal': mejor_producto.precio * unidades,
+                'distancia_km': supermercado.distancia_km,
+                'tiempo_min': geocoding.estimar_tiempo_viaje(supermercado.distancia_km),
+                'url': mejor_producto.url  # Agregar URL del producto
+            }
+        else:
+            # No encontrado
+            resultado['supermercados'][supermercado.nombre] = None
+    
+    return resultado
+
+
+def comparar_en_streaming(
+    eventos_interpretacion: Iterable[Tuple[str, Dict]],
+    supermercados_cercanos: List,
+    scrapers: Dict,
+    supermercados_seleccionados: List[str],
+    geocoding,
+    max_workers: int = 4,
+    prefetch: Optional['PrefetchEspeculativo'] = None,
+    al_progresar: Optional[Callable[[str], None]] = None
+) -> Tuple[Dict, Dict]:
+    """
+    Compara productos a medida que el LLM los va generando
+    
+    Cada producto que llega del stream de BedrockService.interpretar_consulta_stream
+    se busca enseguida en un pool de hilos, así el tiempo de generación y el de
+    scraping se superponen en lugar de sumarse.
+    
+    Args:
+        eventos_interpretacion: Eventos ("producto", dict) / ("interpretacion", dict)
+        supermercados_cercanos: Supermercados dentro del radio
+        scrapers: Scrapers por cadena
+        supermercados_seleccionados: Cadenas elegidas por el usuario
+        geocoding: GeocodingService (para estimar tiempos de viaje)
+        max_workers: Búsquedas en paralelo
+        prefetch: Prefetch especulativo en curso; se confirma (y se cancela lo
+            que sobra) cuando llega la interpretación
+        al_progresar: Recibe un mensaje por cada producto lanzado o esperado
+            (se llama desde el hilo que invoca esta función)
+        
+    Returns:
+        (comparacion_por_producto, interpretacion); si la interpretación falla,
+        la comparación viene vacía y la interpretación trae el error
+    """
+    progresar = al_progresar or (lambda mensaje: None)
+    futuros: Dict[str, Future] = {}
+    interpretacion: Dict = {"error": "No se pudo interpretar la consulta", "tipo": "error_parseo"}
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for tipo, valor in eventos_interpretacion:
+            if tipo == "interpretacion":
+                interpretacion = valor
+                if prefetch is not None:
+                    prefetch.confirmar(
+                        p.get('nombre') for p in valor.get("productos", []) if isinstance(p, dict)
+                    )
+                continue
+            
+            nombre_prod = valor.get('nombre') if isinstance(valor, dict) else None
+            if not nombre_prod or nombre_prod in futuros:
+                continue
+            
+            progresar(f"🔎 Buscando **{nombre_prod}** (la IA sigue pensando...)")
+            futuros[nombre_prod] = executor.submit(
+                comparar_producto,
+                valor, supermercados_cercanos, scrapers, supermercados_seleccionados, geocoding
+            )
+        
+        if "error" in interpretacion:
+            for futuro in futuros.values():
+                futuro.cancel()
+            return {}, interpretacion
+        
+        # Productos que no llegaron por el stream (ej: JSON con formato inesperado)
+        for prod_ia in interpretacion.get("productos", []):
+            if isinstance(prod_ia, dict) and prod_ia.get('nombre') and prod_ia['nombre'] not in futuros:
+                futuros[prod_ia['nombre']] = executor.submit(
+                    comparar_producto,
+                    prod_ia, supermercados_cercanos, scrapers, supermercados_seleccionados, geocoding
+                )
+        
+        comparacion = {}
+        for nombre_prod, futuro in futuros.items():
+            progresar(f"🔎 Buscando **{nombre_prod}**...")
+            comparacion[nombre_prod] = futuro.result()
+    
+    return comparacion, interpretacion
+
+
+def generar_recomendacion_compra(comparacion: Dict) -> Tuple[Dict, float, Dict, float]:
+    """
+    Genera recomendación de dónde comprar cada cosa
+    
+    Returns:
+        (lista_compra_optimizada, total_optimizado, mejor_supermercado_unico, total_unico)
+    """
+    inicio = time.perf_counter()
+    
+    # 1. Lista optimizada (cada producto donde está más barato)
+    lista_compra_optimizada = {}
+    total_optimizado = 0
+    
+    for nombre_prod, info in comparacion.items():
+        supermercados_info = info['supermercados']
+        supers_con_producto = {k: v for k, v in supermercados_info.items() if v is not None}
+        
+        if not supers_con_producto:
+            continue
+        
+        # Encontrar el más barato
+        mejor_super = min(supers_con_producto.keys(), 
+                         key=lambda s: supers_con_producto[s]['subtotal'])
+        
+        datos_mejor = supers_con_producto[mejor_super]
+        
+        # Agregar a lista de compra
+        if mejor_super not in lista_compra_optimizada:
+            lista_compra_optimizada[mejor_super] = {
+                'productos': [],
+                'total': 0,
+                'distancia_km': datos_mejor['distancia_km'],
+                'tiempo_min': datos_mejor['tiempo_min']
+            }
+        
+        lista_compra_optimizada[mejor_super]['productos'].append({
+            'nombre': nombre_prod,
+            'producto_real': datos_mejor['producto'].nombre,
+            'unidades': datos_mejor['unidades'],
+            'precio_unitario': datos_mejor['precio_unitario'],
+            'subtotal': datos_mejor['subtotal'],
+            'url': datos_mejor.get('url', '#')
+        })
+        
+        lista_compra_optimizada[mejor_super]['total'] += datos_mejor['subtotal']
+        total_optimizado += datos_mejor['subtotal']
+    
+    # 2. Mejor supermercado único (comprar todo en uno)
+    supermercados_totales = {}
+    
+    for nombre_prod, info in comparacion.items():
+        supermercados_info = info['supermercados']
+        
+        for super_nombre, datos in supermercados_info.items():
+            if datos is None:
+                # Si no tiene el producto, penalizamos
+                if super_nombre not in supermercados_totales:
+                    supermercados_totales[super_nombre] = {
+                        'productos': [],
+                        'total': float('inf'),  # Infinito si no tiene todos
+                        'productos_faltantes': [],
+                        'distancia_km': 0,
+                        'tiempo_min': 0
+                    }
+                supermercados_totales[super_nombre]['productos_faltantes'].append(nombre_prod)
+            else:
+                if super_nombre not in supermercados_totales:
+                    supermercados_totales[super_nombre] = {
+                        'productos': [],
+                        'total': 0,
+                        'productos_faltantes': [],
+                        'distancia_km': datos['distancia_km'],
+                        'tiempo_min': datos['tiempo_min']
+                    }
+                
+                if supermercados_totales[super_nombre]['total'] != float('inf'):
+                    supermercados_totales[super_nombre]['productos'].append({
+                        'nombre': nombre_prod,
+                        'producto_real': datos['producto'].nombre,
+                        'unidades': datos['unidades'],
+                        'precio_unitario': datos['precio_unitario'],
+                        'subtotal': datos['subtotal'],
+                        'url': datos.get('url', '#')
+                    })
+                    supermercados_totales[super_nombre]['total'] += datos['subtotal']
+    
+    # Filtrar solo los que tienen todos los productos
+    supers_completos = {k: v for k, v in supermercados_totales.items() 
+                       if v['total'] != float('inf') and len(v['productos_faltantes']) == 0}
+    
+    if supers_completos:
+        mejor_super_unico = min(supers_completos.keys(), 
+                               key=lambda s: supers_completos[s]['total'])
+        datos_mejor_unico = supers_completos[mejor_super_unico]
+        total_unico = datos_mejor_unico['total']
+    else:
+        # Si ninguno tiene todos, tomar el que tenga más productos
+        mejor_super_unico = min(supermercados_totales.keys(),
+                               key=lambda s: len(supermercados_totales[s]['productos_faltantes']))
+        datos_mejor_unico = supermercados_totales[mejor_super_unico]
+        total_unico = datos_mejor_unico['total']
+    
+    obtener_metricas().observar("optimizacion", time.perf_counter() - inicio, resultado="ok")
+    return lista_compra_optimizada, total_optimizado, {mejor_super_unico: datos_mejor_unico}, total_unico
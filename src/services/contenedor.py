@@ -0,0 +1,72 @@
+"""
+Contenedor de servicios compartidos por todas las sesiones del proceso
+
+Streamlit vuelve a ejecutar el script en cada interacción; lo caro de crear
+(sesiones HTTP de los scrapers, geocodificador, registro de sucursales,
+caches) se arma una sola vez acá. Por sesión sólo quedan las credenciales y
+el BedrockService que las usa, que es liviano porque su cliente sale del
+pool compartido.
+"""
+from typing import TYPE_CHECKING, Dict
+
+from data.supermercados_data import RegistroSupermercados, obtener_registro
+from src.services.bedrock_service import BedrockService
+from src.services.pool_bedrock import huella_credenciales
+
+if TYPE_CHECKING:
+    from src.scrapers.base_scraper import BaseScraper
+
+
+def crear_scrapers() -> Dict[str, "BaseScraper"]:
+    """Scrapers habilitados, por nombre de cadena"""
+    # Imports locales: requests y los scrapers se cargan recién al crearlos
+    from src.scrapers.atomo_scraper import AtomoScraper
+    from src.scrapers.vea_scraper import VeaScraper
+    
+    return {
+        'Atomo': AtomoScraper(),
+        'Vea': VeaScraper(),
+        # 'Carrefour': CarrefourScraper(),
+        # 'Coto': CotoScraper(),
+        # 'Tadicor': TadicorScraper(),
+        # 'Jumbo': JumboScraper()
+    }
+
+
+class ContenedorServicios:
+    """Servicios pesados, creados una vez por proceso"""
+
+    def __init__(self):
+        from src.services.geocoding_service import GeocodingService
+        
+        self.registro: RegistroSupermercados = obtener_registro()
+        self.geocoding = GeocodingService()
+        self.scrapers = crear_scrapers()
+
+    @property
+    def indice_supermercados(self):
+        """Índice espacial de todas las sucursales"""
+        return self.registro.indice
+
+    def bedrock_para_sesion(self, sesion, access_key: str, secret_key: str, region: str) -> BedrockService:
+        """
+        BedrockService de una sesión, reutilizado mientras no cambien las credenciales
+
+        Args:
+            sesion: Estado de la sesión (st.session_state o un dict)
+            access_key: AWS Access Key de la sesión
+            secret_key: AWS Secret Key de la sesión
+            region: Región de AWS
+
+        Returns:
+            BedrockService para esas credenciales
+        """
+        huella = (huella_credenciales(access_key, secret_key), region)
+        if sesion.get('bedrock_huella') != huella or 'bedrock' not in sesion:
+            sesion['bedrock'] = BedrockService(
+                aws_access_key_id=access_key,
+                aws_secret_access_key=secret_key,
+                aws_region=region
+            )
+            sesion['bedrock_huella'] = huella
+        return sesion['bedrock']
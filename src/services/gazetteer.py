@@ -0,0 +1,148 @@
+"""
+Gazetteer offline de Mendoza: departamentos, distritos, barrios, calles y puntos de referencia
+
+Resuelve la mayoría de las ubicaciones que escriben los usuarios sin salir a
+la red, y sugiere lugares a partir de un prefijo para autocompletar.
+"""
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from config.config import GAZETTEER_DATA_FILE
+from src.models.models import Lugar
+from src.utils.texto import normalizar
+from src.utils.trie import TriePrefijos
+
+# Cuanto más alto, más preciso es el lugar
+ESPECIFICIDAD = {
+    "punto": 5,
+    "barrio": 5,
+    "calle": 4,
+    "distrito": 3,
+    "departamento": 2,
+    "provincia": 1,
+}
+
+# Ventana máxima (en palabras) para buscar nombres dentro de una dirección
+MAX_PALABRAS_CLAVE = 6
+
+# Palabras que no aportan precisión a una dirección
+PALABRAS_GENERICAS = {"argentina", "provincia", "de"}
+
+
+def _tokens(texto: str) -> List[str]:
+    return re.findall(r"[a-z0-9]+", normalizar(texto))
+
+
+class Gazetteer:
+    """Lugares indexados por nombre normalizado y por prefijo"""
+
+    def __init__(self, lugares: List[Lugar]):
+        self.lugares = lugares
+        self._por_clave: Dict[str, List[Lugar]] = {}
+        self._trie = TriePrefijos()
+
+        for lugar in lugares:
+            for nombre in [lugar.nombre, *lugar.alias]:
+                palabras = _tokens(nombre)
+                clave = " ".join(palabras)
+                if not clave:
+                    continue
+                self._por_clave.setdefault(clave, []).append(lugar)
+                # También desde cada palabra, así "coria" sugiere "Chacras de Coria"
+                for i in range(len(palabras)):
+                    self._trie.insertar(" ".join(palabras[i:]), lugar)
+
+    @classmethod
+    def desde_archivo(cls, ruta: Path) -> "Gazetteer":
+        """Carga el gazetteer desde un JSON (lista de lugares)"""
+        with open(ruta, encoding="utf-8") as f:
+            return cls([Lugar(**lugar) for lugar in json.load(f)])
+
+    def resolver(self, direccion: str) -> Optional[Lugar]:
+        """
+        Busca el lugar más específico mencionado en una dirección
+
+        Un nombre seguido de altura (ej: "San Martín 2450") se toma como
+        calle y no se resuelve acá, sea cual sea el tipo del lugar con ese
+        nombre: el centro de la calle puede estar a kilómetros de esa altura,
+        y el departamento homónimo también.
+
+        Args:
+            direccion: Texto libre (ej: "Dorrego, Guaymallén, Mendoza")
+
+        Returns:
+            Lugar encontrado o None
+        """
+        palabras = _tokens(direccion)
+        cubiertas = [False] * len(palabras)
+        coincidencias: List[Tuple[int, int, Lugar]] = []
+
+        for largo in range(min(MAX_PALABRAS_CLAVE, len(palabras)), 0, -1):
+            for inicio in range(len(palabras) - largo + 1):
+                fin = inicio + largo
+                if any(cubiertas[inicio:fin]):
+                    continue
+                lugares = self._por_clave.get(" ".join(palabras[inicio:fin]))
+                if not lugares:
+                    continue
+                for i in range(inicio, fin):
+                    cubiertas[i] = True
+                if fin < len(palabras) and palabras[fin].isdigit():
+                    continue
+                coincidencias.extend((inicio, largo, lugar) for lugar in lugares)
+
+        if not coincidencias:
+            return None
+
+        inicio, largo, mejor = max(
+            coincidencias,
+            key=lambda c: (ESPECIFICIDAD.get(c[2].tipo, 0), c[1], -c[0])
+        )
+
+        # "Mendoza" solo no alcanza si la dirección trae más datos: mejor geocodificar
+        if mejor.tipo == "provincia" and any(
+            not cubierta and palabra not in PALABRAS_GENERICAS
+            for palabra, cubierta in zip(palabras, cubiertas)
+        ):
+            return None
+
+        # Una calle atraviesa departamentos: si se nombra otro departamento, gana ese
+        if mejor.tipo == "calle":
+            departamentos = [c[2] for c in coincidencias if c[2].tipo == "departamento"]
+            if departamentos and departamentos[0].nombre != mejor.departamento:
+                return departamentos[0]
+
+        return mejor
+
+    def sugerir(self, prefijo: str, limite: int = 5) -> List[Lugar]:
+        """
+        Lugares cuyo nombre (o alguna palabra del nombre) empieza con el prefijo
+
+        Args:
+            prefijo: Texto parcial escrito por el usuario
+            limite: Cantidad máxima de sugerencias
+
+        Returns:
+            Lista de lugares, primero los de nombre más corto
+        """
+        clave = " ".join(_tokens(prefijo))
+        if not clave:
+            return []
+        return self._trie.buscar_prefijo(clave, limite=limite)
+
+
+_gazetteer: Optional[Gazetteer] = None
+_gazetteer_lock = threading.Lock()
+
+
+def obtener_gazetteer() -> Gazetteer:
+    """Gazetteer compartido por todo el proceso (se carga en el primer uso)"""
+    global _gazetteer
+    if _gazetteer is None:
+        with _gazetteer_lock:
+            if _gazetteer is None:
+                _gazetteer = Gazetteer.desde_archivo(GAZETTEER_DATA_FILE)
+    return _gazetteer
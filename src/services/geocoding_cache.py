@@ -0,0 +1,186 @@
+"""
+Cache persistente de geocodificación compartido entre procesos
+
+Uso como comando para precargar direcciones conocidas:
+
+    python -m src.services.geocoding_cache precargar direcciones.csv
+    python -m src.services.geocoding_cache geocodificar direcciones.txt
+    python -m src.services.geocoding_cache purgar
+
+El CSV debe tener columnas: direccion, latitud, longitud (opcional: direccion_completa).
+`geocodificar` recibe una dirección por línea y las resuelve contra Nominatim
+a 1 request/segundo; si se corta, volver a ejecutarlo retoma desde el cache.
+"""
+import argparse
+import csv
+import re
+import threading
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+from config.config import (
+    GEOCODING_CACHE_FILE,
+    GEOCODING_CACHE_TTL,
+    GEOCODING_CACHE_NEGATIVE_TTL
+)
+from src.models.models import Ubicacion
+from src.utils.cache_disco import CacheDisco
+from src.utils.texto import normalizar
+
+
+def normalizar_direccion(direccion: str) -> str:
+    """Clave de cache: sin acentos, minúsculas y comas/espacios uniformes"""
+    return re.sub(r"\s*,\s*", ", ", normalizar(direccion)).strip(" ,")
+
+
+class CacheGeocodificacion:
+    """Resultados de Nominatim en disco, con TTL positivo y negativo"""
+
+    def __init__(
+        self,
+        ruta: Path = GEOCODING_CACHE_FILE,
+        ttl: float = GEOCODING_CACHE_TTL,
+        ttl_negativo: float = GEOCODING_CACHE_NEGATIVE_TTL
+    ):
+        self._cache = CacheDisco(ruta, tabla="geocoding")
+        self.ttl = ttl
+        self.ttl_negativo = ttl_negativo
+
+    def obtener(self, direccion: str, incluir_errores: bool = True) -> Tuple[bool, Optional[Ubicacion]]:
+        """
+        Busca una dirección en el cache
+
+        Args:
+            direccion: Dirección tal como la ingresó el usuario
+            incluir_errores: Si es False, los negativos por errores de Nominatim
+                (timeouts, caídas) se tratan como no encontrados para reintentarlos
+
+        Returns:
+            (encontrado, ubicacion); ubicacion es None si es un resultado negativo
+        """
+        encontrado, valor = self._cache.obtener(normalizar_direccion(direccion))
+        if not encontrado:
+            return False, None
+        if isinstance(valor, dict) and valor.get("error"):
+            return (True, None) if incluir_errores else (False, None)
+        return True, Ubicacion(**valor) if valor else None
+
+    def guardar(self, direccion: str, ubicacion: Ubicacion):
+        """Guarda un resultado positivo"""
+        self._cache.guardar(normalizar_direccion(direccion), ubicacion.model_dump(), self.ttl)
+
+    def guardar_negativo(self, direccion: str, error: bool = False):
+        """
+        Guarda que la dirección no se pudo geocodificar (vence antes)
+
+        Args:
+            direccion: Dirección
+            error: True si fue un error de Nominatim y no una dirección inexistente
+        """
+        self._cache.guardar(normalizar_direccion(direccion), {"error": True} if error else None, self.ttl_negativo)
+
+    def precargar(self, ubicaciones: Iterable[Tuple[str, Ubicacion]]) -> int:
+        """
+        Carga muchas direcciones ya geocodificadas en una sola transacción
+
+        Args:
+            ubicaciones: Pares (direccion, Ubicacion)
+
+        Returns:
+            Cantidad de direcciones cargadas
+        """
+        items = [(normalizar_direccion(d), u.model_dump()) for d, u in ubicaciones]
+        self._cache.guardar_muchos(items, self.ttl)
+        return len(items)
+
+    def purgar(self) -> int:
+        """Elimina las entradas vencidas"""
+        return self._cache.purgar()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
+_cache: Optional[CacheGeocodificacion] = None
+_cache_lock = threading.Lock()
+
+
+def obtener_cache_geocodificacion() -> CacheGeocodificacion:
+    """Cache compartido por todas las instancias de GeocodingService del proceso"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = CacheGeocodificacion()
+    return _cache
+
+
+def _leer_csv(ruta: Path) -> List[Tuple[str, Ubicacion]]:
+    ubicaciones = []
+    with open(ruta, encoding="utf-8") as f:
+        for fila in csv.DictReader(f):
+            ubicaciones.append((
+                fila["direccion"],
+                Ubicacion(
+                    direccion=fila.get("direccion_completa") or fila["direccion"],
+                    latitud=float(fila["latitud"]),
+                    longitud=float(fila["longitud"])
+                )
+            ))
+    return ubicaciones
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Cache de geocodificación")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    precargar = subparsers.add_parser("precargar", help="Cargar direcciones desde un CSV")
+    precargar.add_argument("archivo", type=Path)
+
+    geocodificar = subparsers.add_parser(
+        "geocodificar", help="Geocodificar un archivo de direcciones (una por línea)"
+    )
+    geocodificar.add_argument("archivo", type=Path)
+
+    subparsers.add_parser("purgar", help="Eliminar entradas vencidas")
+
+    args = parser.parse_args(argv)
+    cache = obtener_cache_geocodificacion()
+
+    if args.comando == "precargar":
+        cantidad = cache.precargar(_leer_csv(args.archivo))
+        print(f"✅ {cantidad} direcciones precargadas ({len(cache)} en cache)")
+    elif args.comando == "geocodificar":
+        # Import local: el servicio de geocodificación depende de este módulo
+        from src.services.geocoding_service import GeocodingService
+
+        with open(args.archivo, encoding="utf-8") as f:
+            direcciones = [linea.strip() for linea in f if linea.strip()]
+
+        avance = {"procesadas": 0, "total": 0}
+
+        def progreso(procesadas: int, total: int, direccion: str):
+            avance.update(procesadas=procesadas, total=total)
+            print(f"  [{procesadas}/{total}] {direccion}")
+
+        try:
+            resultados = GeocodingService().geocodificar_lote(direcciones, progreso=progreso)
+        except KeyboardInterrupt:
+            # Lo ya geocodificado quedó en el cache en disco
+            print(f"⏸️ Lote interrumpido: {avance['procesadas']}/{avance['total']} geocodificadas "
+                  f"(volvé a ejecutarlo para continuar)")
+            return
+
+        # Las repetidas (misma dirección normalizada) se cuentan una vez
+        unicas = {normalizar_direccion(d): d for d in reversed(direcciones)}
+        fallidas = sorted(d for d in unicas.values() if resultados.get(d) is None)
+        print(f"✅ {len(unicas) - len(fallidas)}/{len(unicas)} direcciones únicas geocodificadas "
+              f"({len(direcciones)} líneas en el archivo, {len(cache)} en cache)")
+        if fallidas:
+            print(f"⚠️ {len(fallidas)} sin resultado: {', '.join(fallidas[:10])}{' ...' if len(fallidas) > 10 else ''}")
+    elif args.comando == "purgar":
+        print(f"🧹 {cache.purgar()} entradas vencidas eliminadas")
+
+
+if __name__ == "__main__":
+    main()
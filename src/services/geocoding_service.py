@@ -1,26 +1,50 @@
 """
 Servicio de geocodificación y cálculo de distancias
 """
-from typing import Tuple, Optional
-from geopy.geocoders import Nominatim
-from geopy.distance import geodesic
-from geopy.exc import GeocoderTimedOut, GeocoderServiceError
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Tuple, Optional, Union
 import time
-import sys
-from pathlib import Path
-
-# Agregar el directorio raíz al path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
+from config.config import NOMINATIM_MAX_REQUESTS_POR_SEGUNDO
 from src.models.models import Ubicacion, Supermercado
+from src.services.gazetteer import obtener_gazetteer
+from src.services.geocoding_cache import normalizar_direccion, obtener_cache_geocodificacion
+from src.utils.indice_espacial import IndiceEspacial, cadena_de
+from src.utils.limitador import LimitadorTasa
+from src.utils.metricas import obtener_metricas, span
+from src.utils.texto import normalizar
+
+# Compartido por todas las instancias: la política de Nominatim es por cliente
+_limitador_nominatim = LimitadorTasa(NOMINATIM_MAX_REQUESTS_POR_SEGUNDO)
 
 
 class GeocodingService:
     """Servicio para geocodificación y cálculo de distancias"""
     
     def __init__(self):
-        self.geolocator = Nominatim(user_agent="supermercado_comparador")
+        self._geolocator = None
         self._cache = {}
+        # Cache en disco compartido entre instancias y procesos
+        self._cache_disco = obtener_cache_geocodificacion()
+        self._gazetteer = obtener_gazetteer()
+    
+    @property
+    def geolocator(self):
+        """Cliente de Nominatim, creado recién cuando una dirección no se resuelve sin red"""
+        if self._geolocator is None:
+            from geopy.geocoders import Nominatim
+            self._geolocator = Nominatim(user_agent="supermercado_comparador")
+        return self._geolocator
+    
+    def _ubicacion_por_defecto(self, sufijo: str = "") -> Ubicacion:
+        """Guaymallén, usado cuando no se puede geocodificar la dirección"""
+        return Ubicacion(
+            direccion=f"Guaymallén, Mendoza, Argentina{sufijo}",
+            latitud=-32.8895,
+            longitud=-68.8458,
+            ciudad="Mendoza",
+            provincia="Mendoza"
+        )
     
     def obtener_coordenadas(self, direccion: str) -> Optional[Ubicacion]:
         """
@@ -32,42 +56,65 @@ class GeocodingService:
         Returns:
             Ubicacion con coordenadas o None si falla
         """
+        with span("geocodificacion") as medicion:
+            encontrado, ubicacion = self._resolver_sin_red(direccion)
+            medicion.etiquetar(cache="hit" if encontrado else "miss")
+            if not encontrado:
+                ubicacion = self._geocodificar_nominatim(direccion)
+            if ubicacion is None:
+                medicion.etiquetar(resultado="no_encontrada")
+                return self._ubicacion_por_defecto(" (ubicación por defecto)")
+            return ubicacion
+    
+    def _resolver_sin_red(self, direccion: str, reintentar_errores: bool = False) -> Tuple[bool, Optional[Ubicacion]]:
+        """
+        Intenta resolver la dirección con el cache en memoria, el gazetteer y el cache en disco
+        
+        Args:
+            direccion: Dirección a resolver
+            reintentar_errores: Ignorar los negativos que dejó un error de Nominatim
+        
+        Returns:
+            (encontrado, ubicacion); ubicacion es None si se sabe que no existe
+        """
         # Verificar cache
         if direccion in self._cache:
-            return self._cache[direccion]
+            return True, self._cache[direccion]
+        
+        # Lugares conocidos de Mendoza: se resuelven sin red
+        lugar = self._gazetteer.resolver(direccion)
+        if lugar:
+            ubicacion = Ubicacion(
+                direccion=f"{lugar.etiqueta}, Mendoza, Argentina",
+                latitud=lugar.latitud,
+                longitud=lugar.longitud,
+                ciudad="Mendoza",
+                provincia="Mendoza"
+            )
+            self._cache[direccion] = ubicacion
+            return True, ubicacion
+        
+        # Cache en disco (incluye resultados negativos recientes)
+        encontrado, ubicacion = self._cache_disco.obtener(direccion, incluir_errores=not reintentar_errores)
+        if encontrado:
+            if ubicacion is not None:
+                self._cache[direccion] = ubicacion
+            return True, ubicacion
+        
+        return False, None
+    
+    def _geocodificar_nominatim(self, direccion: str) -> Optional[Ubicacion]:
+        """
+        Consulta Nominatim respetando su límite de requests por segundo
+        
+        Returns:
+            Ubicacion, o None si no se encontró o Nominatim falló
+        """
+        from geopy.exc import GeocoderTimedOut, GeocoderServiceError
+        
+        direccion_lower = direccion.lower().strip()
         
         try:
-            # Normalizar direcciones de Mendoza
-            direccion_normalizada = direccion
-            
-            # Si es una ubicación conocida de Mendoza, usar coordenadas fijas
-            ubicaciones_mendoza = {
-                "guaymallen": (-32.8895, -68.8458),
-                "guaymallén": (-32.8895, -68.8458),
-                "godoy cruz": (-32.9270, -68.8420),
-                "las heras": (-32.8513, -68.8273),
-                "mendoza": (-32.8908, -68.8272),
-                "mendoza capital": (-32.8908, -68.8272),
-                "lujan de cuyo": (-33.0329, -68.8769),
-                "maipu": (-32.9833, -68.7833),
-                "maipú": (-32.9833, -68.7833),
-            }
-            
-            direccion_lower = direccion.lower().strip()
-            
-            # Buscar coincidencia en ubicaciones conocidas
-            for lugar, coords in ubicaciones_mendoza.items():
-                if lugar in direccion_lower:
-                    ubicacion = Ubicacion(
-                        direccion=f"{lugar.title()}, Mendoza, Argentina",
-                        latitud=coords[0],
-                        longitud=coords[1],
-                        ciudad="Mendoza",
-                        provincia="Mendoza"
-                    )
-                    self._cache[direccion] = ubicacion
-                    return ubicacion
-            
             # Si no es ubicación conocida, intentar con geopy
             # Agregar "Mendoza, Argentina" si no está presente
             if "mendoza" not in direccion_lower and "argentina" not in direccion_lower:
@@ -75,6 +122,7 @@ class GeocodingService:
             else:
                 direccion_completa = direccion
             
+            _limitador_nominatim.esperar()
             location = self.geolocator.geocode(direccion_completa, timeout=10)
             
             if location:
@@ -88,30 +136,96 @@ class GeocodingService:
                 
                 # Guardar en cache
                 self._cache[direccion] = ubicacion
+                self._cache_disco.guardar(direccion, ubicacion)
                 return ubicacion
             
-            # Si todo falla, usar Guaymallén por defecto
-            ubicacion = Ubicacion(
-                direccion="Guaymallén, Mendoza, Argentina",
-                latitud=-32.8895,
-                longitud=-68.8458,
-                ciudad="Mendoza",
-                provincia="Mendoza"
-            )
-            self._cache[direccion] = ubicacion
-            return ubicacion
+            # No existe: se recuerda para no volver a preguntar
+            self._cache_disco.guardar_negativo(direccion)
+            return None
             
         except (GeocoderTimedOut, GeocoderServiceError) as e:
             print(f"Error en geocodificación: {e}")
-            # Retornar Guaymallén por defecto en caso de error
-            ubicacion = Ubicacion(
-                direccion="Guaymallén, Mendoza, Argentina (ubicación por defecto)",
-                latitud=-32.8895,
-                longitud=-68.8458,
-                ciudad="Mendoza",
-                provincia="Mendoza"
-            )
-            return ubicacion
+            # Recordar el error un rato para no volver a pegarle a Nominatim
+            # (los lotes lo reintentan)
+            self._cache_disco.guardar_negativo(direccion, error=True)
+            return None
+    
+    def geocodificar_lote(
+        self,
+        direcciones: Iterable[str],
+        progreso: Optional[Callable[[int, int, str], None]] = None
+    ) -> Dict[str, Optional[Ubicacion]]:
+        """
+        Geocodifica muchas direcciones respetando el límite de Nominatim
+        
+        Primero resuelve todo lo posible sin red (gazetteer y caches), une las
+        direcciones repetidas y encola el resto. Cada resultado se guarda en el
+        cache en disco apenas llega, así que si el proceso se interrumpe, volver
+        a llamar con la misma lista retoma desde donde quedó; las que fallaron
+        por un error de Nominatim se vuelven a intentar.
+        
+        Args:
+            direcciones: Direcciones a geocodificar (pueden repetirse)
+            progreso: Callback opcional (procesadas, total_en_cola, direccion)
+            
+        Returns:
+            Diccionario direccion -> Ubicacion, o None si no se pudo geocodificar
+        """
+        direcciones = list(direcciones)
+        resultados: Dict[str, Optional[Ubicacion]] = {}
+        # Dirección original representante de cada clave normalizada
+        representantes: Dict[str, str] = {}
+        cola: deque = deque()
+        
+        for direccion in direcciones:
+            clave = normalizar_direccion(direccion)
+            if clave in representantes:
+                continue
+            representantes[clave] = direccion
+            encontrado, ubicacion = self._resolver_sin_red(direccion, reintentar_errores=True)
+            if encontrado:
+                resultados[direccion] = ubicacion
+            else:
+                cola.append(direccion)
+        
+        total = len(cola)
+        print(f"📍 Lote: {len(representantes)} direcciones únicas, "
+              f"{len(resultados)} resueltas sin red, {total} en cola "
+              f"(~{total * _limitador_nominatim.intervalo:.0f}s)")
+        
+        procesadas = 0
+        while cola:
+            direccion = cola.popleft()
+            resultados[direccion] = self._geocodificar_nominatim(direccion)
+            procesadas += 1
+            if progreso:
+                progreso(procesadas, total, direccion)
+        
+        # Las direcciones repetidas comparten el resultado de su representante
+        for direccion in direcciones:
+            representante = representantes[normalizar_direccion(direccion)]
+            if representante in resultados:
+                resultados[direccion] = resultados[representante]
+        
+        return resultados
+    
+    def es_ubicacion_conocida(self, texto: str) -> bool:
+        """True si el texto se resuelve con el gazetteer local"""
+        return self._gazetteer.resolver(texto) is not None
+    
+    def sugerir_ubicaciones(self, texto: str, limite: int = 5) -> List[str]:
+        """
+        Sugerencias de autocompletado para el campo de ubicación
+        
+        Args:
+            texto: Lo que escribió el usuario (se usa el último tramo tras la coma)
+            limite: Cantidad máxima de sugerencias
+            
+        Returns:
+            Lista de textos sugeridos (ej: ["Chacras de Coria, Luján de Cuyo"])
+        """
+        prefijo = texto.split(",")[-1]
+        return [lugar.etiqueta for lugar in self._gazetteer.sugerir(prefijo, limite=limite)]
     
     def calcular_distancia(
         self, 
@@ -128,39 +242,68 @@ class GeocodingService:
         Returns:
             Distancia en kilómetros
         """
+        from geopy.distance import geodesic
+        
         return geodesic(origen, destino).kilometers
     
     def filtrar_por_distancia(
         self,
         ubicacion_usuario: Ubicacion,
-        supermercados: list[Supermercado],
-        max_distancia_km: float = 10.0
-    ) -> list[Supermercado]:
+        supermercados: Union[List[Supermercado], IndiceEspacial],
+        max_distancia_km: float = 10.0,
+        cadenas: Optional[List[str]] = None
+    ) -> List[Supermercado]:
         """
         Filtra supermercados por distancia máxima
         
         Args:
             ubicacion_usuario: Ubicación del usuario
-            supermercados: Lista de supermercados
+            supermercados: Lista de supermercados o índice espacial ya construido
             max_distancia_km: Distancia máxima en km
+            cadenas: Cadenas a incluir (ej: ["Atomo", "Vea"]); None = todas
             
         Returns:
-            Lista de supermercados dentro del radio
+            Lista de supermercados dentro del radio (copias con distancia_km)
         """
+        inicio = time.perf_counter()
         origen = (ubicacion_usuario.latitud, ubicacion_usuario.longitud)
+        
+        if isinstance(supermercados, IndiceEspacial):
+            # El índice devuelve candidatos por haversine; el margen cubre la
+            # diferencia con geodesic y la distancia final se calcula exacta
+            candidatos = [
+                s for _, s in supermercados.radio(
+                    origen[0], origen[1], max_distancia_km * 1.01, cadenas=cadenas
+                )
+            ]
+        else:
+            cadenas_norm = {normalizar(c) for c in cadenas} if cadenas is not None else None
+            candidatos = [
+                s for s in supermercados
+                if cadenas_norm is None or cadena_de(s) in cadenas_norm
+            ]
+        
         supermercados_cercanos = []
         
-        for super in supermercados:
+        for super in candidatos:
             destino = (super.latitud, super.longitud)
             distancia = self.calcular_distancia(origen, destino)
             
             if distancia <= max_distancia_km:
-                super.distancia_km = round(distancia, 2)
-                supermercados_cercanos.append(super)
+                # Copia: las sucursales del índice se comparten entre búsquedas
+                supermercados_cercanos.append(
+                    super.model_copy(update={'distancia_km': round(distancia, 2)})
+                )
         
         # Ordenar por distancia
         supermercados_cercanos.sort(key=lambda x: x.distancia_km)
         
+        obtener_metricas().observar(
+            "filtro_supermercados",
+            time.perf_counter() - inicio,
+            indice=isinstance(supermercados, IndiceEspacial),
+            resultado="ok" if supermercados_cercanos else "vacio"
+        )
         return supermercados_cercanos
     
     def estimar_tiempo_viaje(self, distancia_km: float) -> int:
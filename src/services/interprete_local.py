@@ -0,0 +1,216 @@
+"""
+Intérprete local y determinístico para listas simples de productos
+
+Consultas como "yerba y café" o "Fideos, salsa y queso para 4 personas" no
+necesitan al LLM: se reconocen con el vocabulario del proyecto y se devuelven
+con el mismo esquema JSON que produce Bedrock (los nombres conservan los
+acentos con que se escribieron). Todo lo que no se entienda con certeza
+(eventos, productos desconocidos, modificadores) se deja para Bedrock.
+"""
+import math
+import re
+from typing import Dict, List, Optional, Tuple
+
+from src.scrapers.base_scraper import ALIAS
+from src.scrapers.mock_scrapers import PRECIOS_BASE
+from src.services.vocabulario import PRODUCTOS_SUPERMERCADO
+from src.utils.texto import normalizar
+
+# Palabras de evento: aunque algunas sean productos ("asado"), piden razonamiento del LLM
+EVENTOS = {
+    "asado", "cumpleanos", "cumple", "picada", "cena", "almuerzo", "merienda",
+    "desayuno", "fiesta", "reunion", "evento", "postre", "ensalada",
+}
+
+VOCABULARIO = (
+    {normalizar(p) for p in PRODUCTOS_SUPERMERCADO}
+    | {normalizar(p.replace("_", " ")) for p in PRECIOS_BASE}
+    | {normalizar(k) for k in ALIAS}
+    | {normalizar(v) for valores in ALIAS.values() for v in valores}
+    | {"papas fritas", "torta", "milanesas", "salsa de tomate"}
+) - EVENTOS
+
+UNIDAD_POR_DEFECTO = {
+    "arroz": "kg", "yerba": "kg", "azucar": "kg", "harina": "kg", "carne": "kg",
+    "pollo": "kg", "queso": "kg", "jamon": "kg", "salame": "kg", "chorizo": "kg",
+    "pescado": "kg", "papa": "kg", "tomate": "kg", "cebolla": "kg", "manzana": "kg",
+    "banana": "kg", "naranja": "kg", "zanahoria": "kg", "papas fritas": "kg",
+    "leche": "litros", "aceite": "litros", "gaseosa": "litros", "coca": "litros",
+    "sprite": "litros", "cerveza": "litros", "vino": "litros", "agua": "litros",
+    "jugo": "litros", "fideos": "paquetes", "pasta": "paquetes", "galletitas": "paquetes",
+    "galletas": "paquetes", "cafe": "paquetes", "te": "paquetes",
+}
+
+# Reglas del prompt de Bedrock (consumo por persona) para los productos que las tienen
+CONSUMO_POR_PERSONA: Dict[str, Tuple[float, str]] = {
+    "gaseosa": (0.5, "litros"), "coca": (0.5, "litros"), "sprite": (0.5, "litros"),
+    "cerveza": (0.5, "litros"), "vino": (0.4, "litros"), "agua": (0.5, "litros"),
+    "jugo": (0.5, "litros"),
+    "carne": (0.25, "kg"), "pollo": (0.25, "kg"), "pescado": (0.25, "kg"),
+    "chorizo": (0.2, "kg"), "milanesa": (0.25, "kg"),
+    "hamburguesa": (1.2, "unidades"), "pancho": (1.3, "unidades"), "salchicha": (1.3, "unidades"),
+    "pan": (2.5, "unidades"),
+    "papas fritas": (0.1, "kg"), "snack": (0.1, "kg"), "chips": (0.1, "kg"), "mani": (0.04, "kg"),
+    "aceitunas": (0.06, "kg"), "queso": (0.12, "kg"), "salame": (0.06, "kg"), "jamon": (0.05, "kg"),
+    "torta": (0.15, "kg"), "fideos": (0.12, "kg"), "pasta": (0.12, "kg"), "arroz": (0.08, "kg"),
+}
+
+UNIDADES = {
+    "kg": "kg", "kilo": "kg", "kilos": "kg", "g": "kg", "gr": "kg", "gramos": "kg",
+    "l": "litros", "lt": "litros", "litro": "litros", "litros": "litros",
+    "unidad": "unidades", "unidades": "unidades", "u": "unidades",
+    "paquete": "paquetes", "paquetes": "paquetes",
+}
+
+PREFIJOS_DESCARTABLES = re.compile(
+    r"^(?:(?:quiero|necesito|busco|comprar|compra|comparar|comparame|precios?|"
+    r"lista|de|del|me|y)\b\s*)+"
+)
+ARTICULOS = re.compile(r"^(?:(?:un|una|unos|unas|el|la|los|las|de)\b\s*)+")
+SEPARADORES = re.compile(r"\s*(?:,|;|\+|/|\by\b|\be\b)\s*")
+PARA_PERSONAS = re.compile(r"\bpara\s+(\d+)(?:\s+(personas?|gente|invitados|adultos|amigos))?\s*$")
+CANTIDAD_EXPLICITA = re.compile(
+    r"^(\d+(?:[.,]\d+)?)\s*(" + "|".join(sorted(UNIDADES, key=len, reverse=True)) + r")?\b\s*(?:de\s+)?(.+)$"
+)
+
+
+def _variantes(termino: str) -> List[str]:
+    """Singular/plural simples de un término"""
+    variantes = [termino]
+    if termino.endswith("es"):
+        variantes.append(termino[:-2])
+    if termino.endswith("s"):
+        variantes.append(termino[:-1])
+    else:
+        variantes.append(termino + "s")
+    return variantes
+
+
+def _buscar(tabla, termino: str):
+    for variante in _variantes(termino):
+        if variante in tabla:
+            return variante
+    return None
+
+
+def _redondear(cantidad: float, unidad: str) -> float:
+    if unidad in ("unidades", "paquetes"):
+        return max(1, math.ceil(cantidad))
+    return max(0.1, round(cantidad, 1))
+
+
+def _producto(item: str, personas: Optional[int]) -> Optional[Dict]:
+    """Interpreta un ítem de la lista; None si no se reconoce"""
+    item = ARTICULOS.sub("", item.strip())
+    cantidad_explicita = None
+    unidad_explicita = None
+
+    match = CANTIDAD_EXPLICITA.match(item)
+    if match:
+        cantidad_explicita = float(match.group(1).replace(",", "."))
+        if match.group(2):
+            unidad_explicita = UNIDADES[match.group(2)]
+            if match.group(2) in ("g", "gr", "gramos"):
+                cantidad_explicita /= 1000
+        item = ARTICULOS.sub("", match.group(3).strip())
+
+    if not item or _buscar(VOCABULARIO, item) is None:
+        return None
+
+    if cantidad_explicita is not None:
+        # Un número sin unidad cuenta envases ("3 cervezas" son 3 unidades, no 3 litros)
+        por_defecto = UNIDAD_POR_DEFECTO.get(_buscar(UNIDAD_POR_DEFECTO, item))
+        unidad = unidad_explicita or ("paquetes" if por_defecto == "paquetes" else "unidades")
+        return {
+            "nombre": item,
+            "cantidad_estimada": cantidad_explicita,
+            "unidad": unidad,
+            "razonamiento": "cantidad indicada por el usuario"
+        }
+
+    if personas and personas > 1:
+        clave = _buscar(CONSUMO_POR_PERSONA, item)
+        if clave is None:
+            return None
+        por_persona, unidad = CONSUMO_POR_PERSONA[clave]
+        total = _redondear(personas * por_persona, unidad)
+        return {
+            "nombre": item,
+            "cantidad_estimada": total,
+            "unidad": unidad,
+            "razonamiento": f"{personas} personas × {por_persona:g} {unidad} = {total:g} {unidad}"
+        }
+
+    return {
+        "nombre": item,
+        "cantidad_estimada": 1,
+        "unidad": UNIDAD_POR_DEFECTO.get(_buscar(UNIDAD_POR_DEFECTO, item), "unidades"),
+        "razonamiento": "1 persona, consumo estándar"
+    }
+
+
+def _forma_original(nombre: str, mensaje: str) -> str:
+    """
+    Cómo escribió el usuario un producto reconocido (ej: "cafe" -> "café")
+
+    Args:
+        nombre: Nombre normalizado
+        mensaje: Consulta original
+
+    Returns:
+        Las palabras del mensaje que normalizadas dan `nombre`, en minúsculas
+        (o el mismo nombre si no aparecen tal cual)
+    """
+    palabras = re.findall(r"\w+", mensaje.lower())
+    largo = len(nombre.split())
+    for inicio in range(len(palabras) - largo + 1):
+        tramo = " ".join(palabras[inicio:inicio + largo])
+        if normalizar(tramo) == nombre:
+            return tramo
+    return nombre
+
+
+def interpretar_local(mensaje: str) -> Optional[Dict]:
+    """
+    Interpreta una lista simple de productos sin llamar al LLM
+
+    Args:
+        mensaje: Consulta del usuario (ej: "yerba y café", "pan y gaseosa para 6")
+
+    Returns:
+        Diccionario con el esquema de interpretar_consulta, o None si la
+        consulta es ambigua y tiene que resolverla Bedrock
+    """
+    texto = normalizar(mensaje)
+    texto = re.sub(r"[^\w\s,;+/.]", " ", texto)
+    texto = re.sub(r"\s+", " ", texto).strip(" .")
+
+    personas = None
+    match = PARA_PERSONAS.search(texto)
+    if match:
+        personas = int(match.group(1))
+        texto = texto[:match.start()].strip()
+
+    texto = PREFIJOS_DESCARTABLES.sub("", texto)
+    items = [i for i in SEPARADORES.split(texto) if i.strip()]
+    if not items:
+        return None
+
+    productos = []
+    vistos = set()
+    for item in items:
+        producto = _producto(item, personas)
+        if producto is None:
+            return None
+        if producto["nombre"] in vistos:
+            continue
+        vistos.add(producto["nombre"])
+        producto["nombre"] = _forma_original(producto["nombre"], mensaje)
+        productos.append(producto)
+
+    return {
+        "productos": productos,
+        "evento": None,
+        "personas": personas or 1,
+        "preferencias": None
+    }
@@ -0,0 +1,204 @@
+"""
+Llamadas a Bedrock con plazo, reintentos adaptativos y límite de concurrencia por modelo
+
+botocore reintenta por su cuenta sin mirar cuánto tiempo le queda a quien
+espera; acá los reintentos se hacen con backoff exponencial con jitter, la
+demora base de cada modelo crece cuando hay throttling y baja con los
+éxitos, y ninguna llamada supera su plazo. En las respuestas en stream el
+cupo del modelo y el plazo cubren también la lectura de los eventos, que es
+donde el modelo genera. Las versiones asíncronas corren en un executor
+acotado, así no bloquean un event loop.
+"""
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, Optional, TypeVar
+
+from config.config import (
+    BEDROCK_DEADLINE_S,
+    BEDROCK_EXECUTOR_WORKERS,
+    BEDROCK_MAX_CONCURRENCIA_POR_MODELO,
+    BEDROCK_MAX_REINTENTOS
+)
+
+T = TypeVar("T")
+
+# Errores que vale la pena reintentar (el resto se propaga enseguida)
+ERRORES_THROTTLING = {"ThrottlingException", "TooManyRequestsException", "ServiceQuotaExceededException"}
+ERRORES_TRANSITORIOS = {"ServiceUnavailableException", "InternalServerException", "ModelNotReadyException"}
+
+DEMORA_MINIMA = 0.2  # segundos
+DEMORA_MAXIMA = 8.0
+
+
+class _EstadoModelo:
+    """Concurrencia y demora base adaptativa de un modelo"""
+
+    def __init__(self, max_concurrencia: int):
+        self.semaforo = threading.BoundedSemaphore(max_concurrencia)
+        self.demora_base = DEMORA_MINIMA
+        self.lock = threading.Lock()
+
+    def throttling(self):
+        with self.lock:
+            self.demora_base = min(DEMORA_MAXIMA, self.demora_base * 2)
+
+    def exito(self):
+        with self.lock:
+            self.demora_base = max(DEMORA_MINIMA, self.demora_base * 0.8)
+
+
+class LlamadorBedrock:
+    """Ejecuta llamadas a Bedrock respetando plazos, reintentos y concurrencia"""
+
+    def __init__(self, max_workers: int = BEDROCK_EXECUTOR_WORKERS,
+                 max_por_modelo: int = BEDROCK_MAX_CONCURRENCIA_POR_MODELO,
+                 max_reintentos: int = BEDROCK_MAX_REINTENTOS,
+                 deadline: float = BEDROCK_DEADLINE_S):
+        """
+        Args:
+            max_workers: Hilos del executor para las llamadas asíncronas
+            max_por_modelo: Llamadas simultáneas máximas por model ID
+            max_reintentos: Reintentos ante throttling o errores transitorios
+            deadline: Plazo por defecto de cada llamada (segundos)
+        """
+        self.max_por_modelo = max_por_modelo
+        self.max_reintentos = max_reintentos
+        self.deadline = deadline
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bedrock")
+        self._modelos: Dict[str, _EstadoModelo] = {}
+        self._lock = threading.Lock()
+        self.reintentos = 0
+
+    def _estado(self, model_id: str) -> _EstadoModelo:
+        with self._lock:
+            if model_id not in self._modelos:
+                self._modelos[model_id] = _EstadoModelo(self.max_por_modelo)
+            return self._modelos[model_id]
+
+    def llamar(self, funcion: Callable[[], T], model_id: str, deadline: Optional[float] = None) -> T:
+        """
+        Ejecuta `funcion` (que hace la llamada a Bedrock) en el hilo actual
+
+        Args:
+            funcion: Llamada sin argumentos (ej: lambda: client.invoke_model(...))
+            model_id: Modelo invocado (define el límite de concurrencia)
+            deadline: Segundos máximos para toda la llamada, reintentos incluidos
+
+        Returns:
+            Lo que devuelva `funcion`
+
+        Raises:
+            TimeoutError: si no se consiguió respuesta dentro del plazo
+            ClientError: si el error no es reintentable o se agotaron los reintentos
+        """
+        estado = self._estado(model_id)
+        resultado = self._llamar_con_cupo(funcion, model_id, estado, self._limite(deadline))
+        estado.semaforo.release()
+        return resultado
+
+    def llamar_stream(self, funcion: Callable[[], Dict[str, Any]], model_id: str,
+                      deadline: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Como `llamar`, para respuestas en stream (invoke_model_with_response_stream)
+
+        El cupo del modelo se mantiene hasta terminar de leer el stream y el
+        plazo cubre también la lectura. Conviene cerrar el generador si se deja
+        de leer antes (ej: con contextlib.closing) para liberar el cupo enseguida.
+
+        Args:
+            funcion: Llamada que devuelve la respuesta con el stream en ['body']
+            model_id: Modelo invocado (define el límite de concurrencia)
+            deadline: Segundos máximos para la llamada y la lectura del stream
+
+        Yields:
+            Eventos del stream
+
+        Raises:
+            TimeoutError: si la respuesta o la lectura no terminan dentro del plazo
+            ClientError: si el error no es reintentable o se agotaron los reintentos
+        """
+        estado = self._estado(model_id)
+        limite = self._limite(deadline)
+        respuesta = self._llamar_con_cupo(funcion, model_id, estado, limite)
+        stream = respuesta["body"]
+        try:
+            for evento in stream:
+                # Un evento no se puede interrumpir a mitad de lectura (eso lo
+                # cubre el read_timeout de botocore); el plazo se controla entre eventos
+                if time.monotonic() > limite:
+                    raise TimeoutError(f"Bedrock ({model_id}) no terminó de responder dentro del plazo")
+                yield evento
+        finally:
+            estado.semaforo.release()
+            if hasattr(stream, "close"):
+                stream.close()
+
+    def _limite(self, deadline: Optional[float]) -> float:
+        return time.monotonic() + (deadline if deadline is not None else self.deadline)
+
+    def _llamar_con_cupo(self, funcion: Callable[[], T], model_id: str, estado: _EstadoModelo, limite: float) -> T:
+        """
+        Reintentos de `llamar`; si funcion tiene éxito devuelve su resultado con
+        el cupo del modelo todavía tomado (lo libera quien llama)
+        """
+        # botocore ya está cargado si hay un cliente; importarlo acá evita
+        # cargarlo al importar el módulo
+        from botocore.exceptions import ClientError, ConnectionError as BotocoreConnectionError, ReadTimeoutError
+
+        for intento in range(self.max_reintentos + 1):
+            restante = limite - time.monotonic()
+            if restante <= 0 or not estado.semaforo.acquire(timeout=restante):
+                raise TimeoutError(f"Bedrock ({model_id}) no respondió dentro del plazo")
+
+            try:
+                resultado = funcion()
+            except BaseException as e:
+                estado.semaforo.release()
+                if isinstance(e, ClientError):
+                    codigo = e.response.get("Error", {}).get("Code", "")
+                    if codigo in ERRORES_THROTTLING:
+                        estado.throttling()
+                    elif codigo not in ERRORES_TRANSITORIOS:
+                        raise
+                elif not isinstance(e, (ReadTimeoutError, BotocoreConnectionError)):
+                    raise
+                error = e
+            else:
+                estado.exito()
+                return resultado
+
+            if intento == self.max_reintentos:
+                raise error
+
+            # Backoff exponencial con jitter completo, sin pasarse del plazo
+            espera = random.uniform(0, min(DEMORA_MAXIMA, estado.demora_base * 2 ** intento))
+            if time.monotonic() + espera >= limite:
+                raise TimeoutError(f"Bedrock ({model_id}) no respondió dentro del plazo") from error
+            self.reintentos += 1
+            print(f"⏳ Bedrock: {type(error).__name__}, reintento {intento + 1} en {espera:.1f}s")
+            time.sleep(espera)
+
+    def enviar(self, funcion: Callable[..., T], *args, **kwargs) -> "Future[T]":
+        """Ejecuta una función (ej: un método de BedrockService) en el executor acotado"""
+        return self._executor.submit(funcion, *args, **kwargs)
+
+    async def ejecutar_async(self, funcion: Callable[..., T], *args, **kwargs) -> T:
+        """Igual que enviar, pero esperable desde un event loop sin bloquearlo"""
+        return await asyncio.wrap_future(self.enviar(funcion, *args, **kwargs))
+
+
+_llamador: Optional[LlamadorBedrock] = None
+_llamador_lock = threading.Lock()
+
+
+def obtener_llamador_bedrock() -> LlamadorBedrock:
+    """Llamador compartido por todo el proceso (límites globales por modelo)"""
+    global _llamador
+    if _llamador is None:
+        with _llamador_lock:
+            if _llamador is None:
+                _llamador = LlamadorBedrock()
+    return _llamador
@@ -0,0 +1,156 @@
+"""
+Plantillas de cantidades por evento, aprendidas de respuestas de Bedrock
+
+"Asado para 10" y "asado para 14" sólo difieren en la escala: la primera
+respuesta del modelo se guarda por persona bajo (evento, modificadores) y las
+siguientes cantidades se calculan localmente. Si el evento o los
+modificadores no coinciden con una plantilla conocida se sigue consultando al LLM.
+"""
+import math
+import re
+import threading
+from typing import Dict, Optional, Tuple
+
+from config.config import (
+    BEDROCK_CACHE_FILE,
+    BEDROCK_CACHE_MAX_ITEMS,
+    BEDROCK_CACHE_PERSISTENTE,
+    BEDROCK_PLANTILLAS_TTL
+)
+from src.services.interprete_local import EVENTOS
+from src.utils.cache_disco import CacheDisco
+from src.utils.cache_memoria import CacheLRU
+from src.utils.texto import normalizar
+
+SINONIMOS_EVENTOS = {"cumple": "cumpleanos"}
+
+# Palabras que no cambian las cantidades por persona
+PALABRAS_NEUTRAS = {
+    "para", "de", "del", "la", "el", "los", "las", "un", "una", "unos", "unas",
+    "y", "con", "a", "en", "mi", "nuestro", "nuestra", "personas", "persona",
+    "gente", "invitados", "quiero", "necesito", "hacer", "armar", "organizar",
+    "comprar", "compra", "lista", "somos", "seremos", "total", "aprox",
+}
+
+
+def clave_plantilla(mensaje: str) -> Optional[Tuple[str, int]]:
+    """
+    Separa una consulta de evento en (clave de plantilla, cantidad de personas)
+
+    Args:
+        mensaje: Consulta del usuario (ej: "asado para 14 personas")
+
+    Returns:
+        ("asado|", 14), ("cumpleanos|ninos", 30)... o None si no hay un evento
+        reconocido con una única cantidad de personas
+    """
+    palabras = re.findall(r"\w+", normalizar(mensaje))
+    numeros = [p for p in palabras if p.isdigit()]
+    eventos = [SINONIMOS_EVENTOS.get(p, p) for p in palabras if p in EVENTOS]
+    if len(numeros) != 1 or len(set(eventos)) != 1 or int(numeros[0]) < 1:
+        return None
+
+    modificadores = sorted({
+        p for p in palabras
+        if not p.isdigit() and p not in EVENTOS and p not in PALABRAS_NEUTRAS
+    })
+    return f"{eventos[0]}|{' '.join(modificadores)}", int(numeros[0])
+
+
+def _redondear(cantidad: float, unidad: str) -> float:
+    if unidad in ("unidades", "paquetes"):
+        return max(1, math.ceil(cantidad))
+    return max(0.1, round(cantidad, 1))
+
+
+class PlantillasEventos:
+    """Interpretaciones por persona indexadas por evento y modificadores"""
+
+    def __init__(self, cache: CacheLRU):
+        self.cache = cache
+
+    def aprender(self, mensaje: str, interpretacion: Dict) -> bool:
+        """
+        Guarda la respuesta del modelo como plantilla por persona
+
+        Sólo se aprende si el modelo entendió la misma cantidad de personas
+        que se lee en la consulta.
+
+        Returns:
+            True si se guardó una plantilla
+        """
+        clave = clave_plantilla(mensaje)
+        productos = interpretacion.get("productos") or []
+        if clave is None or not productos or interpretacion.get("personas") != clave[1]:
+            return False
+
+        plantilla_clave, personas = clave
+        try:
+            por_persona = [
+                {
+                    "nombre": p["nombre"],
+                    "por_persona": float(p["cantidad_estimada"]) / personas,
+                    "unidad": p.get("unidad", "unidades"),
+                }
+                for p in productos
+            ]
+        except (KeyError, TypeError, ValueError):
+            return False
+
+        self.cache.guardar(plantilla_clave, {
+            "productos": por_persona,
+            "evento": interpretacion.get("evento"),
+            "preferencias": interpretacion.get("preferencias"),
+        })
+        return True
+
+    def interpretar(self, mensaje: str) -> Optional[Dict]:
+        """
+        Interpreta una consulta reescalando una plantilla conocida
+
+        Returns:
+            Interpretación con el esquema de interpretar_consulta, o None
+        """
+        clave = clave_plantilla(mensaje)
+        if clave is None:
+            return None
+
+        plantilla_clave, personas = clave
+        encontrado, plantilla = self.cache.obtener(plantilla_clave)
+        if not encontrado:
+            return None
+
+        productos = []
+        for p in plantilla["productos"]:
+            cantidad = _redondear(p["por_persona"] * personas, p["unidad"])
+            productos.append({
+                "nombre": p["nombre"],
+                "cantidad_estimada": cantidad,
+                "unidad": p["unidad"],
+                "razonamiento": f"{personas} personas × {p['por_persona']:.3g} {p['unidad']} = {cantidad:g} {p['unidad']}"
+            })
+
+        return {
+            "productos": productos,
+            "evento": plantilla["evento"],
+            "personas": personas,
+            "preferencias": plantilla["preferencias"],
+        }
+
+    def estadisticas(self) -> Dict:
+        return self.cache.estadisticas()
+
+
+_plantillas: Optional[PlantillasEventos] = None
+_plantillas_lock = threading.Lock()
+
+
+def obtener_plantillas_eventos() -> PlantillasEventos:
+    """Plantillas compartidas por todo el proceso (y en disco, si el cache es persistente)"""
+    global _plantillas
+    if _plantillas is None:
+        with _plantillas_lock:
+            if _plantillas is None:
+                disco = CacheDisco(BEDROCK_CACHE_FILE, tabla="plantillas_eventos") if BEDROCK_CACHE_PERSISTENTE else None
+                _plantillas = PlantillasEventos(CacheLRU(BEDROCK_CACHE_MAX_ITEMS, BEDROCK_PLANTILLAS_TTL, disco=disco))
+    return _plantillas
@@ -0,0 +1,139 @@
+"""
+Pool de clientes de Bedrock compartido por todo el proceso
+
+Crear un boto3.client carga los modelos de servicio de botocore y abre
+conexiones nuevas; con Streamlit eso pasaba en cada rerun. El pool reutiliza
+un cliente (y su pool de conexiones HTTP) por combinación de credenciales,
+región y endpoint, entre reruns y entre sesiones. Los servicios piden el
+cliente al pool en cada uso (no lo guardan), así que cerrar uno inactivo no
+deja a nadie con un cliente cerrado.
+"""
+import hashlib
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from config.config import (
+    BEDROCK_CLIENTE_TTL_INACTIVO,
+    BEDROCK_MAX_CONEXIONES,
+    BEDROCK_TIMEOUT_CONEXION,
+    BEDROCK_TIMEOUT_LECTURA
+)
+
+ClaveCliente = Tuple[str, str, Optional[str]]
+
+
+def huella_credenciales(access_key: str, secret_key: str) -> str:
+    """Identifica un par de credenciales sin guardarlas en claro como clave"""
+    return hashlib.sha256(f"{access_key}:{secret_key}".encode("utf-8")).hexdigest()[:16]
+
+
+class PoolClientesBedrock:
+    """Clientes bedrock-runtime reutilizables, con expiración por inactividad"""
+
+    def __init__(self, ttl_inactivo: float = BEDROCK_CLIENTE_TTL_INACTIVO,
+                 max_conexiones: int = BEDROCK_MAX_CONEXIONES):
+        """
+        Args:
+            ttl_inactivo: Segundos sin uso después de los cuales se descarta un cliente
+            max_conexiones: Tamaño del pool HTTP de cada cliente
+        """
+        self.ttl_inactivo = ttl_inactivo
+        self.max_conexiones = max_conexiones
+        self._clientes: Dict[ClaveCliente, Tuple[Any, float]] = {}
+        self._lock = threading.Lock()
+        self.creados = 0
+        self.reutilizados = 0
+
+    def obtener(self, access_key: str, secret_key: str, region: str,
+                endpoint_url: Optional[str] = None):
+        """
+        Devuelve el cliente para esas credenciales, creándolo si hace falta
+
+        Args:
+            access_key: AWS Access Key
+            secret_key: AWS Secret Key
+            region: Región de AWS
+            endpoint_url: Endpoint alternativo (opcional)
+
+        Returns:
+            Cliente boto3 de bedrock-runtime
+        """
+        clave = (huella_credenciales(access_key, secret_key), region, endpoint_url)
+
+        with self._lock:
+            self._desalojar_inactivos(time.monotonic())
+            entrada = self._clientes.get(clave)
+            if entrada is not None:
+                self._clientes[clave] = (entrada[0], time.monotonic())
+                self.reutilizados += 1
+                return entrada[0]
+
+        # Crear un cliente tarda: fuera del lock, así no frena a las otras claves
+        cliente = self._crear_cliente(access_key, secret_key, region, endpoint_url)
+
+        with self._lock:
+            entrada = self._clientes.get(clave)
+            if entrada is None:
+                self._clientes[clave] = (cliente, time.monotonic())
+                self.creados += 1
+                print(f"🔌 Nuevo cliente de Bedrock ({region}, {len(self._clientes)} en el pool)")
+                return cliente
+            # Otro hilo creó el mismo cliente mientras tanto: se usa ese
+            self._clientes[clave] = (entrada[0], time.monotonic())
+            self.reutilizados += 1
+        cliente.close()
+        return entrada[0]
+
+    def _crear_cliente(self, access_key: str, secret_key: str, region: str, endpoint_url: Optional[str]):
+        """Cliente boto3 de bedrock-runtime nuevo (sin el lock tomado)"""
+        # boto3 tarda en importarse: recién cuando hace falta el primer cliente
+        import boto3
+        from botocore.config import Config
+
+        # Una sesión por cliente: la sesión por defecto de boto3 no es thread-safe
+        return boto3.session.Session().client(
+            service_name='bedrock-runtime',
+            region_name=region,
+            endpoint_url=endpoint_url,
+            aws_access_key_id=access_key,
+            aws_secret_access_key=secret_key,
+            config=Config(
+                max_pool_connections=self.max_conexiones,
+                connect_timeout=BEDROCK_TIMEOUT_CONEXION,
+                read_timeout=BEDROCK_TIMEOUT_LECTURA,
+                # Los reintentos los maneja LlamadorBedrock (respetando el plazo)
+                retries={"total_max_attempts": 1}
+            )
+        )
+
+    def _desalojar_inactivos(self, ahora: float):
+        """Cierra los clientes sin uso hace más de ttl_inactivo (con el lock tomado)"""
+        vencidos = [c for c, (_, uso) in self._clientes.items() if ahora - uso > self.ttl_inactivo]
+        for clave in vencidos:
+            cliente, _ = self._clientes.pop(clave)
+            cliente.close()
+
+    def limpiar(self):
+        """Cierra y descarta todos los clientes"""
+        with self._lock:
+            for cliente, _ in self._clientes.values():
+                cliente.close()
+            self._clientes.clear()
+
+    def __len__(self) -> int:
+        return len(self._clientes)
+
+
+_pool: Optional[PoolClientesBedrock] = None
+_pool_lock = threading.Lock()
+
+
+def obtener_pool_bedrock() -> PoolClientesBedrock:
+    """Pool de clientes compartido por todo el proceso"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = PoolClientesBedrock()
+    return _pool
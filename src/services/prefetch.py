@@ -0,0 +1,83 @@
+"""
+Prefetch especulativo de precios mientras el LLM interpreta la consulta
+
+Los productos que ya se reconocen en el texto del usuario ("yerba", "carne")
+se empiezan a buscar en las cadenas elegidas apenas se envía la consulta.
+Los resultados quedan en el cache de precios; cuando llega la interpretación,
+lo que el modelo no pidió y todavía no arrancó se cancela.
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Tuple
+
+from src.scrapers.cache_precios import clave_termino
+
+
+class PrefetchEspeculativo:
+    """Búsquedas anticipadas de (cadena, término) que calientan el cache de precios"""
+
+    def __init__(self, scrapers: Dict, cadenas: List[str], max_workers: int = 4):
+        """
+        Args:
+            scrapers: Scrapers por cadena
+            cadenas: Cadenas seleccionadas por el usuario
+            max_workers: Búsquedas especulativas en paralelo
+        """
+        self.scrapers = {c: scrapers[c] for c in cadenas if c in scrapers}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._futuros: Dict[Tuple[str, str], Future] = {}
+        self._confirmado = False
+
+    def iniciar(self, terminos: Iterable[str]) -> int:
+        """
+        Lanza la búsqueda de cada término en cada cadena
+
+        Args:
+            terminos: Productos detectados en la consulta
+
+        Returns:
+            Cantidad de búsquedas lanzadas
+        """
+        for termino in terminos:
+            clave = clave_termino(termino)
+            for cadena, scraper in self.scrapers.items():
+                if (cadena, clave) not in self._futuros:
+                    self._futuros[(cadena, clave)] = self._executor.submit(scraper.buscar_producto_cacheado, termino)
+        if self._futuros:
+            print(f"🔮 Prefetch: {len(self._futuros)} búsquedas especulativas")
+        return len(self._futuros)
+
+    def confirmar(self, productos: Iterable[str]) -> Dict[str, int]:
+        """
+        Cancela lo que la interpretación final no necesita
+
+        Las búsquedas que ya estaban en curso terminan igual (sus resultados
+        quedan en el cache); las que todavía esperaban turno se descartan.
+
+        Args:
+            productos: Nombres de los productos de la interpretación
+
+        Returns:
+            {"usadas": n, "canceladas": n, "desperdiciadas": n}
+        """
+        self._confirmado = True
+        necesarias = {clave_termino(p) for p in productos if p}
+        resumen = {"usadas": 0, "canceladas": 0, "desperdiciadas": 0}
+
+        for (_, clave), futuro in self._futuros.items():
+            if clave in necesarias:
+                resumen["usadas"] += 1
+            elif futuro.cancel():
+                resumen["canceladas"] += 1
+            else:
+                resumen["desperdiciadas"] += 1
+
+        self._executor.shutdown(wait=False)
+        if self._futuros:
+            print(f"🔮 Prefetch: {resumen['usadas']} usadas, {resumen['canceladas']} canceladas, "
+                  f"{resumen['desperdiciadas']} sin usar")
+        return resumen
+
+    def cancelar(self):
+        """Cancela todo lo pendiente (ej: la consulta terminó con error); no hace nada si ya se confirmó"""
+        if not self._confirmado:
+            self.confirmar([])
@@ -0,0 +1,157 @@
+"""
+Resumen compacto de comparaciones para el prompt de recomendación
+
+En lugar de mandarle al modelo cada producto de cada supermercado, se le
+manda lo que necesita para recomendar: total, distancia y tiempo por
+supermercado, y los productos donde más se ahorra eligiendo bien (con el
+más barato, el que le sigue y el más caro).
+"""
+from typing import Any, Dict, List, Optional, Union
+
+from src.utils.tokens import estimar_tokens, json_compacto
+
+# Cuántos productos con mayor diferencia de precio se incluyen
+MAX_AHORROS = 5
+
+
+def _como_dict(comparacion: Any) -> Dict:
+    """Acepta ComparacionPrecios o el dict equivalente"""
+    return comparacion.model_dump() if hasattr(comparacion, "model_dump") else comparacion
+
+
+def _precio(producto: Any) -> Optional[float]:
+    if isinstance(producto, dict):
+        return producto.get("precio")
+    return getattr(producto, "precio", None)
+
+
+def _nombre(producto: Any) -> str:
+    if isinstance(producto, dict):
+        return producto.get("nombre", "")
+    return getattr(producto, "nombre", "")
+
+
+def _desde_lista(comparaciones: List[Any]) -> Dict[str, Any]:
+    """Resumen de una lista de ComparacionPrecios (un elemento por supermercado)"""
+    supers = []
+    precios_por_producto: Dict[str, Dict[str, float]] = {}
+
+    for comparacion in map(_como_dict, comparaciones):
+        nombre_super = comparacion["supermercado"]
+        productos = comparacion.get("productos") or []
+        supers.append({
+            "super": nombre_super,
+            "total": round(comparacion["total"]),
+            "km": round(comparacion["distancia_km"], 1),
+            "min": comparacion.get("tiempo_estimado_min"),
+            "productos": len(productos),
+        })
+        for producto in productos:
+            precio = _precio(producto)
+            if precio is not None:
+                precios_por_producto.setdefault(_nombre(producto), {})[nombre_super] = precio
+
+    return {"supers": supers, "precios": precios_por_producto}
+
+
+def _desde_producto_por_producto(comparacion: Dict[str, Dict]) -> Dict[str, Any]:
+    """Resumen del formato de comparar_productos_entre_supermercados"""
+    totales: Dict[str, Dict[str, Any]] = {}
+    precios_por_producto: Dict[str, Dict[str, float]] = {}
+
+    for nombre_prod, datos in comparacion.items():
+        for nombre_super, info in datos.get("supermercados", {}).items():
+            if not info:
+                continue
+            total = totales.setdefault(nombre_super, {
+                "super": nombre_super,
+                "total": 0.0,
+                "km": round(info["distancia_km"], 1),
+                "min": info.get("tiempo_min"),
+                "productos": 0,
+            })
+            total["total"] += info["subtotal"]
+            total["productos"] += 1
+            precios_por_producto.setdefault(nombre_prod, {})[nombre_super] = info["subtotal"]
+
+    supers = list(totales.values())
+    for s in supers:
+        s["total"] = round(s["total"])
+    return {"supers": supers, "precios": precios_por_producto}
+
+
+def resumir_comparaciones(
+    comparaciones: Union[List[Any], Dict[str, Dict]],
+    max_ahorros: int = MAX_AHORROS
+) -> Dict[str, Any]:
+    """
+    Reduce las comparaciones a lo que el modelo necesita para recomendar
+
+    Args:
+        comparaciones: Lista de ComparacionPrecios (o dicts equivalentes) o el
+            dict de comparar_productos_entre_supermercados
+        max_ahorros: Cantidad de productos con mayor ahorro a incluir
+
+    Returns:
+        {"supers": [...ordenados por total], "ahorros": [...], "omitidos": 0}
+    """
+    if isinstance(comparaciones, dict):
+        base = _desde_producto_por_producto(comparaciones)
+    else:
+        base = _desde_lista(comparaciones)
+
+    supers = sorted(base["supers"], key=lambda s: s["total"])
+
+    ahorros = []
+    for nombre_prod, precios in base["precios"].items():
+        if len(precios) < 2:
+            continue
+        ordenados = sorted(precios, key=precios.get)
+        barato, caro = ordenados[0], ordenados[-1]
+        diferencia = precios[caro] - precios[barato]
+        if diferencia > 0:
+            ahorro = {"producto": nombre_prod, "barato": barato}
+            # La alternativa si el más barato queda lejos (con dos, es el caro)
+            if len(ordenados) > 2:
+                ahorro["segundo"] = ordenados[1]
+            ahorro.update(caro=caro, ahorro=round(diferencia))
+            ahorros.append(ahorro)
+    ahorros.sort(key=lambda a: a["ahorro"], reverse=True)
+
+    return {"supers": supers, "ahorros": ahorros[:max_ahorros], "omitidos": 0}
+
+
+def ajustar_a_presupuesto(resumen: Dict[str, Any], presupuesto_tokens: int) -> Dict[str, Any]:
+    """
+    Recorta el resumen hasta que entre en el presupuesto de tokens
+
+    Primero se descartan los ahorros menos importantes y después los
+    supermercados intermedios; el más barato y el más caro se conservan
+    siempre porque la recomendación compara contra ellos.
+
+    Args:
+        resumen: Resultado de resumir_comparaciones
+        presupuesto_tokens: Tokens disponibles para los datos
+
+    Returns:
+        Resumen (una copia si hubo que recortar) con "omitidos" = supers descartados
+    """
+    if estimar_tokens(json_compacto(resumen)) <= presupuesto_tokens:
+        return resumen
+
+    recortado = {
+        "supers": list(resumen["supers"]),
+        "ahorros": list(resumen["ahorros"]),
+        "omitidos": resumen.get("omitidos", 0),
+    }
+
+    while estimar_tokens(json_compacto(recortado)) > presupuesto_tokens:
+        if recortado["ahorros"]:
+            recortado["ahorros"].pop()
+        elif len(recortado["supers"]) > 2:
+            recortado["supers"].pop(-2)
+            recortado["omitidos"] += 1
+        else:
+            break
+
+    return recortado
@@ -0,0 +1,87 @@
+"""
+Vocabulario del dominio: palabras clave y productos que reconoce el bot
+"""
+import re
+from typing import Dict, List, Optional, Tuple
+
+from src.utils.texto import normalizar
+
+# Palabras que indican que es consulta de supermercado
+PALABRAS_CLAVE_VALIDAS = [
+    "precio", "compra", "supermercado", "producto", 
+    "ubicación", "distancia", "cerca", "barato",
+    "comparar", "lista", "evento", "cumpleaños", "cumple",
+    "asado", "cena", "comida", "bebida", "quiero", "necesito",
+    "picada", "desayuno", "almuerzo", "merienda", "comer",
+    "cocinar", "preparar", "hacer", "fiesta", "reunión",
+    "niños", "personas", "gente", "familia", "amigos",
+    "semanal", "mensual", "diario", "compras", "romántica",
+    "completo", "ingredientes", "receta"
+]
+
+# Productos comunes de supermercado (más flexible)
+PRODUCTOS_SUPERMERCADO = [
+    "arroz", "aceite", "yerba", "azucar", "sal", "pan", "leche",
+    "fideos", "pasta", "harina", "cafe", "te", "galletitas",
+    "carne", "pollo", "pescado", "hamburguesa", "salchicha", "pancho",
+    "chorizo", "gaseosa", "coca", "sprite", "cerveza", "vino",
+    "agua", "jugo", "papa", "tomate", "lechuga", "cebolla",
+    "huevo", "queso", "manteca", "jamon", "mortadela",
+    "sopa", "caldo", "pure", "mayonesa", "ketchup", "mostaza",
+    "detergente", "jabon", "shampoo", "papel", "servilleta",
+    "salame", "aceitunas", "maní", "almendras", "frutas",
+    "verduras", "snack", "chips", "galletas", "dulce"
+]
+
+
+# =========================
+# Matcher de dominio (se precalcula una vez al importar)
+# =========================
+# Variantes aceptadas de cada palabra: plurales para productos; para las
+# palabras clave también algunas formas verbales ("compra" -> "comprar")
+_SUFIJOS_PRODUCTOS = ("", "s", "es")
+_SUFIJOS_CLAVES = ("", "s", "es", "r", "ar", "n", "no", "na", "nos", "nas")
+
+
+def _formas_dominio() -> Dict[str, Optional[str]]:
+    """Forma sin acentos de cada variante -> producto original (None = palabra clave)"""
+    formas: Dict[str, Optional[str]] = {}
+    for clave in PALABRAS_CLAVE_VALIDAS:
+        for sufijo in _SUFIJOS_CLAVES:
+            formas.setdefault(normalizar(clave) + sufijo, None)
+    for producto in PRODUCTOS_SUPERMERCADO:
+        forma = normalizar(producto)
+        # Los plurales de la lista ("aceitunas") también se aceptan en singular
+        raices = [forma, forma[:-1]] if forma.endswith("s") else [forma]
+        for raiz in raices:
+            for sufijo in _SUFIJOS_PRODUCTOS:
+                formas[raiz + sufijo] = producto
+    return formas
+
+
+FORMAS_DOMINIO = _formas_dominio()
+
+_PALABRA = re.compile(r"[a-z0-9]+")
+
+
+def analizar_dominio(mensaje: str) -> Tuple[bool, List[str]]:
+    """
+    Valida el dominio y detecta productos en una sola pasada
+
+    Args:
+        mensaje: Mensaje del usuario (con o sin acentos)
+
+    Returns:
+        (en_dominio, productos mencionados en orden de aparición y sin repetir)
+    """
+    texto = normalizar(mensaje)
+
+    en_dominio = False
+    productos: List[str] = []
+    for palabra in _PALABRA.findall(texto):
+        if palabra in FORMAS_DOMINIO:
+            en_dominio = True
+            producto = FORMAS_DOMINIO[palabra]
+            if producto is not None and producto not in productos:
+                productos.append(producto)
+    return en_dominio, productos
@@ -0,0 +1,112 @@
+"""
+Cache clave/valor persistente en SQLite, compartido entre procesos
+"""
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterable, Optional, Tuple
+
+
+class CacheDisco:
+    """
+    Cache con vencimiento guardado en un archivo SQLite.
+
+    Los valores se serializan como JSON. Varios procesos pueden usar el mismo
+    archivo a la vez (modo WAL); cada hilo abre su propia conexión.
+    """
+
+    def __init__(self, ruta: Path, tabla: str = "cache"):
+        """
+        Abre (o crea) el cache
+
+        Args:
+            ruta: Archivo SQLite
+            tabla: Nombre de la tabla (permite varios caches en un archivo)
+        """
+        self.ruta = Path(ruta)
+        self.tabla = tabla
+        self._local = threading.local()
+        self.ruta.parent.mkdir(parents=True, exist_ok=True)
+
+        conexion = self._conexion()
+        conexion.execute("PRAGMA journal_mode=WAL")
+        conexion.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.tabla} ("
+            "clave TEXT PRIMARY KEY, valor TEXT, expira REAL)"
+        )
+        conexion.commit()
+
+    def _conexion(self) -> sqlite3.Connection:
+        conexion = getattr(self._local, "conexion", None)
+        if conexion is None:
+            conexion = sqlite3.connect(str(self.ruta), timeout=10)
+            self._local.conexion = conexion
+        return conexion
+
+    def obtener(self, clave: str) -> Tuple[bool, Any]:
+        """
+        Busca una clave vigente
+
+        Args:
+            clave: Clave a buscar
+
+        Returns:
+            (encontrado, valor); el valor puede ser None si se guardó así
+        """
+        encontrado, valor, _ = self.obtener_con_vencimiento(clave)
+        return encontrado, valor
+
+    def obtener_con_vencimiento(self, clave: str) -> Tuple[bool, Any, float]:
+        """
+        Como `obtener`, pero también devuelve cuándo vence la entrada
+
+        Returns:
+            (encontrado, valor, expira) con expira en segundos epoch (0 si no se encontró)
+        """
+        fila = self._conexion().execute(
+            f"SELECT valor, expira FROM {self.tabla} WHERE clave = ?", (clave,)
+        ).fetchone()
+        if fila is None or fila[1] < time.time():
+            return False, None, 0.0
+        return True, json.loads(fila[0]), fila[1]
+
+    def guardar(self, clave: str, valor: Any, ttl: float):
+        """
+        Guarda un valor serializable en JSON
+
+        Args:
+            clave: Clave
+            valor: Valor (None es válido, sirve para resultados negativos)
+            ttl: Segundos de vida
+        """
+        self.guardar_muchos([(clave, valor)], ttl)
+
+    def guardar_muchos(self, items: Iterable[Tuple[str, Any]], ttl: float):
+        """Guarda varios pares (clave, valor) en una sola transacción"""
+        expira = time.time() + ttl
+        conexion = self._conexion()
+        with conexion:
+            conexion.executemany(
+                f"INSERT OR REPLACE INTO {self.tabla} (clave, valor, expira) VALUES (?, ?, ?)",
+                [(clave, json.dumps(valor, ensure_ascii=False), expira) for clave, valor in items]
+            )
+
+    def purgar(self) -> int:
+        """
+        Elimina las entradas vencidas
+
+        Returns:
+            Cantidad de entradas eliminadas
+        """
+        conexion = self._conexion()
+        with conexion:
+            cursor = conexion.execute(f"DELETE FROM {self.tabla} WHERE expira < ?", (time.time(),))
+        return cursor.rowcount
+
+    def __len__(self) -> int:
+        fila = self._conexion().execute(
+            f"SELECT COUNT(*) FROM {self.tabla} WHERE expira >= ?", (time.time(),)
+        ).fetchone()
+        return fila[0]
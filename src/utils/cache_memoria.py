@@ -0,0 +1,104 @@
+"""
+Cache LRU en memoria con TTL, métricas y persistencia opcional en disco
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from src.utils.cache_disco import CacheDisco
+
+
+class CacheLRU:
+    """
+    Cache acotado en cantidad de entradas y en tiempo de vida.
+
+    Si se le pasa un CacheDisco, cada escritura también va a disco y los
+    fallos en memoria se buscan ahí antes de contarse como fallo, así el
+    contenido sobrevive reinicios y se comparte entre procesos.
+    """
+
+    def __init__(self, max_items: int, ttl: float, disco: Optional[CacheDisco] = None):
+        """
+        Args:
+            max_items: Cantidad máxima de entradas en memoria
+            ttl: Segundos de vida de cada entrada
+            disco: Cache persistente opcional
+        """
+        self.max_items = max_items
+        self.ttl = ttl
+        self.disco = disco
+        self._datos: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, clave: str) -> Tuple[bool, Any]:
+        """
+        Busca una clave vigente
+
+        Returns:
+            (encontrado, valor)
+        """
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is not None:
+                expira, valor = entrada
+                if expira >= time.time():
+                    self._datos.move_to_end(clave)
+                    self.aciertos += 1
+                    return True, valor
+                del self._datos[clave]
+
+        if self.disco is not None:
+            encontrado, valor, expira = self.disco.obtener_con_vencimiento(clave)
+            if encontrado:
+                # Con el vencimiento original: si no, la entrada se renovaría
+                # cada vez que pasa de disco a memoria
+                self._guardar_memoria(clave, valor, expira)
+                with self._lock:
+                    self.aciertos += 1
+                return True, valor
+
+        with self._lock:
+            self.fallos += 1
+        return False, None
+
+    def guardar(self, clave: str, valor: Any):
+        """Guarda un valor (en disco también, si hay cache persistente)"""
+        self._guardar_memoria(clave, valor)
+        if self.disco is not None:
+            self.disco.guardar(clave, valor, self.ttl)
+
+    def _guardar_memoria(self, clave: str, valor: Any, expira: Optional[float] = None):
+        with self._lock:
+            self._datos[clave] = (expira if expira is not None else time.time() + self.ttl, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_items:
+                self._datos.popitem(last=False)
+
+    def limpiar(self):
+        """Vacía la parte en memoria y reinicia las métricas"""
+        with self._lock:
+            self._datos.clear()
+            self.aciertos = 0
+            self.fallos = 0
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """
+        Métricas de uso
+
+        Returns:
+            Diccionario con aciertos, fallos, tasa_aciertos e items en memoria
+        """
+        with self._lock:
+            total = self.aciertos + self.fallos
+            return {
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": round(self.aciertos / total, 3) if total else 0.0,
+                "items": len(self._datos),
+            }
+
+    def __len__(self) -> int:
+        return len(self._datos)
@@ -0,0 +1,181 @@
+"""
+Índice espacial (grilla lat/lon) para consultas por radio sobre sucursales
+"""
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.models.models import Supermercado
+from src.utils.texto import normalizar
+
+RADIO_TIERRA_KM = 6371.0088
+KM_POR_GRADO_LAT = 111.32
+
+
+def distancia_haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Distancia aproximada en km entre dos puntos (fórmula de haversine)
+
+    Es mucho más barata que geodesic y sirve para descartar candidatos.
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * RADIO_TIERRA_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def cadena_de(supermercado: Supermercado) -> str:
+    """Clave normalizada de la cadena de una sucursal (ej: "Atomo Guaymallén" -> "atomo")"""
+    if supermercado.cadena:
+        return normalizar(supermercado.cadena)
+    return normalizar(supermercado.nombre.split()[0]) if supermercado.nombre else ""
+
+
+class IndiceEspacial:
+    """
+    Grilla de celdas de tamaño fijo (en grados) construida una sola vez.
+
+    Cada celda guarda las sucursales agrupadas por cadena, así una consulta
+    filtrada por cadena sólo recorre las sucursales de esas cadenas en las
+    celdas que toca el radio.
+    """
+
+    def __init__(self, supermercados: Iterable[Supermercado], tamano_celda_km: float = 5.0):
+        """
+        Construye el índice
+
+        Args:
+            supermercados: Sucursales a indexar
+            tamano_celda_km: Lado aproximado de cada celda en km
+        """
+        self.tamano_celda_grados = tamano_celda_km / KM_POR_GRADO_LAT
+        self._celdas: Dict[Tuple[int, int], Dict[str, List[Supermercado]]] = {}
+        self._total = 0
+
+        for supermercado in supermercados:
+            celda = self._celda(supermercado.latitud, supermercado.longitud)
+            por_cadena = self._celdas.setdefault(celda, {})
+            por_cadena.setdefault(cadena_de(supermercado), []).append(supermercado)
+            self._total += 1
+
+        if self._celdas:
+            filas = [c[0] for c in self._celdas]
+            columnas = [c[1] for c in self._celdas]
+            self._limites = (min(filas), max(filas), min(columnas), max(columnas))
+        else:
+            self._limites = (0, -1, 0, -1)
+
+    def __len__(self) -> int:
+        return self._total
+
+    def _celda(self, lat: float, lon: float) -> Tuple[int, int]:
+        return (math.floor(lat / self.tamano_celda_grados),
+                math.floor(lon / self.tamano_celda_grados))
+
+    def _candidatos(self, fila: int, columna: int, cadenas: Optional[set]):
+        por_cadena = self._celdas.get((fila, columna))
+        if not por_cadena:
+            return
+        if cadenas is None:
+            for lista in por_cadena.values():
+                yield from lista
+        else:
+            for cadena in cadenas:
+                yield from por_cadena.get(cadena, ())
+
+    @staticmethod
+    def _normalizar_cadenas(cadenas: Optional[Iterable[str]]) -> Optional[set]:
+        if cadenas is None:
+            return None
+        return {normalizar(c) for c in cadenas}
+
+    def radio(
+        self,
+        lat: float,
+        lon: float,
+        km: float,
+        cadenas: Optional[Iterable[str]] = None
+    ) -> List[Tuple[float, Supermercado]]:
+        """
+        Sucursales a menos de `km` del punto, ordenadas por distancia
+
+        Args:
+            lat: Latitud del centro
+            lon: Longitud del centro
+            km: Radio de búsqueda en km
+            cadenas: Cadenas a incluir (ej: ["Atomo", "Vea"]); None = todas
+
+        Returns:
+            Lista de tuplas (distancia_km, supermercado)
+        """
+        filtro = self._normalizar_cadenas(cadenas)
+        dlat = km / KM_POR_GRADO_LAT
+        dlon = km / (KM_POR_GRADO_LAT * max(math.cos(math.radians(lat)), 1e-6))
+
+        fila_min, columna_min = self._celda(lat - dlat, lon - dlon)
+        fila_max, columna_max = self._celda(lat + dlat, lon + dlon)
+        fila_min, fila_max = max(fila_min, self._limites[0]), min(fila_max, self._limites[1])
+        columna_min, columna_max = max(columna_min, self._limites[2]), min(columna_max, self._limites[3])
+
+        resultados = []
+        for fila in range(fila_min, fila_max + 1):
+            for columna in range(columna_min, columna_max + 1):
+                for supermercado in self._candidatos(fila, columna, filtro):
+                    distancia = distancia_haversine(lat, lon, supermercado.latitud, supermercado.longitud)
+                    if distancia <= km:
+                        resultados.append((distancia, supermercado))
+
+        resultados.sort(key=lambda x: x[0])
+        return resultados
+
+    def k_cercanos(
+        self,
+        lat: float,
+        lon: float,
+        k: int,
+        cadenas: Optional[Iterable[str]] = None
+    ) -> List[Tuple[float, Supermercado]]:
+        """
+        Las `k` sucursales más cercanas al punto
+
+        Recorre anillos de celdas crecientes alrededor del punto y corta
+        cuando el anillo ya cubre una distancia mayor a la del k-ésimo.
+
+        Args:
+            lat: Latitud del centro
+            lon: Longitud del centro
+            k: Cantidad de sucursales a devolver
+            cadenas: Cadenas a incluir; None = todas
+
+        Returns:
+            Lista de tuplas (distancia_km, supermercado) ordenada por distancia
+        """
+        if k <= 0 or not self._celdas:
+            return []
+
+        filtro = self._normalizar_cadenas(cadenas)
+        fila_0, columna_0 = self._celda(lat, lon)
+        # Distancia mínima que cubre cada anillo (la longitud se achica con la latitud)
+        km_por_anillo = self.tamano_celda_grados * KM_POR_GRADO_LAT * min(1.0, math.cos(math.radians(lat)))
+        anillo_max = max(
+            abs(fila_0 - self._limites[0]), abs(fila_0 - self._limites[1]),
+            abs(columna_0 - self._limites[2]), abs(columna_0 - self._limites[3])
+        )
+
+        encontrados: List[Tuple[float, Supermercado]] = []
+        for anillo in range(anillo_max + 1):
+            for fila in range(fila_0 - anillo, fila_0 + anillo + 1):
+                borde_fila = fila in (fila_0 - anillo, fila_0 + anillo)
+                paso = 1 if borde_fila else 2 * anillo
+                for columna in range(columna_0 - anillo, columna_0 + anillo + 1, max(paso, 1)):
+                    for supermercado in self._candidatos(fila, columna, filtro):
+                        distancia = distancia_haversine(lat, lon, supermercado.latitud, supermercado.longitud)
+                        encontrados.append((distancia, supermercado))
+
+            if len(encontrados) >= k:
+                encontrados.sort(key=lambda x: x[0])
+                if encontrados[k - 1][0] <= anillo * km_por_anillo:
+                    break
+
+        encontrados.sort(key=lambda x: x[0])
+        return encontrados[:k]
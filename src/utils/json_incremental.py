@@ -0,0 +1,88 @@
+"""
+Parser JSON incremental para la respuesta en streaming de Bedrock
+"""
+import json
+from typing import Any, Dict, List, Optional
+
+
+class ParserProductosIncremental:
+    """
+    Recibe el texto del modelo de a pedazos y devuelve cada objeto de
+    `productos[i]` apenas se cierra, sin esperar al resto de la respuesta.
+
+    Sólo sigue la estructura (llaves, corchetes y strings); el contenido de
+    cada producto se valida con json.loads cuando está completo.
+    """
+
+    def __init__(self, clave: str = "productos"):
+        self.clave = clave
+        self.texto = ""
+        self._pos = 0
+        self._pila: List[str] = []
+        self._en_string = False
+        self._escape = False
+        self._inicio_string = 0
+        self._ultima_cadena_raiz: Optional[str] = None
+        self._pila_array_productos: Optional[int] = None
+        self._inicio_objeto: Optional[int] = None
+
+    def alimentar(self, fragmento: str) -> List[Dict[str, Any]]:
+        """
+        Agrega texto y devuelve los productos que quedaron completos
+
+        Args:
+            fragmento: Siguiente pedazo de texto generado
+
+        Returns:
+            Lista (posiblemente vacía) de productos nuevos
+        """
+        self.texto += fragmento
+        completos = []
+
+        while self._pos < len(self.texto):
+            i = self._pos
+            c = self.texto[i]
+            self._pos += 1
+
+            if self._en_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._en_string = False
+                    if len(self._pila) == 1:
+                        self._ultima_cadena_raiz = self.texto[self._inicio_string + 1:i]
+                continue
+
+            if not self._pila and c != "{":
+                # Texto antes del JSON (el modelo a veces agrega una introducción)
+                continue
+
+            if c == '"':
+                self._en_string = True
+                self._inicio_string = i
+            elif c in "{[":
+                if (c == "{" and self._pila_array_productos is not None
+                        and len(self._pila) == self._pila_array_productos):
+                    self._inicio_objeto = i
+                self._pila.append(c)
+                if (c == "[" and len(self._pila) == 2
+                        and self._ultima_cadena_raiz == self.clave):
+                    self._pila_array_productos = len(self._pila)
+            elif c in "}]":
+                if not self._pila:
+                    continue
+                self._pila.pop()
+                if (c == "}" and self._inicio_objeto is not None
+                        and len(self._pila) == self._pila_array_productos):
+                    try:
+                        completos.append(json.loads(self.texto[self._inicio_objeto:i + 1]))
+                    except json.JSONDecodeError:
+                        pass
+                    self._inicio_objeto = None
+                elif c == "]" and self._pila_array_productos is not None \
+                        and len(self._pila) == self._pila_array_productos - 1:
+                    self._pila_array_productos = None
+
+        return completos
@@ -0,0 +1,27 @@
+"""
+Limitador de tasa compartido entre hilos
+"""
+import threading
+import time
+
+
+class LimitadorTasa:
+    """Garantiza un intervalo mínimo entre llamadas (ej: 1 request/segundo)"""
+
+    def __init__(self, por_segundo: float):
+        """
+        Args:
+            por_segundo: Cantidad máxima de llamadas por segundo
+        """
+        self.intervalo = 1.0 / por_segundo
+        self._lock = threading.Lock()
+        self._proxima = 0.0
+
+    def esperar(self):
+        """Bloquea hasta que se pueda hacer la siguiente llamada"""
+        with self._lock:
+            ahora = time.monotonic()
+            espera = self._proxima - ahora
+            self._proxima = max(ahora, self._proxima) + self.intervalo
+        if espera > 0:
+            time.sleep(espera)
@@ -0,0 +1,54 @@
+"""
+Memo de etapas de un pipeline, cada una con su propia clave
+
+Cada etapa guarda el último resultado junto con la clave de las entradas que
+lo produjeron. Si en el siguiente rerun la clave es la misma, se reutiliza;
+si cambió, sólo se recalcula esa etapa (y las que dependen de ella, porque
+sus claves incluyen la de la etapa anterior).
+"""
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class MemoEtapas:
+    """Último resultado de cada etapa, indexado por la clave de sus entradas"""
+
+    def __init__(self):
+        self._etapas: Dict[str, Tuple[Hashable, Any]] = {}
+        self.recalculos: Dict[str, int] = {}
+
+    def buscar(self, etapa: str, clave: Hashable) -> Tuple[bool, Any]:
+        """
+        Returns:
+            (encontrado, valor) del último cálculo de la etapa si la clave coincide
+        """
+        entrada = self._etapas.get(etapa)
+        if entrada is not None and entrada[0] == clave:
+            return True, entrada[1]
+        return False, None
+
+    def guardar(self, etapa: str, clave: Hashable, valor: Any):
+        """Reemplaza el resultado de la etapa"""
+        self._etapas[etapa] = (clave, valor)
+        self.recalculos[etapa] = self.recalculos.get(etapa, 0) + 1
+
+    def obtener(self, etapa: str, clave: Hashable, calcular: Callable[[], Any]) -> Any:
+        """
+        Devuelve el resultado de la etapa, calculándolo sólo si cambió la clave
+
+        Args:
+            etapa: Nombre de la etapa
+            clave: Clave de las entradas de la etapa (hashable)
+            calcular: Función sin argumentos que produce el resultado
+
+        Returns:
+            Resultado memorizado o recién calculado
+        """
+        encontrado, valor = self.buscar(etapa, clave)
+        if encontrado:
+            return valor
+        valor = calcular()
+        self.guardar(etapa, clave, valor)
+        return valor
+
+    def limpiar(self):
+        self._etapas.clear()
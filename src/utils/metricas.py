@@ -0,0 +1,274 @@
+"""
+Métricas de tiempos por etapa (spans agregados en histogramas)
+
+Cada etapa de una búsqueda se mide con un span:
+
+    with span("scraping", cadena="Vea", termino="yerba") as s:
+        ...
+        s.etiquetar(cache="miss")
+
+Al cerrarse, la duración se suma al histograma de esa etapa y esas etiquetas
+(`resultado` vale "ok", o "error" si salió una excepción, salvo que la etapa
+lo fije). Los histogramas se exportan en formato de texto de Prometheus o en
+JSON con percentiles estimados, desde /metrics de la API o desde el servidor
+local que levanta la app si se configura METRICAS_PUERTO.
+"""
+import json
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.config import METRICAS_BUCKETS_S, METRICAS_MAX_SERIES
+
+NOMBRE_METRICA = "comparador_etapa_duracion_segundos"
+
+# Etiquetas que se descartan cuando se llega al máximo de series
+ETIQUETAS_VARIABLES = ("termino",)
+
+Etiquetas = Tuple[Tuple[str, str], ...]
+
+
+class Histograma:
+    """Conteo acumulado por bucket, suma y cantidad de observaciones"""
+
+    def __init__(self, limites: Tuple[float, ...]):
+        self.limites = limites
+        self.conteos = [0] * (len(limites) + 1)  # el último es +Inf
+        self.suma = 0.0
+        self.cantidad = 0
+
+    def observar(self, valor: float):
+        self.conteos[bisect_left(self.limites, valor)] += 1
+        self.suma += valor
+        self.cantidad += 1
+
+    def acumulados(self) -> List[int]:
+        """Conteos acumulados por bucket (le=limite), terminando en +Inf"""
+        total, acumulados = 0, []
+        for conteo in self.conteos:
+            total += conteo
+            acumulados.append(total)
+        return acumulados
+
+    def percentil(self, q: float) -> Optional[float]:
+        """
+        Percentil estimado interpolando dentro del bucket (como histogram_quantile)
+
+        Returns:
+            Segundos, o None si no hay observaciones
+        """
+        if not self.cantidad:
+            return None
+        objetivo = q * self.cantidad
+        anterior_limite, anterior_total = 0.0, 0
+        for limite, total in zip(self.limites, self.acumulados()):
+            if total >= objetivo:
+                dentro = total - anterior_total
+                fraccion = (objetivo - anterior_total) / dentro if dentro else 1.0
+                return anterior_limite + (limite - anterior_limite) * fraccion
+            anterior_limite, anterior_total = limite, total
+        # Cae en +Inf: lo único que se sabe es que supera el último límite
+        return self.limites[-1]
+
+
+class Span:
+    """Medición de una etapa en curso (ver `RegistroMetricas.span`)"""
+
+    def __init__(self, registro: "RegistroMetricas", nombre: str, etiquetas: Dict[str, Any]):
+        self._registro = registro
+        self.nombre = nombre
+        self.etiquetas = etiquetas
+        self.inicio = 0.0
+        self.duracion = 0.0
+
+    def etiquetar(self, **etiquetas):
+        """Agrega o cambia etiquetas antes de cerrar el span (ej: cache, resultado)"""
+        self.etiquetas.update(etiquetas)
+
+    def __enter__(self) -> "Span":
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        self.duracion = time.perf_counter() - self.inicio
+        if tipo is GeneratorExit:
+            # El consumidor dejó de leer un generador a mitad de camino
+            self.etiquetas.setdefault("resultado", "cancelado")
+        elif tipo is not None:
+            self.etiquetas["resultado"] = "error"
+        else:
+            self.etiquetas.setdefault("resultado", "ok")
+        self._registro.observar(self.nombre, self.duracion, **self.etiquetas)
+        return False
+
+
+class RegistroMetricas:
+    """Histogramas por (etapa, etiquetas), seguro entre hilos"""
+
+    def __init__(self, limites: Tuple[float, ...] = METRICAS_BUCKETS_S, max_series: int = METRICAS_MAX_SERIES):
+        """
+        Args:
+            limites: Límites de los buckets en segundos (ordenados)
+            max_series: Series distintas antes de empezar a descartar ETIQUETAS_VARIABLES
+        """
+        self.limites = tuple(sorted(limites))
+        self.max_series = max_series
+        self._series: Dict[Tuple[str, Etiquetas], Histograma] = {}
+        self._lock = threading.Lock()
+
+    def span(self, nombre: str, **etiquetas) -> Span:
+        """Context manager que mide el bloque y lo registra en `nombre`"""
+        return Span(self, nombre, etiquetas)
+
+    def observar(self, nombre: str, duracion: float, **etiquetas):
+        """
+        Registra una duración
+
+        Args:
+            nombre: Etapa (ej: "scraping")
+            duracion: Segundos
+            **etiquetas: Etiquetas de la serie (los valores se pasan a texto; None se omite)
+        """
+        clave = (nombre, tuple(sorted((k, str(v)) for k, v in etiquetas.items() if v is not None)))
+        with self._lock:
+            histograma = self._series.get(clave)
+            if histograma is None:
+                if len(self._series) >= self.max_series:
+                    # Sin límite, cada término distinto sería una serie nueva
+                    clave = (nombre, tuple((k, v) for k, v in clave[1] if k not in ETIQUETAS_VARIABLES))
+                    histograma = self._series.get(clave)
+                if histograma is None:
+                    histograma = self._series[clave] = Histograma(self.limites)
+            histograma.observar(duracion)
+
+    def _copiar(self) -> List[Tuple[str, Etiquetas, Histograma]]:
+        with self._lock:
+            copias = []
+            for (nombre, etiquetas), histograma in sorted(self._series.items()):
+                copia = Histograma(histograma.limites)
+                copia.conteos = list(histograma.conteos)
+                copia.suma, copia.cantidad = histograma.suma, histograma.cantidad
+                copias.append((nombre, etiquetas, copia))
+            return copias
+
+    def prometheus(self) -> str:
+        """Histogramas en formato de texto de Prometheus (0.0.4)"""
+        lineas = [
+            f"# HELP {NOMBRE_METRICA} Duración de cada etapa de la búsqueda",
+            f"# TYPE {NOMBRE_METRICA} histogram"
+        ]
+        for nombre, etiquetas, histograma in self._copiar():
+            base = [("etapa", nombre), *etiquetas]
+            limites = [f"{limite:g}" for limite in histograma.limites] + ["+Inf"]
+            for limite, total in zip(limites, histograma.acumulados()):
+                lineas.append(f"{NOMBRE_METRICA}_bucket{_etiquetas_prometheus(base + [('le', limite)])} {total}")
+            lineas.append(f"{NOMBRE_METRICA}_sum{_etiquetas_prometheus(base)} {histograma.suma:.6f}")
+            lineas.append(f"{NOMBRE_METRICA}_count{_etiquetas_prometheus(base)} {histograma.cantidad}")
+        return "\n".join(lineas) + "\n"
+
+    def a_dict(self) -> Dict[str, Any]:
+        """Series con cantidad, suma y percentiles estimados (segundos)"""
+        series = []
+        for nombre, etiquetas, histograma in self._copiar():
+            series.append({
+                "etapa": nombre,
+                "etiquetas": dict(etiquetas),
+                "cantidad": histograma.cantidad,
+                "suma_s": round(histograma.suma, 6),
+                "promedio_s": round(histograma.suma / histograma.cantidad, 6) if histograma.cantidad else None,
+                "p50_s": histograma.percentil(0.50),
+                "p95_s": histograma.percentil(0.95),
+                "p99_s": histograma.percentil(0.99),
+                "buckets": {
+                    limite: total
+                    for limite, total in zip(
+                        [f"{limite:g}" for limite in histograma.limites] + ["+Inf"], histograma.acumulados()
+                    )
+                }
+            })
+        return {"metrica": NOMBRE_METRICA, "series": series}
+
+    def exportar(self, formato: str = "prometheus") -> Tuple[str, bytes]:
+        """
+        Returns:
+            (content-type, cuerpo) en formato "prometheus" o "json"
+        """
+        if formato == "json":
+            return "application/json; charset=utf-8", json.dumps(self.a_dict(), ensure_ascii=False).encode("utf-8")
+        return "text/plain; version=0.0.4; charset=utf-8", self.prometheus().encode("utf-8")
+
+    def limpiar(self):
+        with self._lock:
+            self._series.clear()
+
+
+def _etiquetas_prometheus(etiquetas: List[Tuple[str, str]]) -> str:
+    def escapar(valor: str) -> str:
+        return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return "{" + ",".join(f'{k}="{escapar(v)}"' for k, v in etiquetas) + "}"
+
+
+def formato_pedido(ruta: str, aceptar: str = "") -> str:
+    """Formato de exportación según la ruta (?formato=json, /metrics.json) o el encabezado Accept"""
+    ruta, _, consulta = ruta.partition("?")
+    if ruta.endswith(".json") or "formato=json" in consulta.split("&") or "application/json" in (aceptar or ""):
+        return "json"
+    return "prometheus"
+
+
+_registro: Optional[RegistroMetricas] = None
+_registro_lock = threading.Lock()
+
+
+def obtener_metricas() -> RegistroMetricas:
+    """Registro de métricas compartido por todo el proceso"""
+    global _registro
+    if _registro is None:
+        with _registro_lock:
+            if _registro is None:
+                _registro = RegistroMetricas()
+    return _registro
+
+
+def span(nombre: str, **etiquetas) -> Span:
+    """Atajo para `obtener_metricas().span(...)`"""
+    return obtener_metricas().span(nombre, **etiquetas)
+
+
+def iniciar_servidor_metricas(host: str, puerto: int):
+    """
+    Sirve GET /metrics (Prometheus) y /metrics.json en un hilo aparte
+
+    Pensado para procesos sin API propia (la app de Streamlit).
+
+    Returns:
+        El servidor, o None si el puerto está ocupado (ej: otra instancia)
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class ManejadorMetricas(BaseHTTPRequestHandler):
+        def log_message(self, formato, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/metrics.json"):
+                self.send_error(404)
+                return
+            tipo, cuerpo = obtener_metricas().exportar(formato_pedido(self.path, self.headers.get("Accept", "")))
+            self.send_response(200)
+            self.send_header("Content-Type", tipo)
+            self.send_header("Content-Length", str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+    try:
+        servidor = ThreadingHTTPServer((host, puerto), ManejadorMetricas)
+    except OSError as e:
+        print(f"⚠️ No se pudo abrir el servidor de métricas en {host}:{puerto}: {e}")
+        return None
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, name="metricas", daemon=True).start()
+    print(f"📈 Métricas en http://{host}:{servidor.server_address[1]}/metrics")
+    return servidor
@@ -0,0 +1,220 @@
+"""
+Orquestador de etapas con dependencias (DAG)
+
+Cada etapa declara de qué otras etapas depende y recibe sus resultados como
+argumentos con nombre. Las etapas independientes corren en paralelo en un
+pool de hilos; las que tocan la interfaz de Streamlit se marcan para correr
+en el hilo que llamó a `ejecutar`. Se mide el tiempo de cada etapa.
+
+Para que una etapa consuma la salida de otra a medida que se produce (ej: el
+stream del LLM) sin esperar a que termine, se comunican por un CanalEventos.
+Si una etapa falla, `al_fallar` permite cancelar ese canal antes de esperar a
+las etapas que siguen corriendo en el pool.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set
+
+
+class Etapa:
+    """Una etapa del pipeline"""
+
+    def __init__(self, nombre: str, funcion: Callable[..., Any],
+                 dependencias: Sequence[str] = (), en_hilo_llamador: bool = False):
+        self.nombre = nombre
+        self.funcion = funcion
+        self.dependencias = tuple(dependencias)
+        self.en_hilo_llamador = en_hilo_llamador
+
+
+class Orquestador:
+    """Ejecuta un DAG de etapas, en paralelo a medida que se resuelven las dependencias"""
+
+    def __init__(self, max_workers: int = 4, nombre: str = "pipeline"):
+        """
+        Args:
+            max_workers: Etapas simultáneas en el pool
+            nombre: Nombre para los logs de tiempos
+        """
+        self.max_workers = max_workers
+        self.nombre = nombre
+        self._etapas: Dict[str, Etapa] = {}
+        self._al_fallar: List[Callable[[], Any]] = []
+        self.tiempos: Dict[str, Dict[str, float]] = {}
+        self.duracion_total = 0.0
+
+    def agregar(self, nombre: str, funcion: Callable[..., Any],
+                dependencias: Sequence[str] = (), en_hilo_llamador: bool = False) -> "Orquestador":
+        """
+        Agrega una etapa
+
+        Args:
+            nombre: Nombre único de la etapa (y del argumento con que la reciben las que dependen de ella)
+            funcion: Recibe los resultados de sus dependencias como argumentos con nombre
+            dependencias: Etapas que tienen que terminar antes
+            en_hilo_llamador: Correr en el hilo de `ejecutar` (necesario para usar st.*)
+
+        Returns:
+            El mismo orquestador, para encadenar llamadas
+        """
+        if nombre in self._etapas:
+            raise ValueError(f"Etapa duplicada: {nombre}")
+        self._etapas[nombre] = Etapa(nombre, funcion, dependencias, en_hilo_llamador)
+        return self
+
+    def al_fallar(self, funcion: Callable[[], Any]) -> "Orquestador":
+        """
+        Registra una función a llamar si alguna etapa falla
+
+        Se llama antes de esperar a las etapas en curso, así puede destrabarlas
+        (ej: `canal.cancelar` para que el productor deje de leer el stream).
+
+        Returns:
+            El mismo orquestador, para encadenar llamadas
+        """
+        self._al_fallar.append(funcion)
+        return self
+
+    def _validar(self):
+        """Verifica que las dependencias existan y que no haya ciclos"""
+        for etapa in self._etapas.values():
+            faltantes = [d for d in etapa.dependencias if d not in self._etapas]
+            if faltantes:
+                raise ValueError(f"La etapa {etapa.nombre} depende de etapas inexistentes: {faltantes}")
+
+        resueltas: Set[str] = set()
+        pendientes = set(self._etapas)
+        while pendientes:
+            listas = {n for n in pendientes if set(self._etapas[n].dependencias) <= resueltas}
+            if not listas:
+                raise ValueError(f"Dependencias circulares entre: {sorted(pendientes)}")
+            resueltas |= listas
+            pendientes -= listas
+
+    def ejecutar(self) -> Dict[str, Any]:
+        """
+        Ejecuta todas las etapas respetando las dependencias
+
+        Returns:
+            Resultado de cada etapa, por nombre
+
+        Raises:
+            La primera excepción de una etapa (las que dependen de ella no se ejecutan)
+        """
+        self._validar()
+        resultados: Dict[str, Any] = {}
+        pendientes = dict(self._etapas)
+        en_curso: Dict[Future, str] = {}
+        inicio_total = time.perf_counter()
+        self.tiempos = {}
+
+        def correr(etapa: Etapa):
+            inicio = time.perf_counter()
+            try:
+                return etapa.funcion(**{d: resultados[d] for d in etapa.dependencias})
+            finally:
+                fin = time.perf_counter()
+                self.tiempos[etapa.nombre] = {
+                    "inicio": inicio - inicio_total,
+                    "duracion": fin - inicio
+                }
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="etapa") as executor:
+            try:
+                while pendientes or en_curso:
+                    listas = [e for e in pendientes.values() if all(d in resultados for d in e.dependencias)]
+                    for etapa in listas:
+                        del pendientes[etapa.nombre]
+                        if not etapa.en_hilo_llamador:
+                            en_curso[executor.submit(correr, etapa)] = etapa.nombre
+
+                    # Las etapas del hilo llamador corren de a una; mientras tanto
+                    # el pool sigue avanzando con las demás
+                    locales = [e for e in listas if e.en_hilo_llamador]
+                    for etapa in locales:
+                        resultados[etapa.nombre] = correr(etapa)
+                    if locales:
+                        continue
+
+                    if not en_curso:
+                        break
+                    terminados, _ = wait(en_curso, return_when=FIRST_COMPLETED)
+                    for futuro in terminados:
+                        resultados[en_curso.pop(futuro)] = futuro.result()
+            except BaseException:
+                for futuro in en_curso:
+                    futuro.cancel()
+                for funcion in self._al_fallar:
+                    funcion()
+                raise
+            finally:
+                self.duracion_total = time.perf_counter() - inicio_total
+
+        print(f"⏱️ {self.nombre}: {self.resumen()}")
+        return resultados
+
+    def resumen(self) -> str:
+        """Tiempos por etapa en una línea (inicio relativo + duración)"""
+        partes = [
+            f"{nombre} {t['duracion'] * 1000:.0f}ms (+{t['inicio'] * 1000:.0f})"
+            for nombre, t in sorted(self.tiempos.items(), key=lambda x: x[1]["inicio"])
+        ]
+        return f"{' | '.join(partes)} → total {self.duracion_total * 1000:.0f}ms"
+
+
+_FIN = object()
+
+
+class CanalEventos:
+    """
+    Cola entre una etapa productora y una consumidora
+
+    El productor llama a `alimentar(iterable)` desde su etapa; el consumidor
+    itera el canal y recibe cada elemento apenas se produce. Si el productor
+    falla, la excepción se relanza en el consumidor. `cancelar` le avisa al
+    productor que deje de leer (ej: no hubo supermercados cercanos).
+    """
+
+    def __init__(self):
+        self._cola: "queue.Queue" = queue.Queue()
+        self._cancelado = threading.Event()
+
+    def alimentar(self, elementos: Iterable[Any]) -> int:
+        """
+        Pasa los elementos al canal hasta agotarlos o hasta que se cancele
+
+        Returns:
+            Cantidad de elementos entregados
+        """
+        entregados = 0
+        iterador = iter(elementos)
+        try:
+            for elemento in iterador:
+                if self._cancelado.is_set():
+                    break
+                self._cola.put(elemento)
+                entregados += 1
+        except BaseException as e:
+            self._cola.put((_FIN, e))
+            raise
+        finally:
+            cerrar: Optional[Callable] = getattr(iterador, "close", None)
+            if cerrar is not None:
+                cerrar()
+        self._cola.put((_FIN, None))
+        return entregados
+
+    def cancelar(self):
+        """Le avisa al productor que deje de leer"""
+        self._cancelado.set()
+
+    def __iter__(self) -> Iterator[Any]:
+        while True:
+            elemento = self._cola.get()
+            if isinstance(elemento, tuple) and len(elemento) == 2 and elemento[0] is _FIN:
+                if elemento[1] is not None:
+                    raise elemento[1]
+                return
+            yield elemento
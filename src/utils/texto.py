@@ -0,0 +1,22 @@
+"""
+Helpers de normalización de texto compartidos por los servicios
+"""
+import re
+import unicodedata
+
+
+def normalizar(texto: str) -> str:
+    """
+    Normaliza un texto para usarlo como clave de búsqueda
+
+    Pasa a minúsculas, elimina acentos y colapsa espacios.
+
+    Args:
+        texto: Texto a normalizar
+
+    Returns:
+        Texto normalizado (ej: "  Guaymallén " -> "guaymallen")
+    """
+    texto = (texto or "").lower()
+    texto = ''.join(c for c in unicodedata.normalize('NFKD', texto) if not unicodedata.combining(c))
+    return re.sub(r'\s+', ' ', texto).strip()
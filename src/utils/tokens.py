@@ -0,0 +1,27 @@
+"""
+Estimación rápida de tokens para armar prompts dentro de un presupuesto
+"""
+import json
+import math
+from typing import Any
+
+# Promedio observado con Claude para texto en español y JSON minificado
+CARACTERES_POR_TOKEN = 3.5
+
+
+def estimar_tokens(texto: str) -> int:
+    """
+    Estima cuántos tokens ocupa un texto (sin llamar al tokenizador)
+
+    Args:
+        texto: Texto a enviar al modelo
+
+    Returns:
+        Cantidad aproximada de tokens (redondeada hacia arriba)
+    """
+    return math.ceil(len(texto) / CARACTERES_POR_TOKEN) if texto else 0
+
+
+def json_compacto(datos: Any) -> str:
+    """JSON sin espacios ni indentación (cada espacio también es un token)"""
+    return json.dumps(datos, ensure_ascii=False, separators=(",", ":"))
@@ -0,0 +1,62 @@
+"""
+Trie de prefijos para autocompletado
+"""
+from typing import Any, Dict, List
+
+
+class TriePrefijos:
+    """Trie sobre claves de texto; cada clave puede tener varios valores"""
+
+    _VALORES = "\0"
+
+    def __init__(self):
+        self._raiz: Dict[str, Any] = {}
+
+    def insertar(self, clave: str, valor: Any):
+        """
+        Agrega un valor bajo una clave
+
+        Args:
+            clave: Clave (ya normalizada)
+            valor: Valor asociado
+        """
+        nodo = self._raiz
+        for caracter in clave:
+            nodo = nodo.setdefault(caracter, {})
+        nodo.setdefault(self._VALORES, []).append(valor)
+
+    def buscar_prefijo(self, prefijo: str, limite: int = 10) -> List[Any]:
+        """
+        Valores cuyas claves empiezan con `prefijo`
+
+        Recorre primero las claves más cortas del subárbol, así los
+        resultados más cercanos al prefijo aparecen antes.
+
+        Args:
+            prefijo: Prefijo (ya normalizado)
+            limite: Cantidad máxima de valores a devolver
+
+        Returns:
+            Lista de valores sin repetir
+        """
+        nodo = self._raiz
+        for caracter in prefijo:
+            nodo = nodo.get(caracter)
+            if nodo is None:
+                return []
+
+        resultados: List[Any] = []
+        vistos = set()
+        nivel = [nodo]
+        while nivel and len(resultados) < limite:
+            siguiente = []
+            for actual in nivel:
+                for valor in actual.get(self._VALORES, ()):
+                    if id(valor) not in vistos:
+                        vistos.add(id(valor))
+                        resultados.append(valor)
+                        if len(resultados) >= limite:
+                            return resultados
+                siguiente.extend(hijo for c, hijo in sorted(actual.items()) if c != self._VALORES)
+            nivel = siguiente
+        return resultados
@@ -0,0 +1,138 @@
+"""
+API HTTP: validación del pedido, control de admisión y códigos de estado
+
+La búsqueda se reemplaza por una función falsa, así que no hace falta red
+ni credenciales.
+
+    python -m pytest tests/test_api.py
+"""
+import http.client
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src import api as modulo_api
+from src.api import ServidorAPI, estado_http
+from src.services.busqueda import ERROR_INTERPRETACION, UBICACION_NO_ENCONTRADA, ResultadoBusqueda
+
+
+def _resultado(estado="ok", **interpretacion):
+    resultado = ResultadoBusqueda()
+    resultado.estado = estado
+    resultado.interpretacion = interpretacion
+    return resultado
+
+
+@pytest.fixture
+def servidor(monkeypatch):
+    servidores = []
+
+    def crear(buscar, **opciones):
+        monkeypatch.setattr(modulo_api, "buscar_mejores_precios", buscar)
+        servicios = SimpleNamespace(scrapers={"Atomo": None, "Vea": None})
+        api = ServidorAPI(("127.0.0.1", 0), servicios=servicios, bedrock=object(), **opciones)
+        threading.Thread(target=api.serve_forever, daemon=True).start()
+        servidores.append(api)
+        return api
+
+    yield crear
+    for api in servidores:
+        api.shutdown()
+        api.server_close()
+
+
+def _post(api, cuerpo, encabezados=None):
+    host, puerto = api.server_address[:2]
+    conexion = http.client.HTTPConnection(host, puerto, timeout=10)
+    datos = cuerpo if isinstance(cuerpo, bytes) else json.dumps(cuerpo).encode()
+    conexion.putrequest("POST", "/compare")
+    for nombre, valor in (encabezados or {"Content-Length": str(len(datos))}).items():
+        conexion.putheader(nombre, valor)
+    conexion.endheaders(datos)
+    respuesta = conexion.getresponse()
+    estado, contenido = respuesta.status, json.loads(respuesta.read() or b"null")
+    conexion.close()
+    return estado, contenido
+
+
+@pytest.mark.parametrize("resultado, esperado", [
+    (_resultado(), 200),
+    (_resultado(UBICACION_NO_ENCONTRADA), 422),
+    (_resultado(ERROR_INTERPRETACION, error="x", tipo="fuera_de_dominio"), 422),
+    (_resultado(ERROR_INTERPRETACION, error="x", tipo="error_servicio"), 502),
+    (_resultado(ERROR_INTERPRETACION, error="x", tipo="error_timeout"), 504),
+    (_resultado(ERROR_INTERPRETACION, error="x", tipo="error_parseo"), 502),
+])
+def test_estado_http(resultado, esperado):
+    assert estado_http(resultado) == esperado
+
+
+def test_compare_valida_el_pedido(servidor):
+    api = servidor(lambda *args: _resultado())
+
+    assert _post(api, {"consulta": "yerba"})[0] == 200
+    assert _post(api, {"radio_km": 5})[0] == 400
+    assert _post(api, {"consulta": "yerba", "cadenas": ["Coto"]})[0] == 400
+    assert _post(api, b"{no es json")[0] == 400
+
+
+@pytest.mark.parametrize("largo", ["abc", "-5"])
+def test_content_length_invalido(servidor, largo):
+    api = servidor(lambda *args: _resultado())
+
+    estado, datos = _post(api, b"", {"Content-Length": largo})
+
+    assert estado == 400
+    assert "Content-Length" in datos["error"]
+
+
+def test_rechaza_con_429_cuando_no_hay_cupo(servidor):
+    liberar = threading.Event()
+
+    def lenta(*args):
+        liberar.wait(5)
+        return _resultado()
+
+    api = servidor(lenta, workers=1, cola_max=1)
+    estados = []
+    hilos = [threading.Thread(target=lambda: estados.append(_post(api, {"consulta": "yerba"})[0]))
+             for _ in range(2)]
+    for hilo in hilos:
+        hilo.start()
+    while api.estadisticas()["en_curso"] < 2:
+        time.sleep(0.01)
+
+    assert _post(api, {"consulta": "yerba"})[0] == 429
+
+    liberar.set()
+    for hilo in hilos:
+        hilo.join()
+    assert estados == [200, 200]
+    assert api.estadisticas()["rechazadas"] == 1
+    assert api.estadisticas()["atendidas"] == 2
+
+
+def test_busquedas_canceladas_al_cerrar_liberan_cupo(monkeypatch):
+    liberar = threading.Event()
+
+    def lenta(*args):
+        liberar.wait(5)
+        return _resultado()
+
+    monkeypatch.setattr(modulo_api, "buscar_mejores_precios", lenta)
+    api = ServidorAPI(("127.0.0.1", 0), workers=1, cola_max=2,
+                      servicios=SimpleNamespace(scrapers={}), bedrock=object())
+    pedido = {"consulta": "yerba", "ubicacion": "Godoy Cruz", "radio_km": 5, "cadenas": []}
+    corriendo, *encoladas = [api.enviar(pedido) for _ in range(3)]
+
+    api.server_close()
+    liberar.set()
+    corriendo.result(timeout=5)
+
+    assert all(futuro.cancelled() for futuro in encoladas)
+    estadisticas = api.estadisticas()
+    assert estadisticas["en_curso"] == 0
+    assert (estadisticas["atendidas"], estadisticas["errores"]) == (1, 0)
@@ -1,8 +1,3 @@
-import sys
-from pathlib import Path
-
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
 from src.scrapers.atomo_scraper import AtomoScraper
 from src.scrapers.vea_scraper import VeaScraper
 
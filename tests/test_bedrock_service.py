@@ -0,0 +1,196 @@
+"""
+Interpretación con el LLM: validación del esquema antes de cachear y lotes
+
+El cliente de Bedrock se reemplaza por uno falso que devuelve un stream con
+el texto indicado, o que responde cada lote con una función del test.
+
+    python -m pytest tests/test_bedrock_service.py
+"""
+import io
+import json
+import re
+
+import pytest
+
+from src.services import bedrock_service, plantillas_eventos
+from src.services.bedrock_service import BedrockService
+from src.services.llamadas_bedrock import LlamadorBedrock
+from src.utils.cache_memoria import CacheLRU
+
+CONSULTA = "cumpleaños para 30 niños"
+
+
+class ClienteFalso:
+    def __init__(self, texto):
+        self.texto = texto
+
+    def invoke_model_with_response_stream(self, modelId, body):
+        evento = {"type": "content_block_delta", "delta": {"text": self.texto}}
+        return {"body": [{"chunk": {"bytes": json.dumps(evento).encode()}}]}
+
+
+def _interpretacion_de(consulta):
+    return {
+        "evento": consulta.split()[0],
+        "personas": 10,
+        "productos": [{"nombre": f"producto de {consulta}", "cantidad_estimada": 1, "unidad": "unidades"}]
+    }
+
+
+class ClienteLote:
+    """
+    Responde los lotes con `responder(consultas) -> texto` y las consultas
+    sueltas (reintentos) con una interpretación válida
+    """
+
+    def __init__(self, responder):
+        self.responder = responder
+        self.lotes = []
+        self.sueltas = []
+
+    def invoke_model(self, modelId, body):
+        prompt = json.loads(body)["messages"][0]["content"]
+        consultas = re.findall(r'^\[\d+\] "(.*)"$', prompt, re.MULTILINE)
+        self.lotes.append(consultas)
+        respuesta = {"content": [{"text": self.responder(consultas)}], "usage": {"input_tokens": 10, "output_tokens": 5}}
+        return {"body": io.BytesIO(json.dumps(respuesta).encode())}
+
+    def invoke_model_with_response_stream(self, modelId, body):
+        consulta = re.search(r'CONSULTA DEL USUARIO: "(.*)"', json.loads(body)["messages"][0]["content"]).group(1)
+        self.sueltas.append(consulta)
+        return ClienteFalso(json.dumps(_interpretacion_de(consulta))).invoke_model_with_response_stream(modelId, body)
+
+
+def _responder_todas(consultas):
+    return json.dumps({"resultados": [dict(_interpretacion_de(c), indice=i) for i, c in enumerate(consultas)]})
+
+
+@pytest.fixture
+def servicio(monkeypatch):
+    # Caches sólo en memoria, sin tocar los del disco
+    monkeypatch.setattr(bedrock_service, "_cache_interpretaciones", CacheLRU(10, 60))
+    monkeypatch.setattr(plantillas_eventos, "_plantillas", plantillas_eventos.PlantillasEventos(CacheLRU(10, 60)))
+
+    def crear(texto_o_cliente):
+        cliente = ClienteFalso(texto_o_cliente) if isinstance(texto_o_cliente, str) else texto_o_cliente
+        monkeypatch.setattr(BedrockService, "client", cliente)
+        svc = BedrockService("a", "b", "us-east-1")
+        svc.llamador = LlamadorBedrock(deadline=5)
+        return svc
+
+    return crear
+
+
+def _interpretacion(svc):
+    return [valor for tipo, valor in svc._interpretar_con_llm(CONSULTA) if tipo == "interpretacion"][-1]
+
+
+def test_interpretacion_valida_se_cachea(servicio):
+    svc = servicio(json.dumps({
+        "evento": "cumpleaños",
+        "personas": 30,
+        "productos": [{"nombre": "gaseosa", "cantidad_estimada": 10, "unidad": "litros"}]
+    }))
+
+    interpretacion = _interpretacion(svc)
+
+    assert interpretacion["productos"][0]["nombre"] == "gaseosa"
+    assert svc.cache.obtener(svc._clave_cache(CONSULTA))[0]
+
+
+@pytest.mark.parametrize("texto", [
+    '{"productos": []}',
+    '{"productos": [{"nombre": "gaseosa", "cantidad_estimada": "mucha", "unidad": "litros"}]}',
+    '{"productos": [{"nombre": "gaseosa", ',
+    "No entendí la consulta",
+])
+def test_interpretacion_invalida_no_se_cachea(servicio, texto):
+    svc = servicio(texto)
+
+    interpretacion = _interpretacion(svc)
+
+    assert interpretacion["tipo"] == "error_parseo"
+    assert svc.cache.obtener(svc._clave_cache(CONSULTA)) == (False, None)
+
+
+def test_lote_une_repetidas_y_resuelve_sin_llm_lo_que_puede(servicio):
+    cliente = ClienteLote(_responder_todas)
+    svc = servicio(cliente)
+    consultas = [
+        "cumpleaños para 30 niños",
+        "yerba y café",                  # intérprete local
+        "asado para 10 personas",
+        "Cumpleaños para 30 niños ",     # repetida
+        "clima de mañana",               # fuera de dominio
+        "asado para 10 personas",
+    ]
+
+    resultados = svc.interpretar_lote(consultas)
+
+    assert cliente.lotes == [["cumpleaños para 30 niños", "asado para 10 personas"]]
+    assert cliente.sueltas == []
+    assert len(resultados) == len(consultas)
+    assert resultados[0]["productos"][0]["nombre"] == "producto de cumpleaños para 30 niños"
+    assert [p["nombre"] for p in resultados[1]["productos"]] == ["yerba", "café"]
+    assert resultados[2]["productos"][0]["nombre"] == "producto de asado para 10 personas"
+    assert resultados[3] == resultados[0] and resultados[5] == resultados[2]
+    assert resultados[4]["tipo"] == "fuera_de_dominio"
+    # Cada posición es una copia independiente
+    resultados[0]["productos"].clear()
+    assert resultados[3]["productos"]
+    assert svc.cache.obtener(svc._clave_cache("asado para 10 personas"))[0]
+
+
+def test_lote_respeta_el_tamano(servicio):
+    cliente = ClienteLote(_responder_todas)
+    svc = servicio(cliente)
+
+    svc.interpretar_lote(["asado para 10 personas", "picada para 8 amigos", "cumpleaños para 30 niños"],
+                         tamano_lote=2, max_paralelo=1)
+
+    assert [len(lote) for lote in cliente.lotes] == [2, 1]
+
+
+@pytest.mark.parametrize("responder", [
+    # Falta la segunda
+    lambda consultas: json.dumps({"resultados": [dict(_interpretacion_de(consultas[0]), indice=0)]}),
+    # La segunda no cumple el esquema
+    lambda consultas: json.dumps({"resultados": [
+        dict(_interpretacion_de(consultas[0]), indice=0),
+        {"indice": 1, "productos": [{"nombre": "carne", "cantidad_estimada": "mucha", "unidad": "kg"}]},
+    ]}),
+])
+def test_lote_reintenta_de_a_una_las_que_faltan(servicio, responder):
+    cliente = ClienteLote(responder)
+    svc = servicio(cliente)
+
+    resultados = svc.interpretar_lote(["cumpleaños para 30 niños", "asado para 10 personas"])
+
+    assert cliente.sueltas == ["asado para 10 personas"]
+    assert [r["productos"][0]["nombre"] for r in resultados] == [
+        "producto de cumpleaños para 30 niños", "producto de asado para 10 personas"
+    ]
+
+
+def test_lote_con_respuesta_ilegible_reintenta_todas(servicio):
+    cliente = ClienteLote(lambda consultas: '{"resultados": [{"indice": 0, ')
+    svc = servicio(cliente)
+
+    resultados = svc.interpretar_lote(["cumpleaños para 30 niños", "asado para 10 personas"])
+
+    assert cliente.sueltas == ["cumpleaños para 30 niños", "asado para 10 personas"]
+    assert all("error" not in r for r in resultados)
+
+
+def test_separar_lote_ignora_indices_fuera_de_rango():
+    texto = "Acá va:\n" + json.dumps({"resultados": [
+        dict(_interpretacion_de("b"), indice=1),
+        dict(_interpretacion_de("x"), indice=5),
+        dict(_interpretacion_de("y"), indice="0"),
+        "no es un objeto",
+    ]})
+
+    resultados = BedrockService._separar_lote(texto, 2)
+
+    assert resultados[0] is None
+    assert resultados[1]["evento"] == "b" and "indice" not in resultados[1]
@@ -0,0 +1,123 @@
+"""
+Simulador de bedrock-runtime: framing event-stream e inyección de errores
+
+Levanta el simulador en un hilo y le habla con un cliente boto3 real (con
+credenciales falsas), así se prueba lo mismo que ve BedrockService.
+
+    python -m pytest tests/test_bedrock_simulado.py
+"""
+import base64
+import json
+import urllib.request
+
+import pytest
+from botocore.eventstream import EventStreamBuffer
+from botocore.exceptions import ClientError
+
+from src.services.bedrock_simulado import ConfiguracionSimulador, evento_chunk, iniciar_en_segundo_plano
+from src.services.llamadas_bedrock import LlamadorBedrock
+from src.services.pool_bedrock import PoolClientesBedrock
+
+MODELO = "modelo-prueba"
+
+
+def _cuerpo(texto):
+    return json.dumps({
+        "anthropic_version": "bedrock-2023-05-31",
+        "max_tokens": 512,
+        "messages": [{"role": "user", "content": f'CONSULTA DEL USUARIO: "{texto}"\n'}]
+    })
+
+
+@pytest.fixture
+def simulador():
+    servidores = []
+    pool = PoolClientesBedrock(ttl_inactivo=60)
+
+    def crear(**opciones):
+        config = ConfiguracionSimulador(latencia_ms=0, latencia_sigma=0, tokens_por_segundo=0, semilla=7, **opciones)
+        servidor = iniciar_en_segundo_plano(config)
+        servidores.append(servidor)
+        return servidor, pool.obtener("a", "b", "us-east-1", servidor.url)
+
+    yield crear
+    pool.limpiar()
+    for servidor in servidores:
+        servidor.shutdown()
+        servidor.server_close()
+
+
+@pytest.fixture
+def sin_esperas(monkeypatch):
+    # Backoff sin demoras: sólo importa cuántas veces se reintenta
+    monkeypatch.setattr("src.services.llamadas_bedrock.random.uniform", lambda a, b: 0)
+
+
+def test_mensaje_event_stream_pasa_la_validacion_de_botocore():
+    evento = {"type": "content_block_delta", "delta": {"type": "text_delta", "text": "hola"}}
+    buffer = EventStreamBuffer()
+
+    buffer.add_data(evento_chunk(evento))
+    mensajes = list(buffer)
+
+    # EventStreamBuffer verifica los dos CRC al decodificar
+    assert len(mensajes) == 1
+    assert mensajes[0].headers[":event-type"] == "chunk"
+    assert json.loads(base64.b64decode(json.loads(mensajes[0].payload)["bytes"])) == evento
+
+
+def test_stream_de_punta_a_punta(simulador):
+    servidor, cliente = simulador()
+
+    respuesta = cliente.invoke_model_with_response_stream(modelId=MODELO, body=_cuerpo("asado para 10 personas"))
+    eventos = [json.loads(evento["chunk"]["bytes"]) for evento in respuesta["body"]]
+    texto = "".join(e["delta"]["text"] for e in eventos if e["type"] == "content_block_delta")
+
+    assert eventos[0]["type"] == "message_start" and eventos[-1]["type"] == "message_stop"
+    interpretacion = json.loads(texto)
+    assert interpretacion["personas"] == 10
+    assert "carne" in [p["nombre"] for p in interpretacion["productos"]]
+    assert servidor.estadisticas() == {"requests": 1, "throttling": 0, "errores_5xx": 0}
+
+
+def test_invoke_y_estadisticas_por_http(simulador):
+    servidor, cliente = simulador()
+
+    respuesta = json.loads(cliente.invoke_model(modelId=MODELO, body=_cuerpo("yerba y café"))["body"].read())
+    with urllib.request.urlopen(f"{servidor.url}/stats", timeout=5) as r:
+        estadisticas = json.loads(r.read())
+
+    assert [p["nombre"] for p in json.loads(respuesta["content"][0]["text"])["productos"]] == ["yerba", "café"]
+    assert respuesta["usage"]["output_tokens"] > 0
+    assert estadisticas == {"requests": 1, "throttling": 0, "errores_5xx": 0}
+
+
+@pytest.mark.parametrize("opciones, contador, codigos", [
+    ({"tasa_throttling": 1.0}, "throttling", {"ThrottlingException"}),
+    ({"tasa_5xx": 1.0}, "errores_5xx", {"InternalServerException", "ServiceUnavailableException"}),
+])
+def test_errores_inyectados_se_reintentan(simulador, sin_esperas, opciones, contador, codigos):
+    servidor, cliente = simulador(**opciones)
+    llamador = LlamadorBedrock(max_reintentos=2, deadline=10)
+
+    with pytest.raises(ClientError) as error:
+        llamador.llamar(lambda: cliente.invoke_model(modelId=MODELO, body=_cuerpo("yerba")), MODELO)
+
+    assert error.value.response["Error"]["Code"] in codigos
+    # botocore no reintenta por su cuenta: cada intento es un request
+    assert llamador.reintentos == 2
+    assert servidor.estadisticas()["requests"] == 3
+    assert servidor.estadisticas()[contador] == 3
+
+
+def test_tasa_parcial_de_throttling(simulador, sin_esperas):
+    servidor, cliente = simulador(tasa_throttling=0.5)
+    llamador = LlamadorBedrock(max_reintentos=20, deadline=10)
+
+    for _ in range(10):
+        llamador.llamar(lambda: cliente.invoke_model(modelId=MODELO, body=_cuerpo("yerba"))["body"].read(), MODELO)
+
+    estadisticas = servidor.estadisticas()
+    assert estadisticas["requests"] == 10 + estadisticas["throttling"]
+    assert 0 < estadisticas["throttling"] and llamador.reintentos == estadisticas["throttling"]
+    assert estadisticas["errores_5xx"] == 0
@@ -0,0 +1,106 @@
+"""
+Caches persistentes: CacheDisco (SQLite) y el cache de geocodificación
+
+    python -m pytest tests/test_cache_disco.py
+"""
+import threading
+import time
+
+from src.models.models import Ubicacion
+from src.services.geocoding_cache import CacheGeocodificacion, normalizar_direccion
+from src.utils.cache_disco import CacheDisco
+
+GODOY_CRUZ = Ubicacion(direccion="Godoy Cruz, Mendoza", latitud=-32.92, longitud=-68.84)
+
+
+def test_guardar_y_obtener(tmp_path):
+    cache = CacheDisco(tmp_path / "cache.db")
+    cache.guardar("a", {"x": [1, 2]}, ttl=60)
+    cache.guardar("negativo", None, ttl=60)
+
+    assert cache.obtener("a") == (True, {"x": [1, 2]})
+    assert cache.obtener("negativo") == (True, None)
+    assert cache.obtener("otra") == (False, None)
+
+
+def test_vencimiento_y_purga(tmp_path):
+    cache = CacheDisco(tmp_path / "cache.db")
+    cache.guardar_muchos([("vieja", 1)], ttl=0.01)
+    cache.guardar("nueva", 2, ttl=60)
+    time.sleep(0.05)
+
+    assert cache.obtener("vieja") == (False, None)
+    assert len(cache) == 1
+    assert cache.purgar() == 1
+
+
+def test_disco_devuelve_el_vencimiento(tmp_path):
+    disco = CacheDisco(tmp_path / "cache.db")
+    disco.guardar("a", 1, ttl=60)
+
+    encontrado, valor, expira = disco.obtener_con_vencimiento("a")
+
+    assert (encontrado, valor) == (True, 1)
+    assert 59 < expira - time.time() <= 60
+    assert disco.obtener_con_vencimiento("b") == (False, None, 0.0)
+
+
+def test_tablas_independientes_en_el_mismo_archivo(tmp_path):
+    ruta = tmp_path / "cache.db"
+    CacheDisco(ruta, tabla="uno").guardar("clave", "uno", ttl=60)
+    CacheDisco(ruta, tabla="dos").guardar("clave", "dos", ttl=60)
+
+    assert CacheDisco(ruta, tabla="uno").obtener("clave") == (True, "uno")
+
+
+def test_escrituras_desde_varios_hilos(tmp_path):
+    cache = CacheDisco(tmp_path / "cache.db")
+
+    def escribir(hilo):
+        for i in range(20):
+            cache.guardar(f"{hilo}:{i}", i, ttl=60)
+
+    hilos = [threading.Thread(target=escribir, args=(h,)) for h in range(4)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert len(cache) == 80
+
+
+def test_normalizar_direccion():
+    assert normalizar_direccion("  Godoy  Cruz ,MENDOZA, ") == "godoy cruz, mendoza"
+    assert normalizar_direccion("Guaymallén") == normalizar_direccion("guaymallen")
+
+
+def test_geocodificacion_positivos_y_negativos(tmp_path):
+    cache = CacheGeocodificacion(tmp_path / "geo.db", ttl=60, ttl_negativo=60)
+    cache.guardar("Godoy Cruz", GODOY_CRUZ)
+    cache.guardar_negativo("Calle Inexistente 1")
+    cache.guardar_negativo("Calle Caida 5", error=True)
+
+    assert cache.obtener("godoy cruz ") == (True, GODOY_CRUZ)
+    assert cache.obtener("Calle Inexistente 1") == (True, None)
+    assert cache.obtener("Calle Caida 5") == (True, None)
+    # Los errores de Nominatim se pueden reintentar; las inexistentes no
+    assert cache.obtener("Calle Caida 5", incluir_errores=False) == (False, None)
+    assert cache.obtener("Calle Inexistente 1", incluir_errores=False) == (True, None)
+
+
+def test_negativos_vencen_antes(tmp_path):
+    cache = CacheGeocodificacion(tmp_path / "geo.db", ttl=60, ttl_negativo=0.01)
+    cache.guardar("Godoy Cruz", GODOY_CRUZ)
+    cache.guardar_negativo("Calle Inexistente 1")
+    time.sleep(0.05)
+
+    assert cache.obtener("Calle Inexistente 1") == (False, None)
+    assert cache.obtener("Godoy Cruz")[0]
+
+
+def test_precargar(tmp_path):
+    cache = CacheGeocodificacion(tmp_path / "geo.db")
+
+    assert cache.precargar([("Godoy Cruz", GODOY_CRUZ), ("Maipú", GODOY_CRUZ)]) == 2
+    assert len(cache) == 2
+    assert cache.obtener("maipu")[1] == GODOY_CRUZ
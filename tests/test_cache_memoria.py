@@ -0,0 +1,71 @@
+"""
+Cache LRU en memoria: límite de entradas, vencimiento y respaldo en disco
+
+    python -m pytest tests/test_cache_memoria.py
+"""
+import time
+
+from src.utils.cache_disco import CacheDisco
+from src.utils.cache_memoria import CacheLRU
+
+
+def test_descarta_la_entrada_menos_usada():
+    cache = CacheLRU(max_items=2, ttl=60)
+    cache.guardar("a", 1)
+    cache.guardar("b", 2)
+    cache.obtener("a")  # "b" pasa a ser la menos usada
+
+    cache.guardar("c", 3)
+
+    assert cache.obtener("a") == (True, 1)
+    assert cache.obtener("b") == (False, None)
+    assert cache.obtener("c") == (True, 3)
+    assert len(cache) == 2
+
+
+def test_entradas_vencidas_no_se_devuelven():
+    cache = CacheLRU(max_items=10, ttl=0.05)
+    cache.guardar("a", 1)
+
+    time.sleep(0.1)
+
+    assert cache.obtener("a") == (False, None)
+    assert len(cache) == 0
+
+
+def test_estadisticas():
+    cache = CacheLRU(max_items=10, ttl=60)
+    cache.guardar("a", 1)
+    cache.obtener("a")
+    cache.obtener("a")
+    cache.obtener("b")
+
+    assert cache.estadisticas() == {"aciertos": 2, "fallos": 1, "tasa_aciertos": 0.667, "items": 1}
+
+    cache.limpiar()
+    assert cache.estadisticas()["aciertos"] == 0
+    assert cache.obtener("a") == (False, None)
+
+
+def test_respaldo_en_disco_sobrevive_a_la_memoria(tmp_path):
+    disco = CacheDisco(tmp_path / "cache.db", tabla="prueba")
+    CacheLRU(max_items=10, ttl=60, disco=disco).guardar("consulta", {"productos": [1]})
+
+    # Otra instancia (ej: otro proceso) con la memoria vacía
+    cache = CacheLRU(max_items=10, ttl=60, disco=disco)
+
+    assert cache.obtener("consulta") == (True, {"productos": [1]})
+    assert len(cache) == 1
+
+
+def test_entrada_traida_de_disco_conserva_su_vencimiento(tmp_path):
+    disco = CacheDisco(tmp_path / "cache.db", tabla="prueba")
+    CacheLRU(max_items=10, ttl=0.4, disco=disco).guardar("consulta", 1)
+    time.sleep(0.2)
+
+    # Pasa a memoria con lo que le quedaba, no con un TTL nuevo
+    cache = CacheLRU(max_items=10, ttl=60, disco=disco)
+    assert cache.obtener("consulta") == (True, 1)
+    time.sleep(0.3)
+
+    assert cache.obtener("consulta") == (False, None)
@@ -0,0 +1,105 @@
+"""
+CLI de canastas: lectura tolerante a errores y resultados por canasta
+
+Los servicios (geocoding, sucursales y scrapers) son falsos: no hay red.
+
+    python -m pytest tests/test_canastas.py
+"""
+import csv
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from src import canastas
+from src.canastas import leer_canastas
+from src.models.models import Producto, Supermercado, Ubicacion
+
+PRECIOS = {"yerba": 1500.0, "azucar": 900.0, "leche": 1200.0}
+
+
+class ScraperFalso:
+    def __init__(self, recargo):
+        self.recargo = recargo
+        self.buscados = []
+
+    def buscar_producto_cacheado(self, termino):
+        self.buscados.append(termino)
+        precio = PRECIOS.get(termino.lower())
+        if precio is None:
+            return []
+        return [Producto(nombre=f"{termino} 1 KG", precio=precio + self.recargo, supermercado="X", url="http://x")]
+
+
+@pytest.fixture
+def servicios(monkeypatch):
+    servicios = SimpleNamespace(
+        scrapers={"Atomo": ScraperFalso(0), "Vea": ScraperFalso(100)},
+        geocoding=SimpleNamespace(
+            obtener_coordenadas=lambda direccion: Ubicacion(direccion=direccion, latitud=-32.9, longitud=-68.8),
+            filtrar_por_distancia=lambda ubicacion, indice, max_distancia_km, cadenas: [
+                Supermercado(nombre=f"{cadena} Centro", direccion="-", latitud=-32.9, longitud=-68.8,
+                             distancia_km=1.0, cadena=cadena)
+                for cadena in cadenas
+            ],
+            estimar_tiempo_viaje=lambda distancia_km: 5
+        ),
+        indice_supermercados=None
+    )
+    monkeypatch.setattr(canastas, "ContenedorServicios", lambda: servicios)
+    return servicios
+
+
+def test_csv_con_cantidad_invalida_marca_solo_esa_canasta(tmp_path):
+    entrada = tmp_path / "canastas.csv"
+    entrada.write_text(
+        "id,producto,cantidad,unidad\n"
+        "a,yerba,1,kg\n"
+        "b,azucar,dos,kg\n"
+        "b,leche,2,litros\n"
+        "c,leche,\"1,5\",litros\n",
+        encoding="utf-8"
+    )
+
+    leidas = {c["id"]: c for c in leer_canastas(entrada)}
+
+    assert "error" not in leidas["a"]
+    assert "cantidad inválida" in leidas["b"]["error"]
+    assert leidas["c"]["productos"][0]["cantidad_estimada"] == 1.5
+
+
+def test_jsonl_con_linea_rota(tmp_path):
+    entrada = tmp_path / "canastas.jsonl"
+    entrada.write_text('{"id": "a", "productos": ["yerba"]}\n{"id": "b", "productos": [\n\n[1, 2]\n',
+                       encoding="utf-8")
+
+    leidas = leer_canastas(entrada)
+
+    assert [c["id"] for c in leidas] == ["a", "2", "4"]
+    assert "error" not in leidas[0]
+    assert "JSON inválido" in leidas[1]["error"]
+    assert "objeto" in leidas[2]["error"]
+
+
+def test_main_escribe_una_fila_por_canasta_y_sigue_ante_errores(tmp_path, servicios):
+    entrada = tmp_path / "canastas.jsonl"
+    entrada.write_text("\n".join(json.dumps(c) for c in [
+        {"id": "basica", "productos": ["yerba", "Yerba", {"nombre": "azucar", "cantidad_estimada": 2, "unidad": "kg"}]},
+        {"id": "rara", "productos": [{"nombre": "leche", "cantidad_estimada": "mucha", "unidad": "litros"}]},
+        {"id": "vacia", "productos": []},
+    ]) + "\n{roto\n", encoding="utf-8")
+    salida = tmp_path / "resultados.csv"
+
+    canastas.main([str(entrada), "-o", str(salida), "--workers", "2"])
+
+    with open(salida, encoding="utf-8", newline="") as f:
+        filas = {fila["id"]: fila for fila in csv.DictReader(f)}
+    assert list(filas) == ["basica", "rara", "vacia", "4"]
+    assert float(filas["basica"]["total_optimizado"]) == 1500 * 2 + 900 * 2
+    assert filas["basica"]["super_unico"] == "Atomo Centro"
+    assert filas["basica"]["error"] == ""
+    assert filas["rara"]["error"].startswith("TypeError")
+    assert filas["vacia"]["error"] == "Canasta sin productos"
+    assert "JSON inválido" in filas["4"]["error"]
+    # Cada término se buscó una sola vez por cadena
+    assert sorted(servicios.scrapers["Atomo"].buscados) == ["azucar", "leche", "yerba"]
@@ -0,0 +1,99 @@
+"""
+Gazetteer offline y trie de prefijos para autocompletar
+
+    python -m pytest tests/test_gazetteer.py
+"""
+import pytest
+
+from config.config import GAZETTEER_DATA_FILE
+from src.models.models import Lugar
+from src.services.gazetteer import Gazetteer
+from src.utils.trie import TriePrefijos
+
+
+def _lugar(nombre, tipo, departamento=None, alias=()):
+    return Lugar(nombre=nombre, tipo=tipo, latitud=-32.9, longitud=-68.8, departamento=departamento, alias=list(alias))
+
+
+LUGARES = [
+    _lugar("Mendoza", "provincia"),
+    _lugar("Guaymallén", "departamento"),
+    _lugar("Godoy Cruz", "departamento"),
+    _lugar("Luján de Cuyo", "departamento"),
+    _lugar("Dorrego", "distrito", "Guaymallén"),
+    _lugar("Chacras de Coria", "distrito", "Luján de Cuyo", alias=["chacras"]),
+    _lugar("San Martín", "calle", "Godoy Cruz"),
+]
+
+
+@pytest.fixture
+def gazetteer():
+    return Gazetteer(LUGARES)
+
+
+def _nombre(lugar):
+    return lugar.nombre if lugar else None
+
+
+def test_trie_devuelve_primero_las_claves_mas_cortas():
+    trie = TriePrefijos()
+    for clave in ["godoy cruz", "go", "gol", "guaymallen"]:
+        trie.insertar(clave, clave)
+
+    assert trie.buscar_prefijo("go") == ["go", "gol", "godoy cruz"]
+    assert trie.buscar_prefijo("go", limite=2) == ["go", "gol"]
+    assert trie.buscar_prefijo("x") == []
+
+
+def test_trie_no_repite_valores():
+    trie = TriePrefijos()
+    valor = object()
+    trie.insertar("chacras de coria", valor)
+    trie.insertar("coria", valor)
+
+    assert trie.buscar_prefijo("c") == [valor]
+
+
+@pytest.mark.parametrize("direccion, esperado", [
+    ("Guaymallén", "Guaymallén"),
+    ("guaymallen, mendoza, argentina", "Guaymallén"),
+    ("Dorrego, Guaymallén, Mendoza", "Dorrego"),       # el más específico
+    ("chacras", "Chacras de Coria"),                   # alias
+    ("San Martín, Godoy Cruz", "San Martín"),
+    ("San Martín, Guaymallén", "Guaymallén"),          # la calle es de otro departamento
+    ("San Martín 2450, Godoy Cruz", "Godoy Cruz"),     # con altura no se usa el centro de la calle
+    ("Mendoza", "Mendoza"),
+    ("Mendoza, Argentina", "Mendoza"),
+    ("Belgrano 123, Mendoza", None),                   # mejor geocodificar
+    ("Buenos Aires", None),
+])
+def test_resolver(gazetteer, direccion, esperado):
+    assert _nombre(gazetteer.resolver(direccion)) == esperado
+
+
+def test_sugerir_por_cualquier_palabra(gazetteer):
+    assert [l.nombre for l in gazetteer.sugerir("cor")] == ["Chacras de Coria"]
+    assert [l.nombre for l in gazetteer.sugerir("Gu")] == ["Guaymallén"]
+    assert gazetteer.sugerir("  ") == []
+
+
+def test_archivo_incluido_resuelve_departamentos():
+    gazetteer = Gazetteer.desde_archivo(GAZETTEER_DATA_FILE)
+
+    for departamento in ["Guaymallén", "Godoy Cruz", "Maipú", "Las Heras", "Luján de Cuyo"]:
+        assert _nombre(gazetteer.resolver(f"{departamento}, Mendoza")) == departamento
+
+
+@pytest.mark.parametrize("direccion, esperado", [
+    # Calles con nombre de departamento o distrito: manda la localidad después de la coma
+    ("San Martín 2450, Godoy Cruz", "Godoy Cruz"),
+    ("Las Heras 300, Capital", "Capital"),
+    ("Belgrano 1000, Godoy Cruz", "Godoy Cruz"),
+    ("Rivadavia 100, Mendoza", None),                  # queda para Nominatim
+    ("Avenida San Martín 2450, Godoy Cruz", "Godoy Cruz"),
+    ("San Martín, Mendoza", "San Martín"),             # sin altura sí es el departamento
+])
+def test_archivo_incluido_no_confunde_calles_con_departamentos(direccion, esperado):
+    gazetteer = Gazetteer.desde_archivo(GAZETTEER_DATA_FILE)
+
+    assert _nombre(gazetteer.resolver(direccion)) == esperado
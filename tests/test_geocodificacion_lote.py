@@ -0,0 +1,175 @@
+"""
+Geocodificación en lote: limitador de Nominatim, negativos y reanudación
+
+Nominatim se reemplaza por un geocodificador falso; el cache en disco va a
+un directorio temporal.
+
+    python -m pytest tests/test_geocodificacion_lote.py
+"""
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from geopy.exc import GeocoderTimedOut
+
+from src.services import geocoding_cache, geocoding_service
+from src.services.geocoding_cache import CacheGeocodificacion
+from src.services.geocoding_service import GeocodingService
+from src.utils.limitador import LimitadorTasa
+
+
+class GeocodificadorFalso:
+    """Responde según un diccionario: ubicación, None (no existe) o una excepción"""
+
+    def __init__(self, respuestas):
+        self.respuestas = respuestas
+        self.consultas = []
+
+    def geocode(self, direccion, timeout=None):
+        self.consultas.append(direccion)
+        respuesta = self.respuestas.get(direccion.split(",")[0])
+        if isinstance(respuesta, BaseException):
+            raise respuesta
+        return respuesta
+
+
+def _lugar(latitud, longitud):
+    return SimpleNamespace(address=f"{latitud},{longitud}", latitude=latitud, longitude=longitud)
+
+
+@pytest.fixture
+def servicio(tmp_path, monkeypatch):
+    monkeypatch.setattr(geocoding_service, "_limitador_nominatim", LimitadorTasa(1000))
+    cache = CacheGeocodificacion(tmp_path / "geocoding.db")
+
+    def crear(respuestas):
+        svc = GeocodingService()
+        svc._cache_disco = cache
+        svc._geolocator = GeocodificadorFalso(respuestas)
+        return svc
+
+    return crear
+
+
+def test_limitador_espacia_llamadas_entre_hilos():
+    limitador = LimitadorTasa(20)  # 50 ms entre llamadas
+    momentos = []
+    lock = threading.Lock()
+
+    def llamar():
+        limitador.esperar()
+        with lock:
+            momentos.append(time.monotonic())
+
+    hilos = [threading.Thread(target=llamar) for _ in range(5)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    momentos.sort()
+    separaciones = [b - a for a, b in zip(momentos, momentos[1:])]
+    assert min(separaciones) >= 0.04
+
+
+def test_lote_devuelve_none_para_fallidas(servicio):
+    svc = servicio({
+        "Calle Uno 100": _lugar(-32.9, -68.8),
+        "Calle Inexistente 1": None,
+        "Calle Caida 5": GeocoderTimedOut("timeout"),
+    })
+
+    resultados = svc.geocodificar_lote(["Calle Uno 100", "Calle Inexistente 1", "Calle Caida 5"])
+
+    assert resultados["Calle Uno 100"].latitud == -32.9
+    assert resultados["Calle Inexistente 1"] is None
+    assert resultados["Calle Caida 5"] is None
+
+
+def test_lote_une_direcciones_repetidas(servicio):
+    svc = servicio({"Calle Uno 100": _lugar(-32.9, -68.8)})
+
+    resultados = svc.geocodificar_lote(["Calle Uno 100", "calle uno 100 ", "Calle Uno 100"])
+
+    assert len(svc.geolocator.consultas) == 1
+    assert resultados["calle uno 100 "] == resultados["Calle Uno 100"]
+
+
+def test_reanudar_reintenta_errores_pero_no_inexistentes(servicio):
+    servicio({
+        "Calle Inexistente 1": None,
+        "Calle Caida 5": GeocoderTimedOut("timeout"),
+    }).geocodificar_lote(["Calle Inexistente 1", "Calle Caida 5"])
+
+    svc = servicio({"Calle Caida 5": _lugar(-33.0, -68.9)})
+    resultados = svc.geocodificar_lote(["Calle Inexistente 1", "Calle Caida 5"])
+
+    assert [c.split(",")[0] for c in svc.geolocator.consultas] == ["Calle Caida 5"]
+    assert resultados["Calle Inexistente 1"] is None
+    assert resultados["Calle Caida 5"].latitud == -33.0
+
+
+def test_consulta_individual_marca_la_ubicacion_por_defecto(servicio):
+    servicio({"Calle Caida 5": GeocoderTimedOut("timeout")}).geocodificar_lote(["Calle Caida 5"])
+    svc = servicio({})
+
+    # Un error reciente no se reintenta en la consulta interactiva, pero se avisa
+    ubicacion = svc.obtener_coordenadas("Calle Caida 5")
+
+    assert svc.geolocator.consultas == []
+    assert ubicacion.direccion.endswith("(ubicación por defecto)")
+
+
+def test_interrupcion_se_propaga_y_lo_procesado_queda_en_cache(servicio):
+    svc = servicio({
+        "Calle Uno 100": _lugar(-32.9, -68.8),
+        "Calle Dos 200": KeyboardInterrupt(),
+    })
+
+    with pytest.raises(KeyboardInterrupt):
+        svc.geocodificar_lote(["Calle Uno 100", "Calle Dos 200"])
+
+    svc = servicio({"Calle Dos 200": _lugar(-33.0, -68.9)})
+    resultados = svc.geocodificar_lote(["Calle Uno 100", "Calle Dos 200"])
+    assert [c.split(",")[0] for c in svc.geolocator.consultas] == ["Calle Dos 200"]
+    assert resultados["Calle Uno 100"].latitud == -32.9
+
+
+@pytest.fixture
+def comando(tmp_path, monkeypatch):
+    """Corre el comando `geocodificar` con un GeocodingService falso"""
+    monkeypatch.setattr(geocoding_cache, "obtener_cache_geocodificacion", lambda: [])
+
+    def correr(lineas, geocodificar_lote):
+        archivo = tmp_path / "direcciones.txt"
+        archivo.write_text("\n".join(lineas), encoding="utf-8")
+        monkeypatch.setattr(geocoding_service, "GeocodingService",
+                            lambda: SimpleNamespace(geocodificar_lote=geocodificar_lote))
+        geocoding_cache.main(["geocodificar", str(archivo)])
+
+    return correr
+
+
+def test_comando_cuenta_aparte_unicas_y_lineas(comando, capsys):
+    ubicacion = _lugar(-32.9, -68.8)
+
+    def geocodificar_lote(direcciones, progreso=None):
+        return {d: None if d.lower().startswith("calle mala") else ubicacion for d in direcciones}
+
+    comando(["Calle Uno 100", "calle uno 100", "Calle Dos 200", "Calle Mala 1", "calle mala 1"],
+            geocodificar_lote)
+
+    salida = capsys.readouterr().out
+    assert "2/3 direcciones únicas geocodificadas (5 líneas en el archivo" in salida
+    assert "1 sin resultado: Calle Mala 1" in salida
+
+
+def test_comando_atrapa_la_interrupcion(comando, capsys):
+    def geocodificar_lote(direcciones, progreso=None):
+        progreso(1, 3, direcciones[0])
+        raise KeyboardInterrupt
+
+    comando(["Calle Uno 100", "Calle Dos 200", "Calle Tres 300"], geocodificar_lote)
+
+    assert "Lote interrumpido: 1/3" in capsys.readouterr().out
@@ -0,0 +1,83 @@
+"""
+Presupuesto de tiempo de importación (arranque en frío de workers)
+
+Mide con `python -X importtime` lo que cuesta importar los puntos de entrada
+sin interfaz y verifica que las dependencias pesadas (boto3, geopy, bs4,
+folium, ...) se carguen recién cuando se usan.
+
+    python -m pytest tests/test_import_time.py
+    python tests/test_import_time.py        # detalle de los módulos más lentos
+
+El presupuesto se ajusta con PRESUPUESTO_IMPORTACION_MS (por defecto 250 ms).
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+RAIZ = Path(__file__).parent.parent
+
+MODULOS = ["src.services.busqueda", "src.services.contenedor", "src.api", "src.canastas"]
+PESADOS = ["boto3", "botocore", "geopy", "bs4", "requests", "folium", "streamlit_folium",
+           "streamlit", "pandas", "dotenv"]
+PRESUPUESTO_MS = float(os.getenv("PRESUPUESTO_IMPORTACION_MS", "250"))
+REPETICIONES = 3
+
+
+def medir_importacion(modulos: List[str]) -> Tuple[float, Dict[str, float], Set[str]]:
+    """
+    Importa los módulos en un intérprete nuevo
+
+    Returns:
+        (ms totales, ms acumulados por módulo, pesados cargados)
+    """
+    codigo = (
+        f"import sys, {', '.join(modulos)}\n"
+        f"print(','.join(m for m in {PESADOS!r} if m in sys.modules))"
+    )
+    resultado = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        cwd=RAIZ, capture_output=True, text=True, check=True
+    )
+
+    por_modulo: Dict[str, float] = {}
+    total = 0.0
+    for linea in resultado.stderr.splitlines():
+        if not linea.startswith("import time:") or "cumulative" in linea:
+            continue
+        _, acumulado, nombre = linea[len("import time:"):].split("|")
+        por_modulo[nombre.strip()] = int(acumulado) / 1000
+        # Los de primer nivel no tienen sangría (los anidados, dos espacios por
+        # nivel); el tiempo acumulado de cada punto de entrada incluye todo lo suyo
+        if not nombre[1:].startswith(" ") and nombre.strip() in modulos:
+            total += por_modulo[nombre.strip()]
+
+    pesados = set(filter(None, resultado.stdout.strip().split(",")))
+    return total, por_modulo, pesados
+
+
+def _mejor_de(repeticiones: int) -> Tuple[float, Dict[str, float], Set[str]]:
+    """La menor de varias mediciones (la que menos ruido del sistema tiene)"""
+    return min((medir_importacion(MODULOS) for _ in range(repeticiones)), key=lambda m: m[0])
+
+
+def test_dependencias_pesadas_se_cargan_al_usarse():
+    _, _, pesados = medir_importacion(MODULOS)
+    assert not pesados, f"Se importan al cargar los módulos: {sorted(pesados)}"
+
+
+def test_presupuesto_de_importacion():
+    total, por_modulo, _ = _mejor_de(REPETICIONES)
+    lentos = sorted(
+        ((nombre, ms) for nombre, ms in por_modulo.items() if nombre not in MODULOS), key=lambda x: -x[1]
+    )[:5]
+    assert total <= PRESUPUESTO_MS, f"Importar {MODULOS} tardó {total:.0f} ms (> {PRESUPUESTO_MS:.0f}): {lentos}"
+
+
+if __name__ == "__main__":
+    total, por_modulo, pesados = _mejor_de(REPETICIONES)
+    print(f"⏱️ {total:.0f} ms (presupuesto {PRESUPUESTO_MS:.0f} ms)")
+    for nombre, ms in sorted(por_modulo.items(), key=lambda x: -x[1])[:15]:
+        print(f"  {ms:8.1f} ms  {nombre}")
+    print(f"📦 Pesados cargados: {sorted(pesados) or 'ninguno'}")
@@ -0,0 +1,80 @@
+"""
+Índice espacial: radio y k más cercanos contra una búsqueda por fuerza bruta
+
+    python -m pytest tests/test_indice_espacial.py
+"""
+import random
+
+import pytest
+
+from src.models.models import Supermercado
+from src.utils.indice_espacial import IndiceEspacial, distancia_haversine
+
+CENTRO = (-32.89, -68.84)
+
+
+def _sucursales(cantidad=400, semilla=7):
+    azar = random.Random(semilla)
+    return [
+        Supermercado(
+            nombre=f"{cadena} {i}",
+            direccion="-",
+            latitud=CENTRO[0] + azar.uniform(-0.4, 0.4),
+            longitud=CENTRO[1] + azar.uniform(-0.4, 0.4),
+            cadena=cadena
+        )
+        for i, cadena in enumerate(azar.choice(["Atomo", "Vea", "Carrefour"]) for _ in range(cantidad))
+    ]
+
+
+def _fuerza_bruta(sucursales, lat, lon, cadenas=None):
+    return sorted(
+        ((distancia_haversine(lat, lon, s.latitud, s.longitud), s) for s in sucursales
+         if cadenas is None or s.cadena in cadenas),
+        key=lambda x: x[0]
+    )
+
+
+def test_distancia_haversine():
+    assert distancia_haversine(*CENTRO, *CENTRO) == 0
+    # Un grado de latitud son ~111 km
+    assert distancia_haversine(-32.0, -68.0, -33.0, -68.0) == pytest.approx(111.2, abs=0.2)
+
+
+@pytest.mark.parametrize("km", [0.5, 3, 10, 60])
+@pytest.mark.parametrize("cadenas", [None, ["Atomo"], ["vea", "Carrefour"]])
+def test_radio_coincide_con_fuerza_bruta(km, cadenas):
+    sucursales = _sucursales()
+    indice = IndiceEspacial(sucursales, tamano_celda_km=5)
+    normalizadas = None if cadenas is None else {c.title() for c in cadenas}
+
+    esperados = [s for d, s in _fuerza_bruta(sucursales, *CENTRO, normalizadas) if d <= km]
+
+    assert [s for _, s in indice.radio(*CENTRO, km, cadenas=cadenas)] == esperados
+
+
+@pytest.mark.parametrize("k", [1, 5, 50])
+def test_k_cercanos_coincide_con_fuerza_bruta(k):
+    sucursales = _sucursales()
+    indice = IndiceEspacial(sucursales, tamano_celda_km=2)
+
+    for lat, lon in [CENTRO, (-32.6, -68.5), (-34.0, -70.0)]:  # el último queda fuera de la grilla
+        esperados = [s for _, s in _fuerza_bruta(sucursales, lat, lon)[:k]]
+        assert [s for _, s in indice.k_cercanos(lat, lon, k)] == esperados
+
+
+def test_k_cercanos_filtrando_por_cadena():
+    sucursales = _sucursales()
+    indice = IndiceEspacial(sucursales)
+
+    cercanos = indice.k_cercanos(*CENTRO, 3, cadenas=["Vea"])
+
+    assert [s for _, s in cercanos] == [s for _, s in _fuerza_bruta(sucursales, *CENTRO, {"Vea"})[:3]]
+
+
+def test_indice_vacio():
+    indice = IndiceEspacial([])
+
+    assert len(indice) == 0
+    assert indice.radio(*CENTRO, 10) == []
+    assert indice.k_cercanos(*CENTRO, 3) == []
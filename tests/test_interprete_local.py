@@ -0,0 +1,53 @@
+"""
+Intérprete local de listas simples: qué resuelve sin LLM y con qué cantidades
+
+    python -m pytest tests/test_interprete_local.py
+"""
+import pytest
+
+from src.services.interprete_local import interpretar_local
+
+
+def _productos(mensaje):
+    interpretacion = interpretar_local(mensaje)
+    return [(p["nombre"], p["cantidad_estimada"], p["unidad"]) for p in interpretacion["productos"]]
+
+
+def test_lista_simple_con_unidades_por_defecto():
+    assert _productos("yerba y fideos") == [("yerba", 1, "kg"), ("fideos", 1, "paquetes")]
+
+
+def test_conserva_los_acentos_del_usuario():
+    assert [nombre for nombre, _, _ in _productos("Quiero café, jamón y maní")] == ["café", "jamón", "maní"]
+
+
+def test_cantidades_por_persona():
+    interpretacion = interpretar_local("pan y gaseosa para 6 personas")
+
+    assert interpretacion["personas"] == 6
+    assert [(p["nombre"], p["cantidad_estimada"], p["unidad"]) for p in interpretacion["productos"]] == [
+        ("pan", 15, "unidades"), ("gaseosa", 3.0, "litros")
+    ]
+
+
+def test_numero_sin_unidad_cuenta_envases():
+    assert _productos("3 cervezas y 2 fideos") == [("cervezas", 3.0, "unidades"), ("fideos", 2.0, "paquetes")]
+
+
+def test_cantidad_con_unidad_explicita():
+    assert _productos("500 gr de queso") == [("queso", 0.5, "kg")]
+    assert _productos("2 litros de leche") == [("leche", 2.0, "litros")]
+
+
+def test_repetidos_se_unen():
+    assert len(_productos("yerba, Yerba y yerba")) == 1
+
+
+@pytest.mark.parametrize("mensaje", [
+    "asado para 10",               # evento: lo razona el LLM
+    "cumpleaños para 30 niños",
+    "yerba y algo rico",           # producto desconocido
+    "quiero",
+])
+def test_deja_para_el_llm_lo_que_no_entiende(mensaje):
+    assert interpretar_local(mensaje) is None
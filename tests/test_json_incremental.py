@@ -0,0 +1,58 @@
+"""
+Parser JSON incremental: productos entregados apenas se cierran en el stream
+
+    python -m pytest tests/test_json_incremental.py
+"""
+import json
+
+import pytest
+
+from src.utils.json_incremental import ParserProductosIncremental
+
+RESPUESTA = {
+    "evento": "asado",
+    "notas": {"productos": [{"nombre": "no es de la raíz"}]},
+    "productos": [
+        {"nombre": "carne", "cantidad_estimada": 2.5, "unidad": "kg", "razonamiento": "10 × 0.25 {kg}"},
+        {"nombre": "pan \"casero\"", "cantidad_estimada": 25, "unidad": "unidades", "extra": {"a": [1, 2]}},
+        {"nombre": "vino", "cantidad_estimada": 4, "unidad": "litros"},
+    ],
+    "personas": 10,
+}
+
+
+def _en_pedazos(texto, tamano):
+    return [texto[i:i + tamano] for i in range(0, len(texto), tamano)]
+
+
+@pytest.mark.parametrize("tamano", [1, 3, 17, 10_000])
+def test_entrega_cada_producto_una_vez_con_cualquier_corte(tamano):
+    texto = "Acá va el JSON:\n" + json.dumps(RESPUESTA, ensure_ascii=False, indent=2)
+    parser = ParserProductosIncremental()
+
+    productos = [p for pedazo in _en_pedazos(texto, tamano) for p in parser.alimentar(pedazo)]
+
+    assert productos == RESPUESTA["productos"]
+    assert parser.texto == texto
+
+
+def test_entrega_el_producto_apenas_se_cierra():
+    parser = ParserProductosIncremental()
+
+    assert parser.alimentar('{"productos": [{"nombre": "yerba", "unidad": "kg"') == []
+    assert parser.alimentar('}, {"nombre": "caf') == [{"nombre": "yerba", "unidad": "kg"}]
+    assert parser.alimentar('é"}]}') == [{"nombre": "café"}]
+
+
+def test_ignora_objetos_mal_formados():
+    parser = ParserProductosIncremental()
+
+    productos = parser.alimentar('{"productos": [{"nombre": yerba}, {"nombre": "azúcar"}]}')
+
+    assert productos == [{"nombre": "azúcar"}]
+
+
+def test_respuesta_sin_productos():
+    parser = ParserProductosIncremental()
+
+    assert parser.alimentar('{"error": "fuera de dominio", "items": [{"a": 1}]}') == []
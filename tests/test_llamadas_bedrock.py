@@ -0,0 +1,121 @@
+"""
+Llamadas a Bedrock: cupo por modelo, plazos y reintentos
+
+Las llamadas son funciones falsas; no hace falta red ni credenciales.
+
+    python -m pytest tests/test_llamadas_bedrock.py
+"""
+import threading
+import time
+from contextlib import closing
+
+import pytest
+from botocore.exceptions import ClientError
+
+from src.services.llamadas_bedrock import LlamadorBedrock
+
+MODELO = "modelo-prueba"
+
+
+class StreamFalso:
+    """Stream de eventos que tarda `demora` segundos por evento y cuenta lectores simultáneos"""
+
+    leyendo = 0
+    maximo = 0
+    lock = threading.Lock()
+
+    def __init__(self, eventos=3, demora=0.05):
+        self.eventos = eventos
+        self.demora = demora
+        self.cerrado = False
+
+    def __iter__(self):
+        with StreamFalso.lock:
+            StreamFalso.leyendo += 1
+            StreamFalso.maximo = max(StreamFalso.maximo, StreamFalso.leyendo)
+        try:
+            for i in range(self.eventos):
+                time.sleep(self.demora)
+                yield {"chunk": {"bytes": str(i).encode()}}
+        finally:
+            with StreamFalso.lock:
+                StreamFalso.leyendo -= 1
+
+    def close(self):
+        self.cerrado = True
+
+
+def _error_cliente(codigo):
+    return ClientError({"Error": {"Code": codigo, "Message": codigo}}, "InvokeModel")
+
+
+def test_llamar_reintenta_throttling(monkeypatch):
+    monkeypatch.setattr("src.services.llamadas_bedrock.random.uniform", lambda a, b: 0)
+    llamador = LlamadorBedrock(max_reintentos=2, deadline=5)
+    respuestas = [_error_cliente("ThrottlingException"), "ok"]
+
+    def llamada():
+        respuesta = respuestas.pop(0)
+        if isinstance(respuesta, Exception):
+            raise respuesta
+        return respuesta
+
+    assert llamador.llamar(llamada, MODELO) == "ok"
+    assert llamador.reintentos == 1
+
+
+def test_llamar_no_reintenta_errores_de_validacion():
+    llamador = LlamadorBedrock(deadline=5)
+    llamadas = []
+
+    def llamada():
+        llamadas.append(1)
+        raise _error_cliente("ValidationException")
+
+    with pytest.raises(ClientError):
+        llamador.llamar(llamada, MODELO)
+    assert len(llamadas) == 1
+    # El cupo se liberó aunque fallara
+    assert llamador.llamar(lambda: "ok", MODELO, deadline=0.1) == "ok"
+
+
+def test_stream_mantiene_el_cupo_hasta_terminar_de_leer():
+    StreamFalso.maximo = 0
+    llamador = LlamadorBedrock(max_por_modelo=1, deadline=5)
+    leidos = []
+
+    def leer():
+        eventos = llamador.llamar_stream(lambda: {"body": StreamFalso()}, MODELO)
+        leidos.append(len(list(eventos)))
+
+    hilos = [threading.Thread(target=leer) for _ in range(3)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert leidos == [3, 3, 3]
+    assert StreamFalso.maximo == 1
+
+
+def test_stream_respeta_el_plazo_durante_la_lectura():
+    llamador = LlamadorBedrock(max_por_modelo=1)
+    stream = StreamFalso(eventos=20, demora=0.05)
+
+    with pytest.raises(TimeoutError):
+        for _ in llamador.llamar_stream(lambda: {"body": stream}, MODELO, deadline=0.2):
+            pass
+
+    assert stream.cerrado
+    assert llamador.llamar(lambda: "ok", MODELO, deadline=0.1) == "ok"
+
+
+def test_stream_cerrado_antes_de_tiempo_libera_el_cupo():
+    llamador = LlamadorBedrock(max_por_modelo=1, deadline=5)
+    stream = StreamFalso(eventos=10, demora=0)
+
+    with closing(llamador.llamar_stream(lambda: {"body": stream}, MODELO)) as eventos:
+        next(eventos)
+
+    assert stream.cerrado
+    assert llamador.llamar(lambda: "ok", MODELO, deadline=0.1) == "ok"
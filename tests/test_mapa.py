@@ -0,0 +1,43 @@
+"""
+Mapa: cache del HTML y capa agrupada con los mismos colores que los marcadores
+
+    python -m pytest tests/test_mapa.py
+"""
+import json
+
+from src.mapa import CacheMapas, Marcador, construir_html, geojson_marcadores
+
+CENTRO = (-32.89, -68.84)
+
+
+def _marcadores(cantidad):
+    return [
+        Marcador(-32.89 + i * 0.001, -68.84, f"Super {i}", "green" if i == 0 else "blue")
+        for i in range(cantidad)
+    ]
+
+
+def test_geojson_lleva_color_e_icono():
+    propiedades = json.loads(geojson_marcadores(_marcadores(2)))["features"][0]["properties"]
+
+    assert propiedades == {"popup": "Super 0", "color": "green", "icono": "shopping-cart"}
+
+
+def test_capa_agrupada_conserva_los_colores():
+    html = construir_html(CENTRO, _marcadores(30), umbral_cluster=10)
+
+    assert "markerClusterGroup" in html
+    assert '"markerColor": "green"' in html
+    assert '"markerColor": "blue"' in html
+
+
+def test_cache_reusa_el_html_mientras_no_cambien_los_marcadores():
+    cache = CacheMapas()
+    marcadores = _marcadores(3)
+
+    primero = cache.html(CENTRO, marcadores)
+    assert cache.html(CENTRO, marcadores) == primero
+    assert cache.renders == 1
+
+    cache.html(CENTRO, marcadores[:2])
+    assert cache.renders == 2
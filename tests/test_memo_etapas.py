@@ -0,0 +1,105 @@
+"""
+Memo de etapas: qué se recalcula cuando cambia una entrada de la búsqueda
+
+Los servicios son falsos y cuentan cuántas veces se los llama.
+
+    python -m pytest tests/test_memo_etapas.py
+"""
+from collections import Counter
+from types import SimpleNamespace
+
+import pytest
+
+from src.models.models import Producto, Supermercado, Ubicacion
+from src.services import busqueda
+from src.utils.memo_etapas import MemoEtapas
+
+INTERPRETACION = {
+    "productos": [{"nombre": "yerba", "cantidad_estimada": 1, "unidad": "kg"}],
+    "evento": None,
+    "personas": 1,
+}
+
+
+def test_reusa_mientras_la_clave_no_cambie():
+    memo = MemoEtapas()
+    calculos = []
+
+    def calcular():
+        calculos.append(1)
+        return len(calculos)
+
+    assert memo.obtener("etapa", ("a", 1), calcular) == 1
+    assert memo.obtener("etapa", ("a", 1), calcular) == 1
+    assert memo.obtener("etapa", ("a", 2), calcular) == 2
+    # Sólo se guarda el último resultado de cada etapa
+    assert memo.buscar("etapa", ("a", 1)) == (False, None)
+    assert memo.recalculos == {"etapa": 2}
+
+
+def test_limpiar():
+    memo = MemoEtapas()
+    memo.guardar("etapa", "clave", "valor")
+
+    memo.limpiar()
+
+    assert memo.buscar("etapa", "clave") == (False, None)
+
+
+@pytest.fixture
+def entorno():
+    llamadas = Counter()
+
+    def obtener_coordenadas(direccion):
+        llamadas["geocoding"] += 1
+        return Ubicacion(direccion=direccion, latitud=-32.9, longitud=-68.8)
+
+    def filtrar_por_distancia(ubicacion, indice, max_distancia_km, cadenas):
+        llamadas["cercanos"] += 1
+        return [Supermercado(nombre=f"{c} Centro", direccion="-", latitud=-32.9, longitud=-68.8,
+                             distancia_km=1.0, cadena=c) for c in cadenas]
+
+    def buscar_producto_cacheado(termino):
+        llamadas["scraping"] += 1
+        return [Producto(nombre=f"{termino} 1 KG", precio=1000.0, supermercado="X", url="http://x")]
+
+    def interpretar_consulta_stream(consulta):
+        llamadas["llm"] += 1
+        for producto in INTERPRETACION["productos"]:
+            yield "producto", producto
+        yield "interpretacion", INTERPRETACION
+
+    servicios = SimpleNamespace(
+        geocoding=SimpleNamespace(obtener_coordenadas=obtener_coordenadas,
+                                  filtrar_por_distancia=filtrar_por_distancia,
+                                  estimar_tiempo_viaje=lambda distancia_km: 5),
+        scrapers={"Atomo": SimpleNamespace(buscar_producto_cacheado=buscar_producto_cacheado)},
+        indice_supermercados=None
+    )
+    bedrock = SimpleNamespace(model_id="modelo-prueba", detectar_productos=lambda consulta: [],
+                              interpretar_consulta_stream=interpretar_consulta_stream)
+    return servicios, bedrock, llamadas
+
+
+def test_busqueda_recalcula_solo_lo_que_cambió(entorno):
+    servicios, bedrock, llamadas = entorno
+    memo = MemoEtapas()
+
+    def buscar(radio_km=5, direccion="Godoy Cruz"):
+        return busqueda.buscar_mejores_precios(servicios, bedrock, "yerba", direccion, radio_km, ["Atomo"], memo)
+
+    assert buscar().ok
+    assert llamadas == Counter(geocoding=1, cercanos=1, llm=1, scraping=1)
+
+    # Mismo pedido: todo sale del memo
+    buscar()
+    assert llamadas == Counter(geocoding=1, cercanos=1, llm=1, scraping=1)
+
+    # Cambia el radio: se recalculan cercanos y la comparación, no el LLM ni el geocoding
+    resultado = buscar(radio_km=10)
+    assert resultado.ok and resultado.interpretacion == INTERPRETACION
+    assert llamadas == Counter(geocoding=1, cercanos=2, llm=1, scraping=2)
+
+    # Cambia la dirección: geocoding y cercanos de nuevo
+    buscar(radio_km=10, direccion="Maipú")
+    assert (llamadas["geocoding"], llamadas["cercanos"], llamadas["llm"]) == (2, 3, 1)
@@ -0,0 +1,133 @@
+"""
+Métricas por etapa: histogramas, spans y exportación Prometheus/JSON
+
+    python -m pytest tests/test_metricas.py
+"""
+import json
+import re
+
+import pytest
+
+from src.utils.metricas import NOMBRE_METRICA, Histograma, RegistroMetricas, formato_pedido
+
+# Línea de muestra del formato de texto de Prometheus: nombre{etiquetas} valor
+MUESTRA = re.compile(
+    r'^[a-zA-Z_:][a-zA-Z0-9_:]*'
+    r'(\{[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\\n]|\\[\\"n])*"(,[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\\n]|\\[\\"n])*")*\})?'
+    r' -?[0-9.eE+-]+$'
+)
+
+
+@pytest.fixture
+def registro():
+    return RegistroMetricas(limites=(0.1, 0.5, 1.0))
+
+
+def _lineas(registro, sufijo):
+    return [l for l in registro.prometheus().splitlines() if l.startswith(f"{NOMBRE_METRICA}_{sufijo}")]
+
+
+def test_los_limites_de_bucket_son_inclusivos():
+    histograma = Histograma((0.1, 0.5, 1.0))
+    for valor in [0.1, 0.10001, 0.5, 1.0, 2.0]:
+        histograma.observar(valor)
+
+    # le=0.1 incluye el 0.1 justo; lo que pasa de 1.0 va a +Inf
+    assert histograma.conteos == [1, 2, 1, 1]
+    assert histograma.acumulados() == [1, 3, 4, 5]
+
+
+def test_percentil_interpola_dentro_del_bucket():
+    histograma = Histograma((1.0, 2.0))
+    assert histograma.percentil(0.5) is None
+    for valor in [1.5, 1.5, 1.5, 1.5]:
+        histograma.observar(valor)
+
+    assert histograma.percentil(0.5) == pytest.approx(1.5)
+    histograma.observar(10)
+    assert histograma.percentil(0.99) == 2.0
+
+
+def test_count_y_sum(registro):
+    for duracion in [0.05, 0.2, 0.7, 3.0]:
+        registro.observar("scraping", duracion, cadena="Vea")
+
+    buckets = _lineas(registro, "bucket")
+    assert [l.rsplit(" ", 1)[1] for l in buckets] == ["1", "2", "3", "4"]
+    assert buckets[-1].startswith(f'{NOMBRE_METRICA}_bucket{{etapa="scraping",cadena="Vea",le="+Inf"}}')
+    assert _lineas(registro, "count") == [f'{NOMBRE_METRICA}_count{{etapa="scraping",cadena="Vea"}} 4']
+    assert _lineas(registro, "sum") == [f'{NOMBRE_METRICA}_sum{{etapa="scraping",cadena="Vea"}} 3.950000']
+
+
+def test_etiquetas_se_escapan(registro):
+    registro.observar("scraping", 0.2, termino='leche "la serenísima"\\entera\n1l')
+
+    linea = _lineas(registro, "count")[0]
+
+    assert 'termino="leche \\"la serenísima\\"\\\\entera\\n1l"' in linea
+    assert MUESTRA.match(linea)
+
+
+def test_formato_de_texto_prometheus_valido(registro):
+    registro.observar("scraping", 0.2, cadena="Vea", cache="miss")
+    registro.observar("geocodificacion", 0.01, fuente=None)
+    with registro.span("comparacion"):
+        pass
+
+    texto = registro.prometheus()
+
+    assert texto.endswith("\n")
+    lineas = texto.splitlines()
+    assert lineas[0] == f"# HELP {NOMBRE_METRICA} Duración de cada etapa de la búsqueda"
+    assert lineas[1] == f"# TYPE {NOMBRE_METRICA} histogram"
+    for linea in lineas[2:]:
+        assert MUESTRA.match(linea), linea
+    # Cada serie: un bucket por límite más +Inf, _sum y _count
+    assert len(lineas[2:]) == 3 * (3 + 1 + 2)
+    # None no se exporta como etiqueta
+    assert "fuente" not in texto
+
+
+def test_span_etiqueta_el_resultado(registro):
+    with registro.span("scraping", cadena="Vea") as s:
+        s.etiquetar(cache="hit")
+    with pytest.raises(ValueError):
+        with registro.span("scraping", cadena="Vea"):
+            raise ValueError
+
+    etiquetas = [serie["etiquetas"] for serie in registro.a_dict()["series"]]
+
+    assert {"cadena": "Vea", "cache": "hit", "resultado": "ok"} in etiquetas
+    assert {"cadena": "Vea", "resultado": "error"} in etiquetas
+
+
+def test_limite_de_series_descarta_el_termino():
+    registro = RegistroMetricas(limites=(1.0,), max_series=2)
+    for termino in ["yerba", "cafe", "azucar", "leche"]:
+        registro.observar("scraping", 0.1, cadena="Vea", termino=termino)
+
+    series = registro.a_dict()["series"]
+
+    assert len(series) == 3
+    assert {"cadena": "Vea"} in [s["etiquetas"] for s in series]
+
+
+def test_exportar_json(registro):
+    registro.observar("scraping", 0.2)
+
+    tipo, cuerpo = registro.exportar("json")
+    datos = json.loads(cuerpo)
+
+    assert tipo.startswith("application/json")
+    assert datos["series"][0]["cantidad"] == 1
+    assert datos["series"][0]["buckets"] == {"0.1": 0, "0.5": 1, "1": 1, "+Inf": 1}
+
+
+@pytest.mark.parametrize("ruta, aceptar, esperado", [
+    ("/metrics", "", "prometheus"),
+    ("/metrics.json", "", "json"),
+    ("/metrics?formato=json", "", "json"),
+    ("/metrics", "application/json", "json"),
+])
+def test_formato_pedido(ruta, aceptar, esperado):
+    assert formato_pedido(ruta, aceptar) == esperado
@@ -0,0 +1,203 @@
+"""
+Orquestador de etapas (DAG) y canal de eventos entre etapas
+
+    python -m pytest tests/test_orquestador.py
+"""
+import threading
+import time
+
+from types import SimpleNamespace
+
+import pytest
+
+from src.services import busqueda
+from src.utils.orquestador import CanalEventos, Orquestador
+
+
+def test_pasa_resultados_segun_dependencias():
+    orquestador = Orquestador()
+    orquestador.agregar("a", lambda: 2)
+    orquestador.agregar("b", lambda: 3)
+    orquestador.agregar("suma", lambda a, b: a + b, dependencias=("a", "b"))
+
+    assert orquestador.ejecutar() == {"a": 2, "b": 3, "suma": 5}
+    assert set(orquestador.tiempos) == {"a", "b", "suma"}
+
+
+def test_etapas_independientes_corren_en_paralelo():
+    barrera = threading.Barrier(2, timeout=2)
+    orquestador = Orquestador()
+    # Si corrieran de a una, la barrera vencería
+    orquestador.agregar("a", lambda: barrera.wait() is not None)
+    orquestador.agregar("b", lambda: barrera.wait() is not None)
+
+    assert orquestador.ejecutar() == {"a": True, "b": True}
+
+
+def test_etapas_del_hilo_llamador():
+    hilos = {}
+    orquestador = Orquestador()
+    orquestador.agregar("pool", lambda: hilos.setdefault("pool", threading.current_thread()))
+    orquestador.agregar("local", lambda pool: hilos.setdefault("local", threading.current_thread()),
+                        dependencias=("pool",), en_hilo_llamador=True)
+
+    orquestador.ejecutar()
+
+    assert hilos["local"] is threading.current_thread()
+    assert hilos["pool"] is not threading.current_thread()
+
+
+def test_error_se_propaga_y_no_corren_las_dependientes():
+    corridas = []
+    orquestador = Orquestador()
+    orquestador.agregar("falla", lambda: 1 / 0)
+    orquestador.agregar("despues", lambda falla: corridas.append(falla), dependencias=("falla",))
+
+    with pytest.raises(ZeroDivisionError):
+        orquestador.ejecutar()
+    assert corridas == []
+
+
+@pytest.mark.parametrize("etapas, mensaje", [
+    ([("a", ("x",))], "inexistentes"),
+    ([("a", ("b",)), ("b", ("a",))], "circulares"),
+])
+def test_valida_el_grafo(etapas, mensaje):
+    orquestador = Orquestador()
+    for nombre, dependencias in etapas:
+        orquestador.agregar(nombre, lambda **kwargs: None, dependencias=dependencias)
+
+    with pytest.raises(ValueError, match=mensaje):
+        orquestador.ejecutar()
+
+
+def test_etapa_duplicada():
+    orquestador = Orquestador().agregar("a", lambda: 1)
+
+    with pytest.raises(ValueError):
+        orquestador.agregar("a", lambda: 2)
+
+
+def test_canal_entrega_a_medida_que_se_produce():
+    canal = CanalEventos()
+    recibidos = []
+
+    def productor():
+        for i in range(3):
+            yield i
+            time.sleep(0.02)
+
+    hilo = threading.Thread(target=canal.alimentar, args=(productor(),))
+    hilo.start()
+    for elemento in canal:
+        # El primero llega antes de que el productor termine
+        recibidos.append((elemento, hilo.is_alive()))
+    hilo.join()
+
+    assert [e for e, _ in recibidos] == [0, 1, 2]
+    assert recibidos[0][1]
+
+
+def test_canal_relanza_el_error_del_productor():
+    canal = CanalEventos()
+
+    def productor():
+        yield 1
+        raise RuntimeError("stream cortado")
+
+    with pytest.raises(RuntimeError):
+        canal.alimentar(productor())
+    with pytest.raises(RuntimeError, match="stream cortado"):
+        list(canal)
+
+
+def test_canal_cancelado_cierra_el_productor():
+    canal = CanalEventos()
+    cerrado = []
+
+    def productor():
+        try:
+            while True:
+                yield 1
+        finally:
+            cerrado.append(True)
+
+    canal.cancelar()
+
+    assert canal.alimentar(productor()) == 0
+    assert cerrado == [True]
+    assert list(canal) == []
+
+
+def test_pipeline_con_canal():
+    canal = CanalEventos()
+    orquestador = Orquestador()
+    orquestador.agregar("productor", lambda: canal.alimentar(iter(["a", "b"])))
+    orquestador.agregar("consumidor", lambda: list(canal), en_hilo_llamador=True)
+
+    resultados = orquestador.ejecutar()
+
+    assert resultados == {"productor": 2, "consumidor": ["a", "b"]}
+
+
+def test_al_fallar_cancela_el_canal_antes_de_esperar_al_productor():
+    canal = CanalEventos()
+    producidos = []
+
+    def stream():
+        for i in range(200):
+            producidos.append(i)
+            time.sleep(0.01)
+            yield i
+
+    def consumidor():
+        for elemento in canal:
+            if elemento == 2:
+                raise ValueError("respuesta inesperada")
+
+    orquestador = Orquestador()
+    orquestador.agregar("productor", lambda: canal.alimentar(stream()))
+    orquestador.agregar("consumidor", consumidor, en_hilo_llamador=True)
+    orquestador.al_fallar(canal.cancelar)
+
+    inicio = time.perf_counter()
+    with pytest.raises(ValueError):
+        orquestador.ejecutar()
+
+    assert time.perf_counter() - inicio < 1
+    assert len(producidos) < 20
+
+
+def test_busqueda_deja_de_leer_el_stream_si_falla_la_comparacion():
+    leidos = []
+
+    def interpretar_consulta_stream(consulta):
+        for i in range(200):
+            leidos.append(i)
+            time.sleep(0.01)
+            yield {"tipo": "delta", "texto": "x"}
+
+    def comparar(eventos, *args, **kwargs):
+        for _ in eventos:
+            raise RuntimeError("comparación caída")
+
+    servicios = SimpleNamespace(
+        geocoding=SimpleNamespace(
+            obtener_coordenadas=lambda direccion: "ubicacion",
+            filtrar_por_distancia=lambda *args, **kwargs: ["super"]
+        ),
+        scrapers={},
+        indice_supermercados=None
+    )
+    bedrock = SimpleNamespace(
+        model_id="modelo-prueba",
+        detectar_productos=lambda consulta: [],
+        interpretar_consulta_stream=interpretar_consulta_stream
+    )
+
+    inicio = time.perf_counter()
+    with pytest.raises(RuntimeError, match="comparación caída"):
+        busqueda._buscar(servicios, bedrock, "yerba", "Mendoza", 5, [], None, comparar)
+
+    assert time.perf_counter() - inicio < 1
+    assert len(leidos) < 20
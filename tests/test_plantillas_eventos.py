@@ -0,0 +1,84 @@
+"""
+Plantillas de eventos: aprender de una interpretación y reescalar por personas
+
+    python -m pytest tests/test_plantillas_eventos.py
+"""
+import pytest
+
+from src.services.plantillas_eventos import PlantillasEventos, clave_plantilla
+from src.utils.cache_memoria import CacheLRU
+
+ASADO_10 = {
+    "evento": "asado",
+    "personas": 10,
+    "preferencias": None,
+    "productos": [
+        {"nombre": "carne", "cantidad_estimada": 5, "unidad": "kg"},
+        {"nombre": "chorizo", "cantidad_estimada": 1.2, "unidad": "kg"},
+        {"nombre": "pan", "cantidad_estimada": 3, "unidad": "paquetes"},
+    ]
+}
+
+
+@pytest.fixture
+def plantillas():
+    return PlantillasEventos(CacheLRU(max_items=10, ttl=60))
+
+
+@pytest.mark.parametrize("mensaje, esperado", [
+    ("asado para 14 personas", ("asado|", 14)),
+    ("Cumple para 30 niños", ("cumpleanos|ninos", 30)),
+    ("cumpleaños para 30 niños", ("cumpleanos|ninos", 30)),
+    ("asado vegetariano para 8", ("asado|vegetariano", 8)),
+    ("asado para 10 y picada para 4", None),
+    ("yerba y café", None),
+])
+def test_clave_plantilla(mensaje, esperado):
+    assert clave_plantilla(mensaje) == esperado
+
+
+def test_aprende_de_una_interpretacion_validada(plantillas):
+    assert plantillas.aprender("asado para 10 personas", ASADO_10)
+
+    interpretacion = plantillas.interpretar("asado para 10")
+
+    assert interpretacion["evento"] == "asado" and interpretacion["personas"] == 10
+    assert [(p["nombre"], p["cantidad_estimada"]) for p in interpretacion["productos"]] == [
+        ("carne", 5.0), ("chorizo", 1.2), ("pan", 3)
+    ]
+
+
+def test_no_aprende_si_no_coinciden_las_personas(plantillas):
+    assert not plantillas.aprender("asado para 12 personas", ASADO_10)
+    assert not plantillas.aprender("asado para 10", dict(ASADO_10, productos=[]))
+    assert not plantillas.aprender("asado para 10", dict(ASADO_10, productos=[{"nombre": "carne"}]))
+
+    assert plantillas.interpretar("asado para 10") is None
+
+
+def test_reescala_y_redondea_por_unidad(plantillas):
+    plantillas.aprender("asado para 10 personas", ASADO_10)
+
+    productos = {p["nombre"]: p for p in plantillas.interpretar("asado para 6")["productos"]}
+
+    # 0.12 kg × 6 = 0.72 → 0.7; 0.3 paquetes × 6 = 1.8 → 2
+    assert productos["chorizo"]["cantidad_estimada"] == 0.7
+    assert productos["carne"]["cantidad_estimada"] == 3.0
+    assert productos["pan"]["cantidad_estimada"] == 2
+    assert productos["chorizo"]["razonamiento"] == "6 personas × 0.12 kg = 0.7 kg"
+
+
+def test_redondeo_no_baja_de_un_minimo(plantillas):
+    plantillas.aprender("asado para 10 personas", ASADO_10)
+
+    productos = {p["nombre"]: p for p in plantillas.interpretar("asado para 1")["productos"]}
+
+    assert productos["chorizo"]["cantidad_estimada"] == 0.1
+    assert productos["pan"]["cantidad_estimada"] == 1
+
+
+def test_otros_modificadores_no_usan_la_plantilla(plantillas):
+    plantillas.aprender("asado para 10 personas", ASADO_10)
+
+    assert plantillas.interpretar("asado vegetariano para 10") is None
+    assert plantillas.interpretar("picada para 10") is None
@@ -0,0 +1,106 @@
+"""
+Pool de clientes de Bedrock: reutilización y desalojo por inactividad
+
+Se crean clientes boto3 con credenciales falsas (no se hace ninguna llamada).
+
+    python -m pytest tests/test_pool_bedrock.py
+"""
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from src.services import bedrock_service
+from src.services.bedrock_service import BedrockService
+from src.services.pool_bedrock import PoolClientesBedrock
+from src.utils.cache_memoria import CacheLRU
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = PoolClientesBedrock(ttl_inactivo=60)
+    monkeypatch.setattr(bedrock_service, "obtener_pool_bedrock", lambda: pool)
+    monkeypatch.setattr(bedrock_service, "_cache_interpretaciones", CacheLRU(10, 60))
+    yield pool
+    pool.limpiar()
+
+
+def test_reutiliza_el_cliente_por_credenciales_y_region(pool):
+    cliente = pool.obtener("a", "b", "us-east-1")
+
+    assert pool.obtener("a", "b", "us-east-1") is cliente
+    assert pool.obtener("a", "b", "us-west-2") is not cliente
+    assert pool.obtener("a", "otra", "us-east-1") is not cliente
+    assert (pool.creados, pool.reutilizados) == (3, 1)
+
+
+def test_desaloja_clientes_inactivos(pool):
+    viejo = pool.obtener("a", "b", "us-east-1")
+    pool.ttl_inactivo = 0
+
+    pool.obtener("c", "d", "us-east-1")
+    pool.ttl_inactivo = 60
+
+    assert len(pool) == 1
+    assert pool.obtener("a", "b", "us-east-1") is not viejo
+
+
+def test_servicio_guardado_sigue_andando_tras_el_desalojo(pool):
+    # Como un BedrockService guardado en session_state entre reruns
+    servicio = BedrockService("a", "b", "us-east-1")
+    viejo = servicio.client
+    pool.ttl_inactivo = 0
+
+    pool.obtener("c", "d", "us-east-1")
+    pool.ttl_inactivo = 60
+
+    assert servicio.client is not viejo
+    assert servicio.client is pool.obtener("a", "b", "us-east-1")
+
+
+def test_crear_un_cliente_no_frena_a_las_otras_claves(pool, monkeypatch):
+    existente = pool.obtener("a", "b", "us-east-1")
+    creando = threading.Event()
+    liberar = threading.Event()
+
+    def crear_lento(*args):
+        creando.set()
+        liberar.wait(5)
+        return SimpleNamespace(close=lambda: None)
+
+    monkeypatch.setattr(pool, "_crear_cliente", crear_lento)
+    hilo = threading.Thread(target=pool.obtener, args=("c", "d", "us-east-1"))
+    hilo.start()
+    creando.wait(5)
+
+    try:
+        # Con el lock tomado durante la creación, esto esperaría a liberar
+        assert pool.obtener("a", "b", "us-east-1") is existente
+    finally:
+        liberar.set()
+        hilo.join()
+    assert len(pool) == 2
+
+
+def test_creaciones_simultaneas_de_la_misma_clave_comparten_cliente(pool, monkeypatch):
+    barrera = threading.Barrier(2, timeout=5)
+    cerrados = []
+
+    def crear(*args):
+        barrera.wait()
+        cliente = SimpleNamespace()
+        cliente.close = lambda: cerrados.append(cliente)
+        return cliente
+
+    monkeypatch.setattr(pool, "_crear_cliente", crear)
+    obtenidos = []
+    hilos = [threading.Thread(target=lambda: obtenidos.append(pool.obtener("a", "b", "us-east-1")))
+             for _ in range(2)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert obtenidos[0] is obtenidos[1]
+    assert len(cerrados) == 1 and cerrados[0] is not obtenidos[0]
+    assert (pool.creados, pool.reutilizados) == (1, 1)
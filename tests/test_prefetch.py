@@ -0,0 +1,134 @@
+"""
+Prefetch especulativo y cache de precios compartido (single-flight)
+
+Los scrapers son falsos y quedan bloqueados hasta que el test los libera.
+
+    python -m pytest tests/test_prefetch.py
+"""
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from src.models.models import Producto
+from src.scrapers.cache_precios import CachePrecios, clave_termino
+from src.services import busqueda
+from src.services.prefetch import PrefetchEspeculativo
+
+
+class ScraperBloqueado:
+    def __init__(self):
+        self.liberar = threading.Event()
+        self.buscados = []
+
+    def buscar_producto_cacheado(self, termino):
+        self.buscados.append(termino)
+        self.liberar.wait(5)
+        return []
+
+
+@pytest.fixture
+def scraper():
+    scraper = ScraperBloqueado()
+    yield scraper
+    scraper.liberar.set()
+
+
+def test_confirmar_cancela_lo_que_no_se_pidio(scraper):
+    prefetch = PrefetchEspeculativo({"Atomo": scraper}, ["Atomo"], max_workers=1)
+    assert prefetch.iniciar(["yerba", "cafe", "azucar"]) == 3
+
+    resumen = prefetch.confirmar(["Yerba", "azúcar"])
+
+    # "yerba" ya estaba corriendo; "cafe" esperaba turno
+    assert resumen == {"usadas": 2, "canceladas": 1, "desperdiciadas": 0}
+
+
+def test_cancelar_despues_de_confirmar_no_hace_nada(scraper):
+    prefetch = PrefetchEspeculativo({"Atomo": scraper}, ["Atomo"], max_workers=1)
+    prefetch.iniciar(["yerba", "cafe"])
+    prefetch.confirmar(["yerba", "cafe"])
+
+    prefetch.cancelar()
+
+    assert not any(futuro.cancelled() for futuro in prefetch._futuros.values())
+
+
+def test_busqueda_cancela_el_prefetch_si_falla_una_etapa(scraper, monkeypatch):
+    creados = []
+
+    class PrefetchRegistrado(PrefetchEspeculativo):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            creados.append(self)
+
+    def geocodificar(direccion):
+        raise RuntimeError("geocoding caído")
+
+    monkeypatch.setattr(busqueda, "PrefetchEspeculativo", PrefetchRegistrado)
+    terminos = [f"producto {i}" for i in range(8)]
+    servicios = SimpleNamespace(
+        geocoding=SimpleNamespace(obtener_coordenadas=geocodificar),
+        scrapers={"Atomo": scraper},
+        indice_supermercados=None
+    )
+    bedrock = SimpleNamespace(
+        model_id="modelo-prueba",
+        detectar_productos=lambda consulta: terminos,
+        interpretar_consulta_stream=lambda consulta: iter([])
+    )
+
+    with pytest.raises(RuntimeError):
+        busqueda.buscar_mejores_precios(servicios, bedrock, "lista larga", "Mendoza", 5, ["Atomo"])
+
+    futuros = creados[0]._futuros.values()
+    # Las que no llegaron a arrancar se cancelaron
+    assert sum(futuro.cancelled() for futuro in futuros) == len(terminos) - len(scraper.buscados)
+    assert len(scraper.buscados) < len(terminos)
+
+
+def test_clave_termino_une_plurales_y_acentos():
+    assert clave_termino("Gaseosas") == clave_termino("gaseosa")
+    assert clave_termino("Café  Molido") == "cafe molido"
+
+
+def test_cache_une_busquedas_simultaneas_del_mismo_termino():
+    liberar = threading.Event()
+    llamadas = []
+    scraper = SimpleNamespace(nombre_supermercado="Atomo")
+
+    def buscar_producto(termino):
+        llamadas.append(termino)
+        liberar.wait(5)
+        return [Producto(nombre="Yerba 1 KG", precio=1500.0, supermercado="Atomo")]
+
+    scraper.buscar_producto = buscar_producto
+    cache = CachePrecios(max_items=10, ttl=60)
+    resultados = []
+    hilos = [threading.Thread(target=lambda t=t: resultados.append(cache.buscar(scraper, t)))
+             for t in ["yerba", "Yerbas", "yerba"]]
+    for hilo in hilos:
+        hilo.start()
+    while cache.en_vuelo() == 0:
+        pass
+    liberar.set()
+    for hilo in hilos:
+        hilo.join()
+
+    assert len(llamadas) == 1
+    assert len(resultados) == 3 and all(r[0].precio == 1500.0 for r in resultados)
+    # Después sale del cache
+    cache.buscar(scraper, "yerba")
+    assert len(llamadas) == 1
+
+
+def test_cache_no_guarda_resultados_vacios():
+    llamadas = []
+    scraper = SimpleNamespace(nombre_supermercado="Vea",
+                              buscar_producto=lambda termino: llamadas.append(termino) or [])
+    cache = CachePrecios(max_items=10, ttl=60)
+
+    cache.buscar(scraper, "yerba")
+    cache.buscar(scraper, "yerba")
+
+    assert len(llamadas) == 2
@@ -0,0 +1,99 @@
+"""
+Resumen de comparaciones para el prompt de recomendación y presupuesto de tokens
+
+    python -m pytest tests/test_resumen_comparaciones.py
+"""
+from src.models.models import ComparacionPrecios, Producto
+from src.services.resumen_comparaciones import ajustar_a_presupuesto, resumir_comparaciones
+from src.utils.tokens import estimar_tokens, json_compacto
+
+
+def _comparacion(supermercado, precios, distancia_km=2.0):
+    productos = [Producto(nombre=nombre, precio=precio, supermercado=supermercado) for nombre, precio in precios.items()]
+    return ComparacionPrecios(
+        supermercado=supermercado,
+        productos=productos,
+        total=sum(precios.values()),
+        distancia_km=distancia_km,
+        tiempo_estimado_min=5
+    )
+
+
+COMPARACIONES = [
+    _comparacion("Vea", {"yerba": 1800, "cafe": 4000, "azucar": 900}),
+    _comparacion("Atomo", {"yerba": 1500, "cafe": 4200, "azucar": 950}),
+    _comparacion("Carrefour", {"yerba": 2100, "cafe": 3900}, distancia_km=6.3),
+]
+
+
+def test_estimar_tokens():
+    assert estimar_tokens("") == 0
+    assert estimar_tokens("abc") == 1
+    assert estimar_tokens("a" * 35) == 10
+    assert json_compacto({"a": [1, 2]}) == '{"a":[1,2]}'
+
+
+def test_resumen_ordena_supers_por_total():
+    resumen = resumir_comparaciones(COMPARACIONES)
+
+    assert [s["super"] for s in resumen["supers"]] == ["Carrefour", "Atomo", "Vea"]
+    assert resumen["supers"][0] == {"super": "Carrefour", "total": 6000, "km": 6.3, "min": 5, "productos": 2}
+
+
+def test_resumen_guarda_el_mas_barato_y_el_segundo_por_producto():
+    ahorros = {a["producto"]: a for a in resumir_comparaciones(COMPARACIONES)["ahorros"]}
+
+    assert ahorros["yerba"] == {"producto": "yerba", "barato": "Atomo", "segundo": "Vea", "caro": "Carrefour", "ahorro": 600}
+    assert (ahorros["cafe"]["barato"], ahorros["cafe"]["segundo"]) == ("Carrefour", "Vea")
+    # Con dos precios el segundo es el caro
+    assert ahorros["azucar"] == {"producto": "azucar", "barato": "Vea", "caro": "Atomo", "ahorro": 50}
+    # Primero los de mayor ahorro
+    assert [a["producto"] for a in resumir_comparaciones(COMPARACIONES)["ahorros"]] == ["yerba", "cafe", "azucar"]
+
+
+def test_resumen_del_formato_producto_por_producto():
+    comparacion = {
+        "yerba": {"supermercados": {
+            "Vea": {"subtotal": 1800, "distancia_km": 2.0, "tiempo_min": 5},
+            "Atomo": {"subtotal": 1500, "distancia_km": 1.2, "tiempo_min": 3},
+            "Jumbo": None,
+        }},
+    }
+
+    resumen = resumir_comparaciones(comparacion)
+
+    assert [s["super"] for s in resumen["supers"]] == ["Atomo", "Vea"]
+    assert resumen["ahorros"] == [{"producto": "yerba", "barato": "Atomo", "caro": "Vea", "ahorro": 300}]
+
+
+def test_presupuesto_holgado_no_recorta():
+    resumen = resumir_comparaciones(COMPARACIONES)
+
+    assert ajustar_a_presupuesto(resumen, 10_000) is resumen
+
+
+def test_presupuesto_descarta_primero_los_ahorros_menores():
+    resumen = resumir_comparaciones(COMPARACIONES)
+    presupuesto = estimar_tokens(json_compacto(resumen)) - 1
+
+    recortado = ajustar_a_presupuesto(resumen, presupuesto)
+
+    assert estimar_tokens(json_compacto(recortado)) <= presupuesto
+    assert [a["producto"] for a in recortado["ahorros"]] == ["yerba", "cafe"]
+    assert len(recortado["supers"]) == 3 and recortado["omitidos"] == 0
+    # El original no se toca
+    assert len(resumen["ahorros"]) == 3
+
+
+def test_presupuesto_justo_conserva_el_mas_barato_y_el_mas_caro():
+    comparaciones = [_comparacion(f"Super {i}", {"yerba": 1000 + i * 100}) for i in range(8)]
+    resumen = resumir_comparaciones(comparaciones)
+    sin_ahorros = dict(resumen, ahorros=[], supers=resumen["supers"][:1] + resumen["supers"][-1:])
+    presupuesto = estimar_tokens(json_compacto(dict(sin_ahorros, omitidos=6)))
+
+    recortado = ajustar_a_presupuesto(resumen, presupuesto)
+
+    assert estimar_tokens(json_compacto(recortado)) <= presupuesto
+    assert recortado["ahorros"] == []
+    assert [s["super"] for s in recortado["supers"]] == ["Super 0", "Super 7"]
+    assert recortado["omitidos"] == 6
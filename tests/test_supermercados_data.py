@@ -0,0 +1,61 @@
+"""
+Registro de sucursales: carga desde archivo y búsqueda por cadena o nombre
+
+    python -m pytest tests/test_supermercados_data.py
+"""
+import pytest
+
+from config.config import SUPERMERCADOS_DATA_FILE
+from data.supermercados_data import RegistroSupermercados, obtener_supermercado_por_nombre
+from src.models.models import Supermercado
+
+
+def _super(nombre, cadena=None):
+    return Supermercado(nombre=nombre, cadena=cadena, direccion="", latitud=-32.9, longitud=-68.8)
+
+
+@pytest.fixture
+def registro():
+    return RegistroSupermercados([
+        _super("Atomo Guaymallén", "Atomo"),
+        _super("Atomo Las Heras", "Atomo"),
+        _super("Vea Godoy Cruz", "Vea"),
+        _super("Almacén Único"),          # sin cadena: se toma la primera palabra
+    ])
+
+
+def _nombres(sucursales):
+    return [s.nombre for s in sucursales]
+
+
+def test_por_cadena(registro):
+    assert _nombres(registro.buscar("Atomo")) == ["Atomo Guaymallén", "Atomo Las Heras"]
+    assert _nombres(registro.buscar("almacen")) == ["Almacén Único"]
+
+
+def test_por_nombre_exacto(registro):
+    assert _nombres(registro.buscar("Vea Godoy Cruz")) == ["Vea Godoy Cruz"]
+
+
+@pytest.mark.parametrize("nombre", ["ATOMO", "atomo", "  Átomo ", "atomo guaymallen", "ATOMO GUAYMALLÉN"])
+def test_sin_distinguir_mayusculas_ni_acentos(registro, nombre):
+    assert "Atomo Guaymallén" in _nombres(registro.buscar(nombre))
+
+
+def test_por_parte_del_nombre(registro):
+    assert _nombres(registro.buscar("las heras")) == ["Atomo Las Heras"]
+
+
+@pytest.mark.parametrize("nombre", ["Carrefour", "Atomo Maipú", "xyz"])
+def test_no_encontrado(registro, nombre):
+    assert registro.buscar(nombre) == ()
+
+
+def test_archivo_incluido():
+    registro = RegistroSupermercados.desde_archivo(SUPERMERCADOS_DATA_FILE)
+
+    assert len(registro.buscar("Atomo")) == 3
+    assert _nombres(registro.buscar("jumbo mendoza")) == ["Jumbo Mendoza"]
+    assert obtener_supermercado_por_nombre("Inexistente") == []
+    # Las sucursales son las mismas instancias en todos los índices
+    assert registro.buscar("Vea Godoy Cruz")[0] in registro.por_cadena["vea"]